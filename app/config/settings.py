@@ -23,9 +23,67 @@ POLL_INTERVAL_SECONDS = int(os.getenv("POLL_INTERVAL_SECONDS", "300"))
 DB_PATH = os.getenv("DB_PATH", "bot.db")
 UTC = timezone.utc
 
-# API endpoints
-FF_THISWEEK = "https://nfs.faireconomy.media/ff_calendar_thisweek.json"
-FF_NEXTWEEK = "https://nfs.faireconomy.media/ff_calendar_nextweek.json"
+# Update ingestion: "polling" (за замовчуванням) або "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "").strip().rstrip("/")  # публічний https://host
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/tg/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "").strip()  # X-Telegram-Bot-Api-Secret-Token
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("PORT", os.getenv("WEBAPP_PORT", "8080")))
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "32"))   # апдейтів у обробці одночасно
+WEBHOOK_DRAIN_SECONDS = float(os.getenv("WEBHOOK_DRAIN_SECONDS", "20"))
+# Скільки прийнятих апдейтів може чекати/оброблятись; понад це — 429 (Telegram повторить)
+WEBHOOK_MAX_PENDING = int(os.getenv("WEBHOOK_MAX_PENDING", str(WEBHOOK_CONCURRENCY * 8)))
+# Топологія: single (один процес під локом), replica (webhook + кандидат у лідери),
+# worker (лише webhook), leader (лише фонові задачі під локом)
+BOT_ROLE = os.getenv("BOT_ROLE", "single").strip().lower()
+# Шардування планувальника між лідерами (лише BOT_ROLE=replica|leader):
+# підписки діляться за чатом доставки (COALESCE(out_chat_id, chat_id)) % SCHEDULER_SHARDS,
+# кожен шард — свій advisory-lock.
+SCHEDULER_SHARDS = max(1, int(os.getenv("SCHEDULER_SHARDS", "1")))
+_shard_env = os.getenv("SCHEDULER_SHARD", "").strip()  # зафіксувати шард процесу; порожньо — будь-який вільний
+SCHEDULER_SHARD = int(_shard_env) if _shard_env else None
+# Bot API endpoint: порожньо — api.telegram.org; для навантажувальних тестів —
+# заглушка scripts/fake_telegram.py (напр. http://127.0.0.1:8081) або локальний bot-api
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "").strip()
+# Метрики Prometheus: GET /metrics — окремий локальний сервер на METRICS_HOST:METRICS_PORT
+# у всіх режимах (на публічному webhook-порту його немає); 0 — вимкнено
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Апдейти, довші за поріг, логуються з розкладом часу (db/fetch/parse/telegram); 0 — вимкнено
+SLOW_UPDATE_MS = float(os.getenv("SLOW_UPDATE_MS", "1000"))
+# Адміни (user_id через кому): /profile, /loopdebug
+ADMIN_IDS = {int(x) for x in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if x.lstrip("-").isdigit()}
+# Профілювання живого процесу (app.utils.profiler): куди писати файли, межа тривалості,
+# тривалість для SIGUSR1 (профіль) / SIGUSR2 (loop debug), поріг повільного callback-а
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "120"))
+PROFILE_SIGNAL_SECONDS = float(os.getenv("PROFILE_SIGNAL_SECONDS", "30"))
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "100"))
+# Сторож loop-а (app.utils.loop_watchdog): як часто міряти лаг і з якого зависання
+# знімати стек блокуючого виклику; 0 — вимкнено
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "50"))
+LOOP_BLOCK_MS = float(os.getenv("LOOP_BLOCK_MS", "250"))
+# Пул процесів для розбору metals_*.html (app.utils.cpu_pool); 0 — без процесів (потоки)
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", "1"))
+CPU_QUEUE_MAX = int(os.getenv("CPU_QUEUE_MAX", "16"))      # задач у пулі одночасно, решта чекає
+CPU_JOB_TIMEOUT = float(os.getenv("CPU_JOB_TIMEOUT", "30"))
+
+# API endpoints; базові URL перевизначаються для локальної заглушки scripts/fake_upstream.py
+FF_BASE_URL = os.getenv("FF_BASE_URL", "https://nfs.faireconomy.media").strip().rstrip("/")
+FF_THISWEEK = f"{FF_BASE_URL}/ff_calendar_thisweek.json"
+FF_NEXTWEEK = f"{FF_BASE_URL}/ff_calendar_nextweek.json"
+# metalsmine: передається скриптам scripts/update_metals*.sh (app.core.metals_scheduler)
+METALS_BASE_URL = os.getenv("METALS_BASE_URL", "https://www.metalsmine.com").strip().rstrip("/")
+# Cloudflare-челендж замість JSON: не довбимо FF, а чекаємо стільки секунд
+FF_CHALLENGE_BACKOFF = float(os.getenv("FF_CHALLENGE_BACKOFF", "300"))
+# /ff_refresh: не частіше ніж раз на стільки секунд з одного чату (ADMIN_IDS — без обмеження)
+FF_REFRESH_COOLDOWN = float(os.getenv("FF_REFRESH_COOLDOWN", "300"))
+# Спільний знімок thisweek.json: власник кешу (шард 0) пише, інші шарди/воркери читають
+# замість власних запитів до FF. За замовчуванням — лише при SCHEDULER_SHARDS > 1.
+FF_SHARED_SNAPSHOT_PATH = os.getenv(
+    "FF_SHARED_SNAPSHOT_PATH", "data/ff_thisweek.json" if SCHEDULER_SHARDS > 1 else ""
+).strip()
 
 # UI constants
 COMMON_CURRENCIES = ["USD","EUR","GBP","JPY","AUD","NZD","CAD","CHF","CNY"]
@@ -1,17 +1,22 @@
 # app/core/database.py
 from __future__ import annotations
 
+import functools
 import os
 import sqlite3
+import threading
+import time
 from typing import Any, Dict, List, Tuple
 
+from .migrations import migrate_pg, migrate_sqlite
+from ..utils.metrics import FAST_BUCKETS, counter, histogram
+from ..utils.timings import add_time
+
 # --- PG / SQLite autodetect ---
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
 USE_PG = bool(DATABASE_URL)
 
-if USE_PG:
-    import psycopg  # psycopg v3 (sync)
-    PG_CONN_KW = {"autocommit": True}
+PG_CONN_KW = {"autocommit": True}
 
 # ---------- common helpers ----------
 
@@ -33,190 +38,83 @@ def _dict(row) -> Dict[str, Any]:
     except Exception:
         return row
 
-# ---------- helpers to add categories_filter column (define BEFORE init) ----------
-
-def _ensure_column_categories_filter_pg(conn):
-    """Додає колонку categories_filter у subscriptions, якщо її ще немає (PostgreSQL)."""
-    with conn.cursor() as cur:
-        cur.execute("""
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1
-                FROM information_schema.columns
-                WHERE table_name='subscriptions' AND column_name='categories_filter'
-            ) THEN
-                ALTER TABLE subscriptions ADD COLUMN categories_filter TEXT DEFAULT '';
-            END IF;
-        END$$;
-        """)
-        conn.commit()
-
-def _ensure_column_categories_filter_sqlite(conn):
-    """Додає колонку categories_filter у subscriptions, якщо її ще немає (SQLite)."""
-    try:
-        conn.execute("ALTER TABLE subscriptions ADD COLUMN categories_filter TEXT DEFAULT ''")
-    except Exception as e:
-        # Якщо колонка вже існує — ігноруємо (duplicate column name)
-        if "duplicate column" not in str(e).lower():
-            raise
-
-def _ensure_metals_columns_pg(conn):
-    """Додає колонки metals_impact_filter, metals_countries_filter та metals_alert_minutes (PostgreSQL)."""
-    with conn.cursor() as cur:
-        cur.execute("""
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1
-                FROM information_schema.columns
-                WHERE table_name='subscriptions' AND column_name='metals_impact_filter'
-            ) THEN
-                ALTER TABLE subscriptions ADD COLUMN metals_impact_filter TEXT DEFAULT '';
-            END IF;
-            
-            IF NOT EXISTS (
-                SELECT 1
-                FROM information_schema.columns
-                WHERE table_name='subscriptions' AND column_name='metals_countries_filter'
-            ) THEN
-                ALTER TABLE subscriptions ADD COLUMN metals_countries_filter TEXT DEFAULT '';
-            END IF;
-            
-            IF NOT EXISTS (
-                SELECT 1
-                FROM information_schema.columns
-                WHERE table_name='subscriptions' AND column_name='metals_alert_minutes'
-            ) THEN
-                ALTER TABLE subscriptions ADD COLUMN metals_alert_minutes INTEGER DEFAULT 30;
-            END IF;
-        END$$;
-        """)
-        conn.commit()
-
-def _ensure_metals_columns_sqlite(conn):
-    """Додає колонки metals_impact_filter, metals_countries_filter та metals_alert_minutes (SQLite)."""
-    try:
-        conn.execute("ALTER TABLE subscriptions ADD COLUMN metals_impact_filter TEXT DEFAULT ''")
-    except Exception as e:
-        if "duplicate column" not in str(e).lower():
-            pass  # ignore if already exists
-    
-    try:
-        conn.execute("ALTER TABLE subscriptions ADD COLUMN metals_countries_filter TEXT DEFAULT ''")
-    except Exception as e:
-        if "duplicate column" not in str(e).lower():
-            pass  # ignore if already exists
-    
-    try:
-        conn.execute("ALTER TABLE subscriptions ADD COLUMN metals_alert_minutes INTEGER DEFAULT 30")
-    except Exception as e:
-        if "duplicate column" not in str(e).lower():
-            pass  # ignore if already exists
-
-# ---------- schema (both backends) ----------
-
-DDL_SUBS = """
-CREATE TABLE IF NOT EXISTS subscriptions (
-  user_id                BIGINT NOT NULL,
-  chat_id                BIGINT NOT NULL,
-  impact_filter          TEXT   NOT NULL DEFAULT 'High,Medium',
-  countries_filter       TEXT   NOT NULL DEFAULT '',
-  alert_minutes          INTEGER NOT NULL DEFAULT 30,
-  daily_time             TEXT   NOT NULL DEFAULT '09:00',
-  lang_mode              TEXT   NOT NULL DEFAULT 'en',
-  out_chat_id            BIGINT,
-  metals_impact_filter   TEXT   NOT NULL DEFAULT '',
-  metals_countries_filter TEXT  NOT NULL DEFAULT '',
-  metals_alert_minutes   INTEGER NOT NULL DEFAULT 30,
-  PRIMARY KEY (user_id, chat_id)
-);
-"""
-
-DDL_SENT = """
-CREATE TABLE IF NOT EXISTS sent_log (
-  chat_id     BIGINT NOT NULL,
-  ev_hash     TEXT   NOT NULL,
-  kind        TEXT   NOT NULL, -- 'alert' | 'digest' | etc
-  created_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  PRIMARY KEY (chat_id, ev_hash, kind)
-);
-"""
-
-DDL_CACHE = """
-CREATE TABLE IF NOT EXISTS events_cache (
-  cache_key  TEXT PRIMARY KEY,
-  payload    TEXT NOT NULL,
-  expires_at TIMESTAMP NOT NULL
-);
-"""
+# ---------- schema: див. app/core/migrations.py ----------
 
 def _init_sqlite(path: str = "bot.db"):
     conn = sqlite3.connect(path, isolation_level=None)
     conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute(DDL_SUBS)
-    cur.execute(DDL_SENT)
-    cur.execute(DDL_CACHE)
-    cur.close()
-    # ensure extra columns (SQLite)
-    _ensure_column_categories_filter_sqlite(conn)
-    _ensure_metals_columns_sqlite(conn)
+    migrate_sqlite(conn)
     return conn
 
 def _init_pg(dsn: str):
+    import psycopg  # psycopg v3 (sync); лише для PG-розгортань
+
     conn = psycopg.connect(dsn, **PG_CONN_KW)
-    with conn.cursor() as cur:
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS subscriptions (
-          user_id                BIGINT NOT NULL,
-          chat_id                BIGINT NOT NULL,
-          impact_filter          TEXT   NOT NULL DEFAULT 'High,Medium',
-          countries_filter       TEXT   NOT NULL DEFAULT '',
-          alert_minutes          INTEGER NOT NULL DEFAULT 30,
-          daily_time             TEXT   NOT NULL DEFAULT '09:00',
-          lang_mode              TEXT   NOT NULL DEFAULT 'en',
-          out_chat_id            BIGINT,
-          metals_impact_filter   TEXT   NOT NULL DEFAULT '',
-          metals_countries_filter TEXT  NOT NULL DEFAULT '',
-          metals_alert_minutes   INTEGER NOT NULL DEFAULT 30,
-          PRIMARY KEY (user_id, chat_id)
-        );
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS sent_log (
-          chat_id     BIGINT NOT NULL,
-          ev_hash     TEXT   NOT NULL,
-          kind        TEXT   NOT NULL,
-          created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-          PRIMARY KEY (chat_id, ev_hash, kind)
-        );
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS events_cache (
-          cache_key  TEXT PRIMARY KEY,
-          payload    TEXT NOT NULL,
-          expires_at TIMESTAMPTZ NOT NULL
-        );
-        """)
-    # ensure extra columns (PostgreSQL)
-    _ensure_column_categories_filter_pg(conn)
-    _ensure_metals_columns_pg(conn)
+    migrate_pg(conn)
     return conn
 
-# ---------- open global connection ----------
+# ---------- connection lifecycle ----------
+# З'єднання відкривається не при import, а в init_db() (on_startup) або ліниво
+# при першому запиті — так імпорт хендлерів/скриптів не потребує БД.
+
+_CONN = None
+_CONN_LOCK = threading.Lock()
+
+def init_db():
+    """Відкриває з'єднання і доводить схему до актуальної (ідемпотентно)."""
+    global _CONN
+    if _CONN is None:
+        with _CONN_LOCK:
+            if _CONN is None:
+                if USE_PG:
+                    _CONN = _init_pg(DATABASE_URL)
+                else:
+                    _CONN = _init_sqlite(os.getenv("DB_PATH", "bot.db"))
+    return _CONN
+
+def close_db() -> None:
+    """Закриває з'єднання (on_shutdown); наступний запит відкриє нове."""
+    global _CONN
+    with _CONN_LOCK:
+        conn, _CONN = _CONN, None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+def _conn():
+    conn = _CONN
+    return conn if conn is not None else init_db()
+
+# ---------- metrics ----------
+
+DB_QUERY_SECONDS = histogram("db_query_seconds", "core.database call latency", ("fn",), FAST_BUCKETS)
+SENT_LOOKUPS = counter("sent_log_lookups_total", "sent_log dedupe: memory hit / claimed / taken (already in DB) / DB query", ("result",))
+
+def _observe(fn: str, seconds: float) -> None:
+    DB_QUERY_SECONDS.observe(seconds, fn=fn)
+    add_time("db", seconds)
 
-if USE_PG:
-    _CONN = _init_pg(DATABASE_URL)
-else:
-    _CONN = _init_sqlite(os.getenv("DB_PATH", "bot.db"))
+def _timed(fn):
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _observe(name, time.perf_counter() - t0)
+    return wrapper
 
 # ---------- public API ----------
 
+@_timed
 def ensure_sub(user_id: int, chat_id: int):
     """Insert default subscription if not exists."""
     if USE_PG:
-        with _CONN.cursor() as cur:
+        with _conn().cursor() as cur:
             cur.execute(
                 """
                 INSERT INTO subscriptions (user_id, chat_id)
@@ -226,15 +124,16 @@ def ensure_sub(user_id: int, chat_id: int):
                 (user_id, chat_id),
             )
     else:
-        _CONN.execute(
+        _conn().execute(
             "INSERT OR IGNORE INTO subscriptions (user_id, chat_id) VALUES (?, ?)",
             (user_id, chat_id),
         )
 
+@_timed
 def get_sub(user_id: int, chat_id: int) -> Dict[str, Any]:
     """Return subscription row as dict (or {})."""
     if USE_PG:
-        with _CONN.cursor() as cur:
+        with _conn().cursor() as cur:
             cur.execute(
                 "SELECT * FROM subscriptions WHERE user_id=%s AND chat_id=%s",
                 (user_id, chat_id),
@@ -242,13 +141,14 @@ def get_sub(user_id: int, chat_id: int) -> Dict[str, Any]:
             row = cur.fetchone()
             return _row_to_dict_pg(row, cur.description) if row else {}
     else:
-        cur = _CONN.execute(
+        cur = _conn().execute(
             "SELECT * FROM subscriptions WHERE user_id=? AND chat_id=?",
             (user_id, chat_id),
         )
         row = cur.fetchone()
         return _row_to_dict_sqlite(row) if row else {}
 
+@_timed
 def set_sub(user_id: int, chat_id: int, **fields):
     """Update provided fields for subscription."""
     if not fields:
@@ -257,7 +157,7 @@ def set_sub(user_id: int, chat_id: int, **fields):
     if USE_PG:
         assigns = ", ".join(f"{c}=%s" for c in cols)
         params = [fields[c] for c in cols] + [user_id, chat_id]
-        with _CONN.cursor() as cur:
+        with _conn().cursor() as cur:
             cur.execute(
                 f"UPDATE subscriptions SET {assigns} WHERE user_id=%s AND chat_id=%s",
                 params,
@@ -265,43 +165,129 @@ def set_sub(user_id: int, chat_id: int, **fields):
     else:
         assigns = ", ".join(f"{c}=?" for c in cols)
         params = [fields[c] for c in cols] + [user_id, chat_id]
-        _CONN.execute(
+        _conn().execute(
             f"UPDATE subscriptions SET {assigns} WHERE user_id=? AND chat_id=?",
             params,
         )
 
+@_timed
 def unsubscribe(user_id: int, chat_id: int):
     if USE_PG:
-        with _CONN.cursor() as cur:
+        with _conn().cursor() as cur:
             cur.execute(
                 "DELETE FROM subscriptions WHERE user_id=%s AND chat_id=%s",
                 (user_id, chat_id),
             )
     else:
-        _CONN.execute(
+        _conn().execute(
             "DELETE FROM subscriptions WHERE user_id=? AND chat_id=?",
             (user_id, chat_id),
         )
 
-def get_all_subs() -> List[Dict[str, Any]]:
-    """Return all subscriptions as list of dicts."""
+@_timed
+def get_all_subs(shard: int = 0, shards: int = 1) -> List[Dict[str, Any]]:
+    """
+    Return all subscriptions as list of dicts.
+    shards > 1 → лише партиція шарда за чатом доставки: COALESCE(out_chat_id, chat_id) mod
+    shards == shard (невід'ємний залишок, як % у Python). Ділимо саме за ним, бо дедуп
+    і доставка йдуть в out_chat: підписки з одним out_chat мають жити в одному шарді.
+    """
+    where, params = "", ()
+    if shards > 1:
+        k = int(shards)
+        where = f" WHERE ((COALESCE(out_chat_id, chat_id) % {k}) + {k}) % {k} = " + ("%s" if USE_PG else "?")
+        params = (int(shard),)
     if USE_PG:
-        with _CONN.cursor() as cur:
-            cur.execute("SELECT * FROM subscriptions")
+        with _conn().cursor() as cur:
+            cur.execute("SELECT * FROM subscriptions" + where, params)
             rows = cur.fetchall()
             if not rows:
                 return []
             cols = [c[0] for c in cur.description]
             return [{cols[i]: r[i] for i in range(len(cols))} for r in rows]
     else:
-        cur = _CONN.execute("SELECT * FROM subscriptions")
+        cur = _conn().execute("SELECT * FROM subscriptions" + where, params)
         return [_row_to_dict_sqlite(r) for r in cur.fetchall()]
 
 # ---- sent_log (alerts & digests dedupe) ----
+#
+# Авторитет — sent_log у БД: право надіслати видає claim_sent() через
+# INSERT ... ON CONFLICT DO NOTHING (rowcount 1 — наш, 0 — вже надіслав хтось інший,
+# у т.ч. інший процес/шард). Перед ним стоїть in-memory кеш ключів, які точно є в БД:
+# влучання — «вже надсилали» без запиту. Кеш неповний за визначенням (лише свої
+# записи + hydrate_sent_cache на старті), тож промах завжди йде в БД.
+# Ключ — 64-бітний hash кортежу, значення — година запису; dict зберігає порядок
+# вставки, тож найстаріші — спереду: витісняємо їх за віком (SENT_CACHE_DAYS)
+# і за розміром (SENT_CACHE_MAX), кеш при цьому лишається теплим.
+
+SENT_CACHE_DAYS = int(os.getenv("SENT_CACHE_DAYS", "8"))
+SENT_CACHE_MAX = int(os.getenv("SENT_CACHE_MAX", "2000000"))
+
+_SENT_KEYS: Dict[int, int] = {}
+_HOUR = 0  # поточна година (один об'єкт int на всі записи цієї години)
+
+def _sent_key(chat_id: int, ev_hash: str, kind: str) -> int:
+    return hash((int(chat_id), ev_hash, kind))
+
+def _hour() -> int:
+    global _HOUR
+    h = int(time.time() // 3600)
+    if h != _HOUR:
+        _HOUR = h
+    return _HOUR
+
+def _evict_sent(now_hour: int) -> None:
+    """Найстаріші спереду: знімаємо прострочені за віком і зайві понад SENT_CACHE_MAX."""
+    oldest = now_hour - SENT_CACHE_DAYS * 24
+    over = len(_SENT_KEYS) - SENT_CACHE_MAX
+    if over > 0:
+        over += SENT_CACHE_MAX // 100  # з запасом, щоб не витісняти на кожній вставці
+    while _SENT_KEYS:
+        key = next(iter(_SENT_KEYS))
+        if over <= 0 and _SENT_KEYS[key] >= oldest:
+            break
+        del _SENT_KEYS[key]
+        over -= 1
+
+def _remember_sent(key: int) -> None:
+    now = _hour()
+    _SENT_KEYS.pop(key, None)  # повторна вставка — в кінець (свіжий)
+    _SENT_KEYS[key] = now
+    _evict_sent(now)
+
+def _forget_sent(key: int) -> None:
+    _SENT_KEYS.pop(key, None)
+
+@_timed
+def hydrate_sent_cache(days: int = SENT_CACHE_DAYS) -> int:
+    """Завантажує ключі sent_log за останні days днів (найсвіжіші SENT_CACHE_MAX) для влучань без БД."""
+    if USE_PG:
+        with _conn().cursor() as cur:
+            cur.execute(
+                "SELECT chat_id, ev_hash, kind, (EXTRACT(EPOCH FROM created_at) / 3600)::bigint FROM sent_log "
+                "WHERE created_at >= NOW() - make_interval(days => %s) ORDER BY created_at",
+                (int(days),),
+            )
+            rows = cur.fetchall()
+    else:
+        rows = _conn().execute(
+            "SELECT chat_id, ev_hash, kind, CAST(strftime('%s', created_at) AS INTEGER) / 3600 FROM sent_log "
+            "WHERE created_at >= datetime('now', ?) ORDER BY created_at",
+            (f"-{int(days)} days",),
+        ).fetchall()
+    _SENT_KEYS.clear()
+    for r in rows[-SENT_CACHE_MAX:] if SENT_CACHE_MAX > 0 else ():
+        _SENT_KEYS[_sent_key(r[0], r[1], r[2])] = int(r[3])
+    return len(_SENT_KEYS)
 
+def reset_sent_cache() -> None:
+    """Очищає кеш (напр., при втраті лідерства); дедуп лишається за БД."""
+    _SENT_KEYS.clear()
+
+@_timed
 def mark_sent(chat_id: int, ev_hash: str, kind: str):
     if USE_PG:
-        with _CONN.cursor() as cur:
+        with _conn().cursor() as cur:
             cur.execute(
                 """
                 INSERT INTO sent_log (chat_id, ev_hash, kind)
@@ -311,28 +297,137 @@ def mark_sent(chat_id: int, ev_hash: str, kind: str):
                 (chat_id, ev_hash, kind),
             )
     else:
-        _CONN.execute(
+        _conn().execute(
             "INSERT OR IGNORE INTO sent_log (chat_id, ev_hash, kind) VALUES (?, ?, ?)",
             (chat_id, ev_hash, kind),
         )
+    _remember_sent(_sent_key(chat_id, ev_hash, kind))
 
-def was_sent(chat_id: int, ev_hash: str, kind: str) -> bool:
+def claim_sent(chat_id: int, ev_hash: str, kind: str) -> bool:
+    """
+    Атомарно «бронює» надсилання: True — запис у sent_log створено нами, шлемо;
+    False — вже надіслано (кеш або БД). Якщо надіслати не вдалося — unmark_sent().
+    """
+    key = _sent_key(chat_id, ev_hash, kind)
+    if key in _SENT_KEYS:
+        SENT_LOOKUPS.inc(result="hit")
+        return False
+    t0 = time.perf_counter()
+    try:
+        if USE_PG:
+            with _conn().cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO sent_log (chat_id, ev_hash, kind)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (chat_id, ev_hash, kind) DO NOTHING
+                    """,
+                    (chat_id, ev_hash, kind),
+                )
+                claimed = cur.rowcount == 1
+        else:
+            cur = _conn().execute(
+                "INSERT OR IGNORE INTO sent_log (chat_id, ev_hash, kind) VALUES (?, ?, ?)",
+                (chat_id, ev_hash, kind),
+            )
+            claimed = cur.rowcount == 1
+    finally:
+        _observe("claim_sent", time.perf_counter() - t0)
+    SENT_LOOKUPS.inc(result="claimed" if claimed else "taken")
+    _remember_sent(key)
+    return claimed
+
+@_timed
+def unmark_sent(chat_id: int, ev_hash: str, kind: str):
+    """Знімає бронь claim_sent, якщо надіслати не вдалося (наступний тік спробує знову)."""
     if USE_PG:
-        with _CONN.cursor() as cur:
+        with _conn().cursor() as cur:
             cur.execute(
-                "SELECT 1 FROM sent_log WHERE chat_id=%s AND ev_hash=%s AND kind=%s",
+                "DELETE FROM sent_log WHERE chat_id=%s AND ev_hash=%s AND kind=%s",
                 (chat_id, ev_hash, kind),
             )
-            return cur.fetchone() is not None
     else:
-        cur = _CONN.execute(
-            "SELECT 1 FROM sent_log WHERE chat_id=? AND ev_hash=? AND kind=?",
+        _conn().execute(
+            "DELETE FROM sent_log WHERE chat_id=? AND ev_hash=? AND kind=?",
             (chat_id, ev_hash, kind),
         )
-        return cur.fetchone() is not None
+    _forget_sent(_sent_key(chat_id, ev_hash, kind))
+
+def was_sent(chat_id: int, ev_hash: str, kind: str) -> bool:
+    """Лише перевірка (без брони): кеш, а при промаху — БД."""
+    key = _sent_key(chat_id, ev_hash, kind)
+    if key in _SENT_KEYS:
+        SENT_LOOKUPS.inc(result="hit")
+        return True
+    SENT_LOOKUPS.inc(result="db")
+    t0 = time.perf_counter()
+    try:
+        if USE_PG:
+            with _conn().cursor() as cur:
+                cur.execute(
+                    "SELECT 1 FROM sent_log WHERE chat_id=%s AND ev_hash=%s AND kind=%s",
+                    (chat_id, ev_hash, kind),
+                )
+                found = cur.fetchone() is not None
+        else:
+            cur = _conn().execute(
+                "SELECT 1 FROM sent_log WHERE chat_id=? AND ev_hash=? AND kind=?",
+                (chat_id, ev_hash, kind),
+            )
+            found = cur.fetchone() is not None
+    finally:
+        _observe("was_sent", time.perf_counter() - t0)
+    if found:
+        _remember_sent(key)
+    return found
+
+@_timed
+def purge_sent_log(older_than_days: int, batch: int = 5000) -> int:
+    """
+    Видаляє одну пачку (до batch) записів sent_log, старших за older_than_days.
+    Повертає кількість видалених; викликати в циклі, поки < batch (див. core.maintenance).
+    Пачки не тримають довгих локів і не роздувають WAL/журнал.
+    """
+    if USE_PG:
+        with _conn().cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM sent_log WHERE ctid IN (
+                    SELECT ctid FROM sent_log
+                    WHERE created_at < NOW() - make_interval(days => %s)
+                    LIMIT %s
+                )
+                """,
+                (int(older_than_days), int(batch)),
+            )
+            return cur.rowcount or 0
+    else:
+        cur = _conn().execute(
+            """
+            DELETE FROM sent_log WHERE rowid IN (
+                SELECT rowid FROM sent_log
+                WHERE created_at < datetime('now', ?)
+                LIMIT ?
+            )
+            """,
+            (f"-{int(older_than_days)} days", int(batch)),
+        )
+        return cur.rowcount or 0
+
+@_timed
+def compact_sent_log() -> None:
+    """Після великої чистки: оновити статистику планувальника запитів."""
+    if USE_PG:
+        with _conn().cursor() as cur:
+            cur.execute("ANALYZE sent_log")
+    else:
+        _conn().execute("PRAGMA optimize")
 
-# ---- optional: cache of actuals (noop for now) ----
+# ---- optional: cache of actuals ----
 
 def apply_cached_actuals(events):
-    """API-compat shim (noop)."""
+    """
+    API-compat shim (noop). Актуальні значення беруться прямо з payload FF,
+    а їх появу відстежує services.ff_diff (див. forex_client.drain_changes).
+    """
     return events
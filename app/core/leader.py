@@ -0,0 +1,206 @@
+# app/core/leader.py
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from ..utils.metrics import gauge
+
+log = logging.getLogger(__name__)
+
+# як часто кандидат пробує взяти лок і як часто лідер перевіряє, що з'єднання живе
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "2"))
+LEADER_KEEPALIVE_SECONDS = float(os.getenv("LEADER_KEEPALIVE_SECONDS", "3"))
+# як часто лідер перевіряє, чи всі шарди мають власника (0 — не перевіряти)
+LEADER_ORPHAN_CHECK_SECONDS = float(os.getenv("LEADER_ORPHAN_CHECK_SECONDS", "60"))
+# shard_lock_key кодує номер шарда в молодших 10 бітах ключа
+MAX_SHARDS = 1024
+# TCP keepalive на з'єднанні з локом: якщо лідер «завис» у мережі, PG звільнить
+# лок приблизно за idle + interval * count секунд
+_PG_KEEPALIVE_KW = {
+    "keepalives": 1,
+    "keepalives_idle": int(os.getenv("LEADER_TCP_KEEPALIVE_IDLE", "5")),
+    "keepalives_interval": 2,
+    "keepalives_count": 3,
+}
+
+_shard: Optional[int] = None
+_unowned: List[int] = []  # шарди без лідера на момент останньої перевірки
+
+gauge(
+    "leader_unowned_shards", "shards whose lock nobody holds (seen by this leader's last check)",
+    fn=lambda: len(_unowned),
+)
+
+
+def is_leader() -> bool:
+    """Чи цей процес зараз виконує фонові задачі (лідер якогось шарда)."""
+    return _shard is not None
+
+
+def current_shard() -> Optional[int]:
+    """Номер шарда, яким зараз володіє процес (None — не лідер)."""
+    return _shard
+
+
+def shard_lock_key(base: int, shard: int, shards: int) -> int:
+    """
+    Ключ advisory-lock для шарда, похідний від POLL_LOCK_KEY (або bot_id).
+    При одному шарді — сам base, тож одношардові розгортання не змінюються.
+    """
+    if shards <= 1:
+        return base
+    assert shards <= MAX_SHARDS, f"SCHEDULER_SHARDS={shards} > {MAX_SHARDS}: shard keys would collide"
+    assert 0 <= shard < shards, f"shard {shard} out of range 0..{shards - 1}"
+    return (base * 1024 + shard) & 0x7FFF_FFFF_FFFF_FFFF  # bigint без знака
+
+
+def shard_lock_keys(base: int, shards: int, only: Optional[int] = None) -> List[int]:
+    """Ключі, за які змагається процес: усі шарди або лише `only`."""
+    idx = range(shards) if only is None else [only]
+    return [shard_lock_key(base, i, shards) for i in idx]
+
+
+async def _connect(dsn: str):
+    import psycopg  # тільки для PG-розгортань
+
+    return await psycopg.AsyncConnection.connect(
+        dsn,
+        autocommit=True,
+        options="-c application_name=forex-bot-leader",
+        **_PG_KEEPALIVE_KW,
+    )
+
+
+async def _try_lock(conn, key: int) -> bool:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT pg_try_advisory_lock(%s)", (key,))
+        row = await cur.fetchone()
+        return bool(row and row[0])
+
+
+async def _ping(conn) -> None:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT 1")
+        await cur.fetchone()
+
+
+async def _held_keys(conn) -> set:
+    """
+    Advisory-ключі (bigint), які зараз хтось тримає в цій БД. Bigint-ключ
+    у pg_locks розкладено на classid (старші 32 біти) і objid (молодші), objsubid=1.
+    """
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT (classid::bigint << 32) | objid::bigint FROM pg_locks "
+            "WHERE locktype = 'advisory' AND objsubid = 1 AND granted "
+            "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+        )
+        return {row[0] for row in await cur.fetchall()}
+
+
+async def _check_orphans(conn, all_keys: Sequence[int], shard: int) -> None:
+    """Гучно логує шарди, чиї ключі ніхто не тримає: їхні підписки ніхто не обслуговує."""
+    global _unowned
+    held = await _held_keys(conn)
+    unowned = [i for i, key in enumerate(all_keys) if key not in held]
+    if unowned:
+        log.error(
+            f"[leader] shard(s) {unowned} of {len(all_keys)} have NO leader — their subscriptions "
+            f"get no alerts/digests; start more candidates (seen by shard {shard})"
+        )
+    elif _unowned:
+        log.warning(f"[leader] all {len(all_keys)} shard(s) have leaders again")
+    _unowned = unowned
+
+
+async def _try_any(conn, keys: Sequence[int]) -> Optional[int]:
+    """Бере перший вільний ключ; повертає його індекс у keys або None."""
+    for i, key in enumerate(keys):
+        if await _try_lock(conn, key):
+            return i
+    return None
+
+
+async def run_leader_election(
+    dsn: str,
+    keys: Sequence[int],
+    on_elected: Callable[[int], Awaitable[None]],
+    on_demoted: Callable[[int], Awaitable[None]],
+    shard_ids: Optional[Sequence[int]] = None,
+    all_keys: Optional[Sequence[int]] = None,
+) -> None:
+    """
+    Вибори лідера на pg_try_advisory_lock. keys — ключі шардів, за які змагається
+    процес (з shard_lock_keys); він бере перший вільний і володіє рівно одним
+    шардом. Лідер запускає фонові задачі (on_elected(shard)) і кожні
+    LEADER_KEEPALIVE_SECONDS пінгує з'єднання, на якому тримає лок. Якщо
+    з'єднання втрачено — негайно зупиняє задачі (on_demoted(shard)) і знову
+    стає кандидатом. Лок тримається сесією PG, тож коли лідер падає, його шард
+    підхоплює інший кандидат за ~LEADER_RETRY_SECONDS.
+
+    all_keys — ключі всіх шардів (індекс = номер шарда): лідер раз на
+    LEADER_ORPHAN_CHECK_SECONDS перевіряє, що кожен має власника, і голосно
+    логує партиції без лідера (кандидатів менше, ніж SCHEDULER_SHARDS).
+
+    Без DATABASE_URL виборів немає: процес одразу лідер першого шарда зі списку
+    (run.py у такому разі зводить усе до одного шарда).
+    Працює, поки задачу не скасують; на скасуванні відпускає лок.
+    """
+    global _shard, _unowned
+    shard_ids = list(shard_ids) if shard_ids is not None else list(range(len(keys)))
+
+    if not dsn or not keys or not keys[0]:
+        shard = shard_ids[0] if shard_ids else 0
+        log.warning(f"[leader] DATABASE_URL/lock key not set → this process leads shard {shard}")
+        _shard = shard
+        try:
+            await on_elected(shard)
+            await asyncio.Event().wait()
+        finally:
+            _shard = None
+            await on_demoted(shard)
+        return
+
+    while True:
+        conn = None
+        key = None
+        try:
+            conn = await _connect(dsn)
+            while (i := await _try_any(conn, keys)) is None:
+                await asyncio.sleep(LEADER_RETRY_SECONDS)
+            key, shard = keys[i], shard_ids[i]
+
+            log.warning(f"[leader] elected for shard {shard} (key={key})")
+            _shard = shard
+            try:
+                await on_elected(shard)
+                check_orphans = bool(all_keys) and len(all_keys) > 1 and LEADER_ORPHAN_CHECK_SECONDS > 0
+                # перша перевірка — після LEADER_RETRY_SECONDS*2: дамо іншим кандидатам узяти локи
+                next_check = time.monotonic() + LEADER_RETRY_SECONDS * 2
+                while True:
+                    await asyncio.sleep(LEADER_KEEPALIVE_SECONDS)
+                    await asyncio.wait_for(_ping(conn), timeout=LEADER_KEEPALIVE_SECONDS)
+                    if check_orphans and time.monotonic() >= next_check:
+                        next_check = time.monotonic() + LEADER_ORPHAN_CHECK_SECONDS
+                        await asyncio.wait_for(_check_orphans(conn, all_keys, shard), timeout=LEADER_KEEPALIVE_SECONDS)
+            finally:
+                _shard = None
+                _unowned = []
+                log.warning(f"[leader] stepping down from shard {shard} (key={key})")
+                await on_demoted(shard)
+        except asyncio.CancelledError:
+            if conn is not None and key is not None:
+                with contextlib.suppress(Exception):
+                    async with conn.cursor() as cur:
+                        await cur.execute("SELECT pg_advisory_unlock(%s)", (key,))
+            raise
+        except Exception as e:
+            log.warning(f"[leader] lock connection lost: {e}; retry in {LEADER_RETRY_SECONDS:.0f}s")
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+        finally:
+            if conn is not None:
+                with contextlib.suppress(Exception):
+                    await conn.close()
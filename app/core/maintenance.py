@@ -0,0 +1,61 @@
+# app/core/maintenance.py
+import asyncio
+import contextlib
+import logging
+import os
+from typing import Optional
+
+from .database import compact_sent_log, purge_sent_log
+
+log = logging.getLogger(__name__)
+
+# скільки днів тримати sent_log: алерти/релізи живуть тиждень, дайджести — добу
+SENT_LOG_RETENTION_DAYS = int(os.getenv("SENT_LOG_RETENTION_DAYS", "14"))
+SENT_LOG_PURGE_BATCH = int(os.getenv("SENT_LOG_PURGE_BATCH", "5000"))
+SENT_LOG_PURGE_HOURS = float(os.getenv("SENT_LOG_PURGE_HOURS", "6"))
+
+_TASK: Optional[asyncio.Task] = None
+
+
+async def purge_sent_log_once() -> int:
+    """Видаляє застарілі записи пачками, віддаючи керування event loop між ними."""
+    total = 0
+    while True:
+        n = purge_sent_log(SENT_LOG_RETENTION_DAYS, SENT_LOG_PURGE_BATCH)
+        total += n
+        if n < SENT_LOG_PURGE_BATCH:
+            break
+        await asyncio.sleep(0.05)
+    if total:
+        compact_sent_log()
+    log.info(f"[maintenance] sent_log: purged {total} row(s) older than {SENT_LOG_RETENTION_DAYS}d")
+    return total
+
+
+async def _retention_loop() -> None:
+    await asyncio.sleep(30)  # не змагаємось зі стартом планувальника
+    while True:
+        try:
+            await purge_sent_log_once()
+        except Exception as e:
+            log.warning(f"[maintenance] sent_log purge failed: {e}")
+        await asyncio.sleep(max(0.1, SENT_LOG_PURGE_HOURS) * 3600)
+
+
+async def start_maintenance() -> None:
+    """Запускає фонову чистку sent_log (один раз на лідера шарда 0)."""
+    global _TASK
+    if SENT_LOG_RETENTION_DAYS <= 0:
+        log.info("[maintenance] sent_log retention disabled (SENT_LOG_RETENTION_DAYS<=0)")
+        return
+    if _TASK is None or _TASK.done():
+        _TASK = asyncio.create_task(_retention_loop(), name="sent_log_retention")
+
+
+async def stop_maintenance() -> None:
+    global _TASK
+    if _TASK is not None and not _TASK.done():
+        _TASK.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _TASK
+    _TASK = None
@@ -0,0 +1,100 @@
+# app/core/metals_alerts.py
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from aiogram import Bot
+
+from .database import claim_sent, unmark_sent
+from ..utils.metrics import counter
+from ..services.metals_parser import _TIME_HHMM, mm_event_to_card_text
+from ..services.metals_store import MetalsSignature, get_week_snapshot_async, metals_signature
+from ..ui.formatting import mm_event_hash
+from ..utils.helpers import csv_to_list
+
+log = logging.getLogger(__name__)
+
+# ті самі серії, що й у core.scheduler (реєстр повертає наявну метрику)
+EVENTS_EVALUATED = counter("scheduler_events_evaluated_total", "events matched by subscriber filters and checked against sent_log", ("kind",))
+ALERTS_DUE = counter("scheduler_alerts_due_total", "notifications due (not sent yet)", ("kind",))
+ALERTS_SENT = counter("scheduler_alerts_sent_total", "notifications delivered", ("kind",))
+
+# той самий допуск, що й для forex-алертів: ±120 с навколо «зараз + N хв»
+_WINDOW = timedelta(seconds=120)
+
+
+def _is_metals_subscriber(sub: Dict[str, Any]) -> bool:
+    """
+    Алерти по металах отримують лише ті, хто щось зберіг у налаштуваннях металів
+    (пресет хвилин — прапорець metals_alerts_on, impact або країни), — щоб не слати
+    метали всім forex-підписникам.
+    """
+    return bool(sub.get("metals_alerts_on") or
+                csv_to_list(sub.get("metals_impact_filter", "")) or
+                csv_to_list(sub.get("metals_countries_filter", "")))
+
+
+async def send_metals_alerts(bot: Bot, subs: Iterable[Dict[str, Any]], now_utc: datetime) -> int:
+    """
+    Алерти за metals_alert_minutes до події з metals_week.html.
+    Файл розбирається лише при зміні (metals_store), вікно шукається бісекцією
+    один раз на кожне різне значення хвилин, фільтр — один раз на сигнатуру.
+    Дедуп — через sent_log (kind='metals_alert'). Повертає кількість надісланих.
+    """
+    # розбір зміненого файлу — у пулі процесів, не в loop-і
+    snap = await get_week_snapshot_async()
+    if snap is None or not len(snap):
+        return 0
+
+    # minutes → signature → підписники
+    groups: Dict[int, Dict[MetalsSignature, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+    for sub in subs:
+        if not _is_metals_subscriber(sub):
+            continue
+        try:
+            minutes = int(sub.get("metals_alert_minutes") or 30)
+        except (TypeError, ValueError):
+            minutes = 30
+        sig = metals_signature(
+            csv_to_list(sub.get("metals_impact_filter", "")),
+            csv_to_list(sub.get("metals_countries_filter", "")),
+        )
+        groups[minutes][sig].append(sub)
+
+    sent = 0
+    cards: Dict[Tuple[str, str], str] = {}
+    for minutes, by_sig in groups.items():
+        ahead = now_utc + timedelta(minutes=minutes)
+        for sig, members in by_sig.items():
+            due = [
+                ev for ev in snap.window(ahead - _WINDOW, ahead + _WINDOW + timedelta(microseconds=1), sig)
+                # 'All Day'/'Tentative' рахуються як 12:00 — для алерту це не час події
+                if _TIME_HHMM.fullmatch(ev.time_str or "")
+            ]
+            if not due:
+                continue
+            for sub in members:
+                out_chat = sub.get("out_chat_id") or sub["chat_id"]
+                lang = (sub.get("lang_mode") or "en").lower()
+                EVENTS_EVALUATED.inc(len(due), kind="metals_alert")
+                for ev in due:
+                    evh = mm_event_hash(ev)
+                    key = (evh, lang)
+                    text = cards.get(key)
+                    if text is None:
+                        hdr = "🪙 <b>Метали</b>\n" if lang == "ua" else "🪙 <b>Metals</b>\n"
+                        text = cards[key] = hdr + mm_event_to_card_text(ev, lang=lang)
+                    if not claim_sent(out_chat, evh, "metals_alert"):
+                        continue
+                    ALERTS_DUE.inc(kind="metals_alert")
+                    try:
+                        await bot.send_message(out_chat, text, parse_mode="HTML", disable_web_page_preview=True)
+                        ALERTS_SENT.inc(kind="metals_alert")
+                        sent += 1
+                    except Exception:
+                        # не валимо розсилку, якщо чат недоступний тощо; наступний тік спробує знову
+                        unmark_sent(out_chat, evh, "metals_alert")
+    if sent:
+        log.info("metals_alerts: sent %d alert(s) from week v%d", sent, snap.version)
+    return sent
@@ -0,0 +1,114 @@
+# app/core/metals_digest.py
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiogram import Bot
+
+from .database import claim_sent, unmark_sent
+from ..utils.metrics import counter
+from ..config.settings import LOCAL_TZ, UTC
+from ..services.metals_store import (
+    MetalsSignature,
+    MetalsSnapshot,
+    get_today_snapshot_async,
+    get_week_snapshot_async,
+    metals_signature,
+)
+from ..ui.metals_render import build_grouped_blocks
+from ..utils.helpers import csv_to_list
+
+log = logging.getLogger(__name__)
+
+# ті самі серії, що й у core.scheduler (реєстр повертає наявну метрику)
+ALERTS_DUE = counter("scheduler_alerts_due_total", "notifications due (not sent yet)", ("kind",))
+ALERTS_SENT = counter("scheduler_alerts_sent_total", "notifications delivered", ("kind",))
+
+_DIGEST_HASH = "__metals_digest__"
+
+
+def _due_minute(value: Any) -> Optional[int]:
+    """'HH:MM' → хвилина доби; порожньо/некоректно — None (дайджест вимкнено)."""
+    try:
+        hh, mm = map(int, str(value or "").split(":"))
+    except ValueError:
+        return None
+    if not (0 <= hh < 24 and 0 <= mm < 60):
+        return None
+    return hh * 60 + mm
+
+
+async def _day_source(start: datetime, end: datetime) -> Optional[MetalsSnapshot]:
+    """
+    metals_today.html, якщо він саме за сьогодні (оновлюється щогодини з 06:00);
+    інакше — metals_week.html, з якого беремо вікно доби. Розбір — у пулі процесів.
+    """
+    today = await get_today_snapshot_async()
+    if today is not None and today.dates and start <= today.dates[0] < end:
+        return today
+    return await get_week_snapshot_async() or today
+
+
+async def send_metals_digests(bot: Bot, subs: Iterable[Dict[str, Any]], now_utc: datetime) -> int:
+    """
+    Щоденний дайджест по металах: перший тік у metals_daily_time підписника або після
+    нього (тік іде раз на POLL_INTERVAL_SECONDS, тож точний збіг хвилини не годиться).
+    Підписники групуються за (сигнатура фільтра, мова): build_grouped_blocks
+    рендериться один раз на групу і розсилається всім її учасникам.
+    Дедуп — через sent_log (ev_hash='__metals_digest__', kind='metals-digest-YYYY-MM-DD').
+    Повертає кількість чатів, яким надіслано дайджест.
+    """
+    now_local = now_utc.astimezone(LOCAL_TZ)
+    now_minute = now_local.hour * 60 + now_local.minute
+    digest_key = f"metals-digest-{now_local:%Y-%m-%d}"
+
+    groups: Dict[Tuple[MetalsSignature, str], List[Any]] = defaultdict(list)
+    for sub in subs:
+        due = _due_minute(sub.get("metals_daily_time"))
+        if due is None or now_minute < due:
+            continue
+        out_chat = sub.get("out_chat_id") or sub["chat_id"]
+        sig = metals_signature(
+            csv_to_list(sub.get("metals_impact_filter", "")),
+            csv_to_list(sub.get("metals_countries_filter", "")),
+        )
+        lang = (sub.get("lang_mode") or "en").lower()
+        groups[(sig, lang)].append(out_chat)
+    if not groups:
+        return 0
+
+    start = now_local.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(UTC)
+    end = start + timedelta(days=1)
+    snap: Optional[MetalsSnapshot] = None
+    have_snap = False
+
+    sent = 0
+    for (sig, lang), chats in groups.items():
+        blocks: Optional[List[str]] = None
+        for out_chat in chats:
+            # бронь у sent_log — вона ж і дедуп (решту дня вже надісланим — влучання в кеш)
+            if not claim_sent(out_chat, _DIGEST_HASH, digest_key):
+                continue
+            ALERTS_DUE.inc(kind="metals_digest")
+            try:
+                if blocks is None:
+                    # рендер — лише коли в групі є кому слати
+                    if not have_snap:
+                        snap, have_snap = await _day_source(start, end), True
+                    events = snap.window(start, end, sig) if snap is not None else []
+                    if events:
+                        blocks = build_grouped_blocks(events, prefix="Метали" if lang == "ua" else "Metals", lang=lang)
+                    else:
+                        blocks = ["Сьогодні подій по металах за вашими фільтрами немає." if lang == "ua"
+                                  else "No metals events match your filters for today."]
+                for block in blocks:
+                    await bot.send_message(out_chat, block, parse_mode="HTML", disable_web_page_preview=True)
+                ALERTS_SENT.inc(kind="metals_digest")
+                sent += 1
+            except Exception:
+                # не валимо розсилку, якщо чат недоступний тощо; наступний тік спробує знову
+                unmark_sent(out_chat, _DIGEST_HASH, digest_key)
+    if sent:
+        log.info("metals_digest: %d chat(s) in %d group(s) at %s", sent, len(groups), f"{now_local:%H:%M}")
+    return sent
@@ -1,14 +1,30 @@
 # app/core/metals_scheduler.py
 import asyncio
 import logging
+import os
 from datetime import datetime, timedelta
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from ..config.settings import LOCAL_TZ
+from typing import TYPE_CHECKING, Optional
+from ..config.settings import LOCAL_TZ, METALS_BASE_URL
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 log = logging.getLogger(__name__)
 
-# Планувальник (часова зона з конфіга)
-scheduler = AsyncIOScheduler(timezone=LOCAL_TZ)
+# Планувальник (часова зона з конфіга); створюється при першому старті — apscheduler
+# (і tzlocal) не імпортуються в процесах, де метали не оновлюються (webhook-воркери)
+scheduler: Optional["AsyncIOScheduler"] = None
+
+def _scheduler() -> "AsyncIOScheduler":
+    global scheduler
+    if scheduler is None:
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        scheduler = AsyncIOScheduler(timezone=LOCAL_TZ)
+    return scheduler
+
+def _script_env() -> dict:
+    """Оточення для scripts/update_metals*.sh: джерело металів — з налаштувань застосунку."""
+    return {**os.environ, "METALS_BASE_URL": METALS_BASE_URL}
 
 async def update_metals():
     """
@@ -19,6 +35,7 @@ async def update_metals():
         "bash", "scripts/update_metals.sh",
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
+        env=_script_env(),
     )
     stdout, stderr = await proc.communicate()
     if proc.returncode != 0:
@@ -35,6 +52,7 @@ async def update_metals_week():
         "bash", "scripts/update_metals_week.sh",
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
+        env=_script_env(),
     )
     stdout, stderr = await proc.communicate()
     if proc.returncode != 0:
@@ -46,6 +64,7 @@ def setup_jobs() -> None:
     """
     Регіструємо cron-джобу. Стартуємо scheduler на startup.
     """
+    scheduler = _scheduler()
     scheduler.add_job(
         update_metals,
         trigger="cron",
@@ -81,6 +100,7 @@ def setup_jobs() -> None:
 async def start_metals_scheduler():
     """Запуск планувальника металів."""
     setup_jobs()
+    scheduler = _scheduler()
     if not scheduler.running:
         scheduler.start()
         log.info(f"[scheduler] ✅ started (tz={scheduler.timezone}) at {datetime.now(LOCAL_TZ)}")
@@ -97,7 +117,7 @@ async def start_metals_scheduler():
 
 async def stop_metals_scheduler():
     """Зупинка планувальника металів."""
-    if scheduler.running:
+    if scheduler is not None and scheduler.running:
         scheduler.shutdown(wait=False)
         log.info("[scheduler] ✅ stopped")
 
@@ -0,0 +1,228 @@
+# app/core/migrations.py
+"""
+Версіоновані міграції схеми для обох бекендів (PostgreSQL / SQLite).
+
+Стан зберігається в schema_version (по рядку на застосований крок). На старті —
+один SELECT MAX(version); якщо схема актуальна, більше нічого не робимо. Інакше
+кроки застосовуються по черзі, кожен у своїй транзакції, під advisory-lock (PG)
+або BEGIN IMMEDIATE (SQLite), тож одночасний старт кількох реплік безпечний:
+одна мігрує, решта чекають і бачать уже нову версію.
+
+Новий крок — лише додати запис у кінець MIGRATIONS (версії не перевикористовувати).
+Кроки ідемпотентні щодо баз, створених до появи schema_version.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from typing import Callable, List, NamedTuple
+
+log = logging.getLogger(__name__)
+
+# advisory-lock для міграцій (окремий від локів лідера/шардів)
+MIGRATION_LOCK_KEY = int(os.getenv("MIGRATION_LOCK_KEY", "1835624306"))  # 'migr'
+
+DDL_SCHEMA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+  version     INTEGER PRIMARY KEY,
+  name        TEXT NOT NULL,
+  applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    pg: Callable[[object], None]
+    sqlite: Callable[[sqlite3.Connection], None]
+
+
+# ---------- helpers ----------
+
+def _pg_exec(*stmts: str) -> Callable[[object], None]:
+    def run(conn) -> None:
+        with conn.cursor() as cur:
+            for st in stmts:
+                cur.execute(st)
+    return run
+
+
+def _sqlite_exec(*stmts: str) -> Callable[[sqlite3.Connection], None]:
+    def run(conn: sqlite3.Connection) -> None:
+        for st in stmts:
+            conn.execute(st)
+    return run
+
+
+def _sqlite_add_columns(*cols: tuple[str, str]) -> Callable[[sqlite3.Connection], None]:
+    """ALTER TABLE subscriptions ADD COLUMN лише для відсутніх колонок (SQLite не має IF NOT EXISTS)."""
+    def run(conn: sqlite3.Connection) -> None:
+        have = {r[1] for r in conn.execute("PRAGMA table_info(subscriptions)").fetchall()}
+        for name, decl in cols:
+            if name not in have:
+                conn.execute(f"ALTER TABLE subscriptions ADD COLUMN {name} {decl}")
+    return run
+
+
+def _pg_add_columns(*cols: tuple[str, str]) -> Callable[[object], None]:
+    return _pg_exec(*(f"ALTER TABLE subscriptions ADD COLUMN IF NOT EXISTS {n} {d}" for n, d in cols))
+
+
+def _chain(*steps: Callable) -> Callable:
+    """Кілька кроків одного бекенду в одній міграції (в її транзакції)."""
+    def run(conn) -> None:
+        for step in steps:
+            step(conn)
+    return run
+
+
+# ---------- steps ----------
+
+_SUBS_BASE = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+  user_id                BIGINT NOT NULL,
+  chat_id                BIGINT NOT NULL,
+  impact_filter          TEXT   NOT NULL DEFAULT 'High,Medium',
+  countries_filter       TEXT   NOT NULL DEFAULT '',
+  alert_minutes          INTEGER NOT NULL DEFAULT 30,
+  daily_time             TEXT   NOT NULL DEFAULT '09:00',
+  lang_mode              TEXT   NOT NULL DEFAULT 'en',
+  out_chat_id            BIGINT,
+  PRIMARY KEY (user_id, chat_id)
+);
+"""
+
+_SENT_SQLITE = """
+CREATE TABLE IF NOT EXISTS sent_log (
+  chat_id     BIGINT NOT NULL,
+  ev_hash     TEXT   NOT NULL,
+  kind        TEXT   NOT NULL, -- 'alert' | 'digest' | etc
+  created_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (chat_id, ev_hash, kind)
+);
+"""
+
+_SENT_PG = """
+CREATE TABLE IF NOT EXISTS sent_log (
+  chat_id     BIGINT NOT NULL,
+  ev_hash     TEXT   NOT NULL,
+  kind        TEXT   NOT NULL,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (chat_id, ev_hash, kind)
+);
+"""
+
+_CACHE_SQLITE = """
+CREATE TABLE IF NOT EXISTS events_cache (
+  cache_key  TEXT PRIMARY KEY,
+  payload    TEXT NOT NULL,
+  expires_at TIMESTAMP NOT NULL
+);
+"""
+
+_CACHE_PG = _CACHE_SQLITE.replace("TIMESTAMP NOT NULL", "TIMESTAMPTZ NOT NULL")
+
+_METALS_COLS = (
+    ("metals_impact_filter", "TEXT NOT NULL DEFAULT ''"),
+    ("metals_countries_filter", "TEXT NOT NULL DEFAULT ''"),
+    ("metals_alert_minutes", "INTEGER NOT NULL DEFAULT 30"),
+)
+_CATEGORIES_COL = (("categories_filter", "TEXT DEFAULT ''"),)
+_METALS_DAILY_COL = (("metals_daily_time", "TEXT NOT NULL DEFAULT ''"),)
+_SENT_IDX = "CREATE INDEX IF NOT EXISTS idx_sent_log_created_at ON sent_log (created_at)"
+# metals_alert_minutes має DEFAULT 30, тож вибір пресету від дефолту не відрізнити —
+# окремий прапорець, який ставить UI металів; наявних користувачів металів вмикаємо
+_METALS_ALERTS_COL = (("metals_alerts_on", "INTEGER NOT NULL DEFAULT 0"),)
+_METALS_ALERTS_BACKFILL = (
+    "UPDATE subscriptions SET metals_alerts_on = 1 WHERE metals_impact_filter <> '' "
+    "OR metals_countries_filter <> '' OR metals_alert_minutes <> 30"
+)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "base tables",
+              _pg_exec(_SUBS_BASE, _SENT_PG, _CACHE_PG),
+              _sqlite_exec(_SUBS_BASE, _SENT_SQLITE, _CACHE_SQLITE)),
+    Migration(2, "subscriptions.categories_filter",
+              _pg_add_columns(*_CATEGORIES_COL), _sqlite_add_columns(*_CATEGORIES_COL)),
+    Migration(3, "subscriptions.metals_* filters",
+              _pg_add_columns(*_METALS_COLS), _sqlite_add_columns(*_METALS_COLS)),
+    Migration(4, "subscriptions.metals_daily_time",
+              _pg_add_columns(*_METALS_DAILY_COL), _sqlite_add_columns(*_METALS_DAILY_COL)),
+    Migration(5, "sent_log.created_at index",
+              _pg_exec(_SENT_IDX), _sqlite_exec(_SENT_IDX)),
+    Migration(6, "subscriptions.metals_alerts_on",
+              _chain(_pg_add_columns(*_METALS_ALERTS_COL), _pg_exec(_METALS_ALERTS_BACKFILL)),
+              _chain(_sqlite_add_columns(*_METALS_ALERTS_COL), _sqlite_exec(_METALS_ALERTS_BACKFILL))),
+]
+
+LATEST = MIGRATIONS[-1].version
+
+
+# ---------- runners ----------
+
+def _current_pg(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            return 0
+        cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return int(cur.fetchone()[0])
+
+
+def migrate_pg(conn) -> int:
+    """Доводить схему PG до LATEST. conn — autocommit-з'єднання psycopg."""
+    if _current_pg(conn) >= LATEST:
+        return LATEST
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+    try:
+        with conn.cursor() as cur:
+            cur.execute(DDL_SCHEMA_VERSION)
+        current = _current_pg(conn)  # могли вже змігрувати, поки чекали лок
+        for m in MIGRATIONS:
+            if m.version <= current:
+                continue
+            with conn.transaction():
+                m.pg(conn)
+                with conn.cursor() as cur:
+                    cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (m.version, m.name))
+            log.info(f"[migrations] pg: applied {m.version} ({m.name})")
+            current = m.version
+        return current
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+
+
+def _current_sqlite(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'").fetchone()
+    if not row:
+        return 0
+    return int(conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0])
+
+
+def migrate_sqlite(conn: sqlite3.Connection) -> int:
+    """Доводить схему SQLite до LATEST. conn — з isolation_level=None (ручні транзакції)."""
+    if _current_sqlite(conn) >= LATEST:
+        return LATEST
+    conn.execute(DDL_SCHEMA_VERSION)
+    current = _current_sqlite(conn)
+    for m in MIGRATIONS:
+        if m.version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")  # блокує інших писачів на час кроку
+        try:
+            if _current_sqlite(conn) >= m.version:
+                conn.execute("COMMIT")
+                continue
+            m.sqlite(conn)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (m.version, m.name))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        log.info(f"[migrations] sqlite: applied {m.version} ({m.name})")
+        current = m.version
+    return current
@@ -1,7 +1,7 @@
 # app/core/models.py
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 @dataclass
 class FFEvent:
@@ -28,3 +28,26 @@ class MMEvent:
     previous: str | None = None
     date_label: str = "" 
     source: str = "MetalsMine (offline)"
+
+@dataclass(frozen=True)
+class EventFilter:
+    """
+    Нормалізований фільтр подій FF (impact / валюта / категорія).
+    Порожній кортеж = не фільтруємо за цим критерієм.
+    Frozen → хешується, тож його можна використовувати як ключ кешу.
+    """
+    impacts: Tuple[str, ...] = ()
+    countries: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+
+@dataclass(frozen=True)
+class EventChange:
+    """
+    Зміна події між двома послідовними payload thisweek.json.
+    kind: 'actual' (опубліковано фактичне значення) | 'forecast' (переглянуто прогноз)
+          | 'time' (подію перенесено).
+    """
+    kind: str
+    event: FFEvent          # новий стан події
+    old: Optional[str]
+    new: Optional[str]
@@ -1,113 +1,208 @@
 # app/core/scheduler.py
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
+from typing import Any, Dict, List
 from aiogram import Bot
 
 from ..config.settings import LOCAL_TZ, DEFAULT_ALERT_MINUTES, POLL_INTERVAL_SECONDS, UTC
-from .database import get_all_subs, mark_sent, was_sent
-from ..services.forex_client import fetch_calendar
-from ..ui.filters import filter_events
+from .database import claim_sent, get_all_subs, unmark_sent
+from .metals_alerts import send_metals_alerts
+from .metals_digest import send_metals_digests
+from .models import FFEvent
+from ..services.event_index import EventIndex
+from ..services.ff_diff import released
+from ..services.forex_client import drain_changes, get_events_index, requeue_changes
+from ..ui.filters import filter_events, make_filter
 from ..ui.formatting import event_to_text, event_hash
 from ..utils.helpers import csv_to_list, chunk
+from ..utils.metrics import counter, gauge, histogram
 
 log = logging.getLogger(__name__)
 
-async def scheduler(bot: Bot):
+# Стан шарда для логів/метрик: хто ми, скільки підписників, тривалість і запізнення тіку
+SCHEDULER_STATS: Dict[str, Any] = {
+    "shard": 0, "shards": 1, "subs": 0, "ticks": 0,
+    "last_tick_seconds": 0.0, "lag_seconds": 0.0, "last_tick_at": None,
+}
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    return dict(SCHEDULER_STATS)
+
+TICK_SECONDS = histogram("scheduler_tick_seconds", "scheduler tick duration")
+EVENTS_EVALUATED = counter("scheduler_events_evaluated_total", "events matched by subscriber filters and checked against sent_log", ("kind",))
+ALERTS_DUE = counter("scheduler_alerts_due_total", "notifications due (not sent yet)", ("kind",))
+ALERTS_SENT = counter("scheduler_alerts_sent_total", "notifications delivered", ("kind",))
+SCHEDULER_SUBS = gauge("scheduler_subs", "subscriptions in the shard at its last tick", ("shard",))
+SCHEDULER_LAG = gauge("scheduler_lag_seconds", "how late the shard's last tick started", ("shard",))
+
+async def run_tick(bot: Bot, index: EventIndex, subs: List[Dict[str, Any]], fresh: List[FFEvent], now_utc: datetime) -> None:
+    """
+    Один прохід по підписках: алерти, released, дайджести, метали.
+    Без сну, fetch і читання БД підписок — їх робить scheduler(); окремо від циклу,
+    щоб тік можна було прогнати напряму (benchmarks/).
+    """
+    for sub in subs:
+        impacts = csv_to_list(sub["impact_filter"]) or ["High", "Medium"]
+        countries = csv_to_list(sub["countries_filter"]) or []
+        alert_minutes = int(sub["alert_minutes"]) or DEFAULT_ALERT_MINUTES
+        out_chat = sub["out_chat_id"] or sub["chat_id"]
+        lang_mode = sub["lang_mode"] if "lang_mode" in sub.keys() else "en"
+
+        # ------- Alerts N хв до події -------
+        ahead = now_utc + timedelta(minutes=alert_minutes)
+        cats = csv_to_list(sub.get("categories_filter", ""))
+        filters = make_filter(impacts, countries, cats)
+        # ±120 секунд (включно), щоб не пропускати через тік сну
+        due = index.query(
+            ahead - timedelta(seconds=120),
+            ahead + timedelta(seconds=120, microseconds=1),
+            filters,
+        )
+        EVENTS_EVALUATED.inc(len(due), kind="alert")
+        for ev in due:
+            evh = event_hash(ev)
+            if claim_sent(out_chat, evh, "alert"):
+                ALERTS_DUE.inc(kind="alert")
+                try:
+                    await bot.send_message(
+                        out_chat,
+                        event_to_text(ev, LOCAL_TZ, lang_mode),
+                        parse_mode="HTML",
+                        disable_web_page_preview=True,
+                    )
+                    ALERTS_SENT.inc(kind="alert")
+                except Exception:
+                    # не валимо цикл розсилки, якщо чат недоступний тощо; наступний тік спробує знову
+                    unmark_sent(out_chat, evh, "alert")
+
+        # ------- Released: опубліковано actual -------
+        if fresh:
+            hdr = "📢 <b>Опубліковано</b>\n" if lang_mode == "ua" else "📢 <b>Released</b>\n"
+            matched = filter_events(fresh, filters.impacts, filters.countries, filters.categories)
+            EVENTS_EVALUATED.inc(len(matched), kind="release")
+            for ev in matched:
+                evh = event_hash(ev)
+                if claim_sent(out_chat, evh, "release"):
+                    ALERTS_DUE.inc(kind="release")
+                    try:
+                        await bot.send_message(
+                            out_chat,
+                            hdr + event_to_text(ev, LOCAL_TZ, lang_mode),
+                            parse_mode="HTML",
+                            disable_web_page_preview=True,
+                        )
+                        ALERTS_SENT.inc(kind="release")
+                    except Exception:
+                        unmark_sent(out_chat, evh, "release")
+
+        # ------- Daily digest у локальний час користувача -------
+        try:
+            hh, mm = map(int, str(sub["daily_time"]).split(":"))
+        except Exception:
+            hh, mm = 9, 0
+        now_local = datetime.now(LOCAL_TZ)
+        digest_key = f"digest-{now_local:%Y-%m-%d}"
+        if now_local.hour == hh and now_local.minute == mm:
+            if claim_sent(out_chat, "__digest__", digest_key):
+                ALERTS_DUE.inc(kind="digest")
+                start = now_local.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(UTC)
+                end = start + timedelta(days=1)
+                filtered = index.query(start, end, filters)
+                EVENTS_EVALUATED.inc(len(filtered), kind="digest")
+                if filtered:
+                    for ch in chunk(filtered, 8):
+                        try:
+                            await bot.send_message(
+                                out_chat,
+                                "\n\n".join(event_to_text(e, LOCAL_TZ, lang_mode) for e in ch),
+                                parse_mode="HTML",
+                                disable_web_page_preview=True,
+                            )
+                        except Exception:
+                            pass
+                else:
+                    try:
+                        await bot.send_message(out_chat, "Сьогодні подій за вашими фільтрами немає.")
+                    except Exception:
+                        pass
+                ALERTS_SENT.inc(kind="digest")
+
+    # ------- Metals alerts (один розбір файлу на версію) -------
+    await send_metals_alerts(bot, subs, now_utc)
+    await send_metals_digests(bot, subs, now_utc)
+
+
+async def scheduler(bot: Bot, shard: int = 0, shards: int = 1):
     """
     Періодичний планувальник:
-    - оновлює кеш подій раз на 10 хв;
+    - читає поточний знімок подій від власника кешу (forex_client), без власного fetch;
     - шле алерти за N хв до події;
-    - щоденний дайджест у вказаний час.
+    - шле одноразовий «released» пуш, коли FF публікує actual;
+    - шле алерти по металах за metals_alert_minutes (metals_week.html);
+    - щоденний дайджест у вказаний час (forex і, окремо, метали).
+    shards > 1 → обробляє лише свою партицію підписок (чат доставки % shards == shard).
     Акуратно завершується при скасуванні (Ctrl+C / SIGTERM) без трейсбеку.
     """
     # Невелика затримка, щоб не стартувати одночасно з полінгом
     await asyncio.sleep(2)
 
-    cached = []
-    last_fetch = datetime.min.replace(tzinfo=UTC)
+    seen_version = 0
+    tag = f"scheduler[{shard}/{shards}]"
+    SCHEDULER_STATS.update(shard=shard, shards=shards, ticks=0)
+    due_at = time.monotonic()
 
-    log.info("scheduler: started")
+    log.info("%s: started", tag)
     try:
         while True:
+            t0 = time.monotonic()
+            lag = max(0.0, t0 - due_at)
+            changes = []
             try:
                 now_utc = datetime.now(UTC)
 
-                # refresh cache every 10 min
-                if (now_utc - last_fetch) > timedelta(minutes=10):
-                    # Базово тягнемо 'en' (переклад робиться в інших місцях, якщо треба)
-                    cached = await fetch_calendar(lang="en")
-                    last_fetch = now_utc
-
-                for sub in get_all_subs():
-                    impacts = csv_to_list(sub["impact_filter"]) or ["High", "Medium"]
-                    countries = csv_to_list(sub["countries_filter"]) or []
-                    alert_minutes = int(sub["alert_minutes"]) or DEFAULT_ALERT_MINUTES
-                    out_chat = sub["out_chat_id"] or sub["chat_id"]
-                    lang_mode = sub["lang_mode"] if "lang_mode" in sub.keys() else "en"
-
-                    # ------- Alerts N хв до події -------
-                    ahead = now_utc + timedelta(minutes=alert_minutes)
-                    cats = csv_to_list(sub.get("categories_filter", ""))
-                    for ev in filter_events(cached, impacts, countries, cats):
-                        # ±120 секунд, щоб не пропускати через тік сну
-                        if abs((ev.date - ahead).total_seconds()) <= 120:
-                            evh = event_hash(ev)
-                            if not was_sent(out_chat, evh, "alert"):
-                                try:
-                                    await bot.send_message(
-                                        out_chat,
-                                        event_to_text(ev, LOCAL_TZ, lang_mode),
-                                        parse_mode="HTML",
-                                        disable_web_page_preview=True,
-                                    )
-                                    mark_sent(out_chat, evh, "alert")
-                                except Exception:
-                                    # не валимо цикл розсилки, якщо чат недоступний тощо
-                                    pass
-
-                    # ------- Daily digest у локальний час користувача -------
-                    try:
-                        hh, mm = map(int, str(sub["daily_time"]).split(":"))
-                    except Exception:
-                        hh, mm = 9, 0
-                    now_local = datetime.now(LOCAL_TZ)
-                    digest_key = f"digest-{now_local:%Y-%m-%d}"
-                    if now_local.hour == hh and now_local.minute == mm:
-                        if not was_sent(out_chat, "__digest__", digest_key):
-                            start = now_local.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(UTC)
-                            end = start + timedelta(days=1)
-                            todays = [e for e in cached if start <= e.date < end]
-                            cats = csv_to_list(sub.get("categories_filter", ""))
-                            filtered = filter_events(todays, impacts, countries, cats)
-                            if filtered:
-                                for ch in chunk(filtered, 8):
-                                    try:
-                                        await bot.send_message(
-                                            out_chat,
-                                            "\n\n".join(event_to_text(e, LOCAL_TZ, lang_mode) for e in ch),
-                                            parse_mode="HTML",
-                                            disable_web_page_preview=True,
-                                        )
-                                    except Exception:
-                                        pass
-                            else:
-                                try:
-                                    await bot.send_message(out_chat, "Сьогодні подій за вашими фільтрами немає.")
-                                except Exception:
-                                    pass
-                            mark_sent(out_chat, "__digest__", digest_key)
+                # знімок публікує власник кешу; тут лише беремо поточну версію ('en')
+                index = await get_events_index(lang="en")
+                if index.version != seen_version:
+                    log.info("scheduler: using FF snapshot v%d (%d events)", index.version, len(index))
+                    seen_version = index.version
+
+                # події, для яких з минулого тіку з'явилось actual (тільки дифф, без перескану)
+                # при помилці тіку повертаються в чергу (повтор released — через sent_log)
+                changes = drain_changes()
+                fresh = released(changes)
+
+                subs = get_all_subs(shard, shards)
+                await run_tick(bot, index, subs, fresh, now_utc)
+
+                took = time.monotonic() - t0
+                TICK_SECONDS.observe(took)
+                SCHEDULER_STATS.update(
+                    subs=len(subs), ticks=SCHEDULER_STATS["ticks"] + 1,
+                    last_tick_seconds=round(took, 3), lag_seconds=round(lag, 3),
+                    last_tick_at=now_utc.isoformat(),
+                )
+                SCHEDULER_SUBS.set(len(subs), shard=shard)
+                SCHEDULER_LAG.set(lag, shard=shard)
+                log.debug("%s: tick subs=%d took=%.2fs lag=%.2fs", tag, len(subs), took, lag)
 
             except Exception as e:
                 # Логуємо, але не падаємо з планувальника
-                log.exception(f"scheduler: unexpected error: {e}")
+                log.exception(f"{tag}: unexpected error: {e}")
+                if changes:
+                    requeue_changes(changes)
 
             # Основний інтервал опитування
+            due_at = time.monotonic() + POLL_INTERVAL_SECONDS
             await asyncio.sleep(POLL_INTERVAL_SECONDS)
 
     except asyncio.CancelledError:
         # М'який вихід при Ctrl+C / SIGTERM
-        log.info("scheduler: cancellation received, exiting loop gracefully.")
+        log.info("%s: cancellation received, exiting loop gracefully.", tag)
         return
     finally:
-        log.info("scheduler: stopped")
+        # шард могли забрати в іншому процесі — не лишаємо застиглих серій
+        SCHEDULER_SUBS.remove(shard=shard)
+        SCHEDULER_LAG.remove(shard=shard)
+        log.info("%s: stopped", tag)
@@ -0,0 +1,82 @@
+# app/handlers/admin.py
+"""
+Службові команди лише для ADMIN_IDS (для решти — ніби команди немає):
+  /profile [секунд] [sample|cprofile] — профіль живого loop-а, файл приходить документом
+  /loopdebug [секунд] [мс]            — loop debug: повільні callback-и за вікно
+Обидві повертаються одразу, результат надсилається по завершенню.
+"""
+from __future__ import annotations
+
+import html
+import logging
+from typing import Any, Dict
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import FSInputFile, Message
+
+from ..config.settings import ADMIN_IDS, PROFILE_SIGNAL_SECONDS, SLOW_CALLBACK_MS
+from ..utils.profiler import start_loop_debug, start_profile
+
+log = logging.getLogger(__name__)
+
+router = Router()
+router.message.filter(F.from_user.id.in_(ADMIN_IDS))
+
+
+def _args(command: CommandObject) -> list[str]:
+    return (command.args or "").split()
+
+
+def _num(s: str, default: float) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        return default
+
+
+@router.message(Command("profile"))
+async def cmd_profile(m: Message, command: CommandObject):
+    args = _args(command)
+    seconds = _num(args[0], PROFILE_SIGNAL_SECONDS) if args else PROFILE_SIGNAL_SECONDS
+    mode = "cprofile" if "cprofile" in args else "sample"
+
+    async def done(result: Dict[str, Any]) -> None:
+        if "error" in result:
+            await m.answer(f"⚠️ Profile failed: {html.escape(result['error'])}")
+            return
+        top = "\n".join(result["top"][:10])
+        extra = f", {result['samples']} samples" if "samples" in result else ""
+        await m.answer_document(
+            FSInputFile(result["path"]),
+            caption=f"🔬 {mode} {result['seconds']}s{extra}\n<pre>{html.escape(top)[:900]}</pre>",
+        )
+
+    if not start_profile(seconds, mode, on_done=done):
+        await m.answer("⏳ Profile is already running")
+        return
+    log.warning("[admin] /profile %s %.0fs by %s", mode, seconds, m.from_user.id)
+    await m.answer(f"🔬 {mode} profile started ({seconds:.0f}s)")
+
+
+@router.message(Command("loopdebug"))
+async def cmd_loopdebug(m: Message, command: CommandObject):
+    args = _args(command)
+    seconds = _num(args[0], PROFILE_SIGNAL_SECONDS) if args else PROFILE_SIGNAL_SECONDS
+    slow_ms = _num(args[1], SLOW_CALLBACK_MS) if len(args) > 1 else SLOW_CALLBACK_MS
+
+    async def done(result: Dict[str, Any]) -> None:
+        if "error" in result:
+            await m.answer(f"⚠️ Loop debug failed: {html.escape(result['error'])}")
+            return
+        worst = "\n".join(result["worst"]) or "—"
+        await m.answer(
+            f"🐢 {result['slow_callbacks']} callback(s) ≥ {result['slow_ms']:.0f} ms in {result['seconds']:.0f}s\n"
+            f"<pre>{html.escape(worst)[:3500]}</pre>"
+        )
+
+    if not start_loop_debug(seconds, slow_ms, on_done=done):
+        await m.answer("⏳ Loop debug is already on")
+        return
+    log.warning("[admin] /loopdebug %.0fs ≥%.0fms by %s", seconds, slow_ms, m.from_user.id)
+    await m.answer(f"🐢 Loop debug on ({seconds:.0f}s, slow ≥ {slow_ms:.0f} ms)")
@@ -14,8 +14,8 @@ from aiogram.types import CallbackQuery
 from ..config.settings import LOCAL_TZ, UTC
 from ..config.topics import TOPIC_DEFS, TOPIC_EXPLAINERS, METALS_TOPIC_DEFS, METALS_TOPIC_EXPLAINERS
 from ..services.translator import UA_DICT, METALS_DICT
-from ..services.forex_client import get_events_thisweek_cached as fetch_calendar
-from ..ui.filters import filter_events, normalize_impact
+from ..services.forex_client import query as query_events
+from ..ui.filters import make_filter
 from ..ui.formatting import event_to_text
 from ..utils.helpers import csv_to_list, chunk
 from ..ui.keyboards import (
@@ -30,14 +30,12 @@ from ..ui.keyboards import (
     metals_main_menu_kb,
     metals_topics_kb,
     back_to_metals_topics_kb,
-    metals_alerts_presets_kb
+    metals_alerts_presets_kb,
+    metals_daily_time_kb,
 )
 from ..core.database import ensure_sub, get_sub, unsubscribe, set_sub
-from ..services.metals_parser import (
-    load_today_from_file,
-    load_week_from_file,
-    mm_event_to_card_text
-)
+from ..services.metals_parser import mm_event_to_card_text
+from ..services.metals_store import get_today_snapshot_async, metals_signature
 from ..ui.metals_render import build_grouped_blocks
 
 router = Router()
@@ -288,16 +286,10 @@ async def _send_weekly_summary(m, subs: dict):
     subs = _rowdict(subs)
     lang = _lang(subs)
 
-    impacts_raw = csv_to_list(subs.get("impact_filter", ""))
-    impacts = [normalize_impact(x) for x in impacts_raw if normalize_impact(x)]
-    countries = csv_to_list(subs.get("countries_filter", ""))
-
-    try:
-        events = await fetch_calendar(lang=lang)
-    except Exception as e:
-        log.exception("[weekly] load events failed: %s", e)
-        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
-        return
+    filters = make_filter(
+        csv_to_list(subs.get("impact_filter", "")),
+        csv_to_list(subs.get("countries_filter", "")),
+    )
 
     # межі тижня
     now_local = datetime.now(LOCAL_TZ)
@@ -305,10 +297,13 @@ async def _send_weekly_summary(m, subs: dict):
     start_utc = sunday_local.astimezone(UTC)
     end_utc = next_sunday_local.astimezone(UTC)
 
-    # вікно тижня, фільтри
-    in_window = [e for e in events if start_utc <= e.date < end_utc]
-    filtered = filter_events(in_window, impacts, countries)
-    filtered.sort(key=lambda e: e.date)
+    # вікно тижня + фільтри (бісекція по кешу, вже відсортовано за датою)
+    try:
+        filtered = await query_events(start_utc, end_utc, filters, lang=lang)
+    except Exception as e:
+        log.exception("[weekly] load events failed: %s", e)
+        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
+        return
 
     # віддати кілька повідомлень, якщо текст довгий
     for chunk_txt in _weekly_summary_text(filtered, lang):
@@ -323,31 +318,29 @@ async def _send_today(m, subs: dict):
     subs = _rowdict(subs)
     lang = _lang(subs)
 
-    impacts = csv_to_list(subs.get("impact_filter", ""))
-    countries = csv_to_list(subs.get("countries_filter", ""))
+    filters = make_filter(
+        csv_to_list(subs.get("impact_filter", "")),
+        csv_to_list(subs.get("countries_filter", "")),
+    )
 
     log.info("🟢 [_send_today] forex only | impacts=%s | countries=%s",
              subs.get("impact_filter"), subs.get("countries_filter"))
 
-    try:
-        events = await fetch_calendar(lang=lang)
-    except Exception as e:
-        log.exception("[today] load events failed: %s", e)
-        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
-        return
-
     now_local = datetime.now(LOCAL_TZ)
     start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
     end_local = start_local + timedelta(days=1)
     start_utc = start_local.astimezone(UTC)
     end_utc = end_local.astimezone(UTC)
 
-    in_window = [e for e in events if start_utc <= e.date < end_utc]
-    log.debug("[today/forex] window %s..%s, all=%d, in_window=%d",
-              start_utc.isoformat(), end_utc.isoformat(), len(events), len(in_window))
+    try:
+        filtered = await query_events(start_utc, end_utc, filters, lang=lang)
+    except Exception as e:
+        log.exception("[today] load events failed: %s", e)
+        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
+        return
 
-    filtered = filter_events(in_window, impacts, countries)
-    filtered.sort(key=lambda e: e.date)
+    log.debug("[today/forex] window %s..%s, filtered=%d",
+              start_utc.isoformat(), end_utc.isoformat(), len(filtered))
 
     if not filtered:
         await m.answer(_t_en_ua(lang, "Today: no events match your filters.", "Сьогодні: подій за вашими фільтрами немає."))
@@ -366,20 +359,14 @@ async def _send_week(m, subs: dict):
     subs = _rowdict(subs)
     lang = _lang(subs)
 
-    impacts_raw = csv_to_list(subs.get("impact_filter", ""))
-    impacts = [normalize_impact(x) for x in impacts_raw if normalize_impact(x)]
-    countries = csv_to_list(subs.get("countries_filter", ""))
+    filters = make_filter(
+        csv_to_list(subs.get("impact_filter", "")),
+        csv_to_list(subs.get("countries_filter", "")),
+    )
 
     log.info("🟣 [_send_week] forex only | impacts=%s | countries=%s",
              subs.get("impact_filter"), subs.get("countries_filter"))
 
-    try:
-        events = await fetch_calendar(lang=lang)
-    except Exception as e:
-        log.exception("[week] load events failed: %s", e)
-        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
-        return
-
     # Sunday→Sunday в LOCAL_TZ
     now_local = datetime.now(LOCAL_TZ)
     delta_days = (now_local.weekday() + 1) % 7  # Sun=0
@@ -391,12 +378,15 @@ async def _send_week(m, subs: dict):
     start_utc = sunday_local.astimezone(UTC)
     end_utc = next_sunday_local.astimezone(UTC)
 
-    in_window = [e for e in events if start_utc <= e.date < end_utc]
-    log.debug("[week/forex] window %s..%s, all=%d, in_window=%d",
-              start_utc.isoformat(), end_utc.isoformat(), len(events), len(in_window))
+    try:
+        filtered = await query_events(start_utc, end_utc, filters, lang=lang)
+    except Exception as e:
+        log.exception("[week] load events failed: %s", e)
+        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
+        return
 
-    filtered = filter_events(in_window, impacts, countries)
-    filtered.sort(key=lambda e: e.date)
+    log.debug("[week/forex] window %s..%s, filtered=%d",
+              start_utc.isoformat(), end_utc.isoformat(), len(filtered))
 
     if not filtered:
         await m.answer(_t_en_ua(lang, "This week: no events match your filters.", "Цього тижня подій за вашими фільтрами немає."))
@@ -643,7 +633,10 @@ async def menu_subscribe(c: CallbackQuery):
 async def cb_sub_set(c: CallbackQuery):
     subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
     lang = _lang(subs)
-    t = c.data.split(":", 2)[2]
+    parts = c.data.split(":", 2)
+    if len(parts) < 3:
+        return await c.answer()
+    t = parts[2]
     if not re.fullmatch(r"\d{2}:\d{2}", t):
         return await c.answer(_t_en_ua(lang, "Invalid time", "Некоректний час"))
     set_sub(c.from_user.id, c.message.chat.id, daily_time=t)
@@ -794,7 +787,9 @@ async def cb_metals_today(c: CallbackQuery):
 
     # читаємо події
     try:
-        events = load_today_from_file(METALS_TODAY_HTML)
+        snap = await get_today_snapshot_async()
+        if snap is None:
+            raise FileNotFoundError(f"Metals HTML not found or empty: {METALS_TODAY_HTML}")
     except Exception as e:
         await c.message.answer(_t_en_ua(lang,
             f"Metals (offline) parse error: {e}",
@@ -803,10 +798,9 @@ async def cb_metals_today(c: CallbackQuery):
         return
 
     # Apply metals filters
-    from ..ui.filters import filter_metals_events
     impacts = csv_to_list(subs.get("metals_impact_filter", ""))
     countries = csv_to_list(subs.get("metals_countries_filter", ""))
-    filtered = filter_metals_events(events, impacts, countries)
+    filtered = snap.filtered(metals_signature(impacts, countries))
 
     if not filtered:
         await c.message.answer(
@@ -867,7 +861,7 @@ async def cb_metals_alert_preset(c: CallbackQuery):
     except Exception:
         return await c.answer(_t_en_ua(lang, "Invalid value", "Некоректне значення"))
     
-    set_sub(c.from_user.id, c.message.chat.id, metals_alert_minutes=val)
+    set_sub(c.from_user.id, c.message.chat.id, metals_alert_minutes=val, metals_alerts_on=1)
     
     subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
     
@@ -905,7 +899,7 @@ async def cb_metals_impact(c: CallbackQuery):
         impacts.remove(val)
     else:
         impacts.add(val)
-    set_sub(c.from_user.id, c.message.chat.id, metals_impact_filter=",".join(sorted(impacts)))
+    set_sub(c.from_user.id, c.message.chat.id, metals_impact_filter=",".join(sorted(impacts)), metals_alerts_on=1)
 
     subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
     from ..ui.keyboards import metals_settings_kb
@@ -929,7 +923,7 @@ async def cb_metals_country(c: CallbackQuery):
         countries.remove(val)
     else:
         countries.add(val)
-    set_sub(c.from_user.id, c.message.chat.id, metals_countries_filter=",".join(sorted(countries)))
+    set_sub(c.from_user.id, c.message.chat.id, metals_countries_filter=",".join(sorted(countries)), metals_alerts_on=1)
 
     subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
     from ..ui.keyboards import metals_settings_kb
@@ -981,9 +975,37 @@ async def cb_metals_reset(c: CallbackQuery):
 @router.callback_query(F.data == "metals:daily")
 async def cb_metals_daily(c: CallbackQuery):
     subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
+    if not subs:
+        ensure_sub(c.from_user.id, c.message.chat.id)
+        subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
     lang = _lang(subs)
-    await c.message.edit_text(_t_en_ua(lang, "Daily digest for Metals — coming soon.", "Щоденний дайджест для Металів — скоро."),
-                              reply_markup=metals_main_menu_kb(lang=lang, back_to_root=True))
+    cur = subs.get("metals_daily_time") or ""
+    presets = ["07:00", "08:00", "09:00", "10:00", "12:00", "15:00", "18:00", "21:00"]
+    await c.message.edit_text(
+        _t_en_ua(lang,
+                 f"🕰 Metals daily digest (current: {cur or 'off'}):",
+                 f"🕰 Щоденний дайджест по металах (зараз: {cur or 'вимкнено'}):"),
+        reply_markup=metals_daily_time_kb(presets, cur, lang=lang),
+    )
+    await c.answer()
+
+@router.callback_query(F.data.startswith("metals_sub:"))
+async def cb_metals_sub(c: CallbackQuery):
+    subs = _rowdict(get_sub(c.from_user.id, c.message.chat.id))
+    lang = _lang(subs)
+    if c.data == "metals_sub:off":
+        set_sub(c.from_user.id, c.message.chat.id, metals_daily_time="")
+        text = _t_en_ua(lang, "🚫 Metals daily digest is off.", "🚫 Дайджест по металах вимкнено.")
+    else:
+        parts = c.data.split(":", 2)  # metals_sub:set:HH:MM
+        if len(parts) < 3 or parts[1] != "set":
+            return await c.answer()
+        t = parts[2]
+        if not re.fullmatch(r"\d{2}:\d{2}", t):
+            return await c.answer(_t_en_ua(lang, "Invalid time", "Некоректний час"))
+        set_sub(c.from_user.id, c.message.chat.id, metals_daily_time=t)
+        text = _t_en_ua(lang, f"✅ Metals daily digest at {t}.", f"✅ Дайджест по металах о {t}.")
+    await c.message.edit_text(text, reply_markup=metals_main_menu_kb(lang=lang, back_to_root=True))
     await c.answer()
 
 @router.callback_query(F.data == "metals:week")
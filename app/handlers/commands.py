@@ -3,30 +3,27 @@ from __future__ import annotations
 
 import logging
 import os
-from pathlib import Path
+import time
 from datetime import datetime, timedelta
 
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from ..config.settings import LOCAL_TZ, UTC
+from ..config.settings import ADMIN_IDS, FF_REFRESH_COOLDOWN, LOCAL_TZ, UTC
 from ..config.topics import TOPIC_DEFS, TOPIC_EXPLAINERS
 from ..services.translator import UA_DICT
-from ..services.forex_client import get_events_thisweek_cached as fetch_calendar
-from ..ui.filters import filter_events, normalize_impact
+from ..services.forex_client import query as query_events
+from ..ui.filters import make_filter
 from ..ui.formatting import event_to_text
-from ..utils.helpers import csv_to_list, chunk
+from ..utils.helpers import csv_to_list, chunk, resolve_data_path
 from ..ui.keyboards import (
     back_kb,
     root_menu_kb, 
 )
 from ..core.database import ensure_sub, get_sub
-from ..services.metals_parser import (
-    load_today_from_file,
-    load_week_from_file,
-    mm_event_to_card_text
-)
+from ..services.metals_parser import mm_event_to_card_text
+from ..services.metals_store import get_today_snapshot_async, get_week_snapshot_async, metals_signature
 
 router = Router()
 log = logging.getLogger(__name__)
@@ -43,26 +40,6 @@ METALS_WEEK_HTML_PATH = os.getenv("METALS_WEEK_HTML_PATH", "/data/metals_week.ht
 
 # --------------------------- helpers ---------------------------
 
-def resolve_data_path(filename: str) -> str:
-    """
-    Повертає коректний шлях до файлу:
-    - локально: ./data/<file>
-    - на Render: /data/<file>
-    """
-    # 1️⃣ Спочатку шукаємо env (якщо ти прописав у .env)
-    env_path = os.getenv(f"METALS_{filename.upper().replace('.', '_')}")
-    if env_path and Path(env_path).exists():
-        return env_path
-
-    # 2️⃣ Якщо існує /data/<file> (Render)
-    path_data = Path("/data") / filename
-    if path_data.exists():
-        return str(path_data)
-
-    # 3️⃣ Інакше fallback на ./data/<file> (локалка)
-    path_local = Path(__file__).resolve().parents[2] / "data" / filename
-    return str(path_local)
-
 def _rowdict(row) -> dict:
     if row is None:
         return {}
@@ -296,16 +273,10 @@ async def _send_weekly_summary(m: Message, subs: dict):
     subs = _rowdict(subs)
     lang = _lang(subs)
 
-    impacts_raw = csv_to_list(subs.get("impact_filter", ""))
-    impacts = [normalize_impact(x) for x in impacts_raw if normalize_impact(x)]
-    countries = csv_to_list(subs.get("countries_filter", ""))
-
-    try:
-        events = await fetch_calendar(lang=lang)
-    except Exception as e:
-        log.exception("[weekly] load events failed: %s", e)
-        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
-        return
+    filters = make_filter(
+        csv_to_list(subs.get("impact_filter", "")),
+        csv_to_list(subs.get("countries_filter", "")),
+    )
 
     # межі тижня
     now_local = datetime.now(LOCAL_TZ)
@@ -313,10 +284,13 @@ async def _send_weekly_summary(m: Message, subs: dict):
     start_utc = sunday_local.astimezone(UTC)
     end_utc = next_sunday_local.astimezone(UTC)
 
-    # вікно тижня, фільтри
-    in_window = [e for e in events if start_utc <= e.date < end_utc]
-    filtered = filter_events(in_window, impacts, countries)
-    filtered.sort(key=lambda e: e.date)
+    # вікно тижня + фільтри (бісекція по кешу, вже відсортовано за датою)
+    try:
+        filtered = await query_events(start_utc, end_utc, filters, lang=lang)
+    except Exception as e:
+        log.exception("[weekly] load events failed: %s", e)
+        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
+        return
 
     # віддати кілька повідомлень, якщо текст довгий
     for chunk_txt in _weekly_summary_text(filtered, lang):
@@ -331,31 +305,29 @@ async def _send_today(m: Message, subs: dict):
     subs = _rowdict(subs)
     lang = _lang(subs)
 
-    impacts = csv_to_list(subs.get("impact_filter", ""))
-    countries = csv_to_list(subs.get("countries_filter", ""))
+    filters = make_filter(
+        csv_to_list(subs.get("impact_filter", "")),
+        csv_to_list(subs.get("countries_filter", "")),
+    )
 
     log.info("🟢 [_send_today] forex only | impacts=%s | countries=%s",
              subs.get("impact_filter"), subs.get("countries_filter"))
 
-    try:
-        events = await fetch_calendar(lang=lang)
-    except Exception as e:
-        log.exception("[today] load events failed: %s", e)
-        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
-        return
-
     now_local = datetime.now(LOCAL_TZ)
     start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
     end_local = start_local + timedelta(days=1)
     start_utc = start_local.astimezone(UTC)
     end_utc = end_local.astimezone(UTC)
 
-    in_window = [e for e in events if start_utc <= e.date < end_utc]
-    log.debug("[today/forex] window %s..%s, all=%d, in_window=%d",
-              start_utc.isoformat(), end_utc.isoformat(), len(events), len(in_window))
+    try:
+        filtered = await query_events(start_utc, end_utc, filters, lang=lang)
+    except Exception as e:
+        log.exception("[today] load events failed: %s", e)
+        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
+        return
 
-    filtered = filter_events(in_window, impacts, countries)
-    filtered.sort(key=lambda e: e.date)
+    log.debug("[today/forex] window %s..%s, filtered=%d",
+              start_utc.isoformat(), end_utc.isoformat(), len(filtered))
 
     if not filtered:
         await m.answer(_t_en_ua(lang, "Today: no events match your filters.", "Сьогодні: подій за вашими фільтрами немає."))
@@ -374,20 +346,14 @@ async def _send_week(m: Message, subs: dict):
     subs = _rowdict(subs)
     lang = _lang(subs)
 
-    impacts_raw = csv_to_list(subs.get("impact_filter", ""))
-    impacts = [normalize_impact(x) for x in impacts_raw if normalize_impact(x)]
-    countries = csv_to_list(subs.get("countries_filter", ""))
+    filters = make_filter(
+        csv_to_list(subs.get("impact_filter", "")),
+        csv_to_list(subs.get("countries_filter", "")),
+    )
 
     log.info("🟣 [_send_week] forex only | impacts=%s | countries=%s",
              subs.get("impact_filter"), subs.get("countries_filter"))
 
-    try:
-        events = await fetch_calendar(lang=lang)
-    except Exception as e:
-        log.exception("[week] load events failed: %s", e)
-        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
-        return
-
     # Sunday→Sunday в LOCAL_TZ
     now_local = datetime.now(LOCAL_TZ)
     delta_days = (now_local.weekday() + 1) % 7  # Sun=0
@@ -399,12 +365,15 @@ async def _send_week(m: Message, subs: dict):
     start_utc = sunday_local.astimezone(UTC)
     end_utc = next_sunday_local.astimezone(UTC)
 
-    in_window = [e for e in events if start_utc <= e.date < end_utc]
-    log.debug("[week/forex] window %s..%s, all=%d, in_window=%d",
-              start_utc.isoformat(), end_utc.isoformat(), len(events), len(in_window))
+    try:
+        filtered = await query_events(start_utc, end_utc, filters, lang=lang)
+    except Exception as e:
+        log.exception("[week] load events failed: %s", e)
+        await m.answer(_t_en_ua(lang, "Internal fetch error. See logs.", "Внутрішня помилка завантаження. Див. логи."))
+        return
 
-    filtered = filter_events(in_window, impacts, countries)
-    filtered.sort(key=lambda e: e.date)
+    log.debug("[week/forex] window %s..%s, filtered=%d",
+              start_utc.isoformat(), end_utc.isoformat(), len(filtered))
 
     if not filtered:
         await m.answer(_t_en_ua(lang, "This week: no events match your filters.", "Цього тижня подій за вашими фільтрами немає."))
@@ -421,9 +390,12 @@ async def _send_metals_today_offline(m: Message, lang: str) -> None:
     Відправляє офлайн-події по металах за 'today' батчами по 8,
     як у Forex today. Всі тексти локалізовані через _t_en_ua.
     """
+    html_path = resolve_data_path("metals_today.html")
     try:
-        html_path = resolve_data_path("metals_today.html")
-        events = load_today_from_file(html_path)
+        # розбір кешується в metals_store (оновлюється лише при зміні файлу)
+        snap = await get_today_snapshot_async()
+        if snap is None:
+            raise FileNotFoundError(html_path)
     except FileNotFoundError:
         await m.answer(
             _t_en_ua(
@@ -444,11 +416,10 @@ async def _send_metals_today_offline(m: Message, lang: str) -> None:
         return
 
     # Apply metals filters
-    from ..ui.filters import filter_metals_events
     subs = _rowdict(get_sub(m.from_user.id, m.chat.id))
     impacts = csv_to_list(subs.get("metals_impact_filter", ""))
     countries = csv_to_list(subs.get("metals_countries_filter", ""))
-    filtered = filter_metals_events(events, impacts, countries)
+    filtered = snap.filtered(metals_signature(impacts, countries))
 
     if not filtered:
         await m.answer(
@@ -488,16 +459,17 @@ def mm_event_to_card_text_week(ev, lang: str = "en") -> str:
     return re.sub(r"^•\s*\w{3}\s+(.+?)\s+—", new_prefix, base, count=1)
 
 async def _send_metals_week_offline(m: Message, lang: str):
+    html_path = resolve_data_path("metals_week.html")
     try:
-        html_path = resolve_data_path("metals_week.html")
-        events = load_week_from_file(html_path)
-        
+        snap = await get_week_snapshot_async()
+        if snap is None:
+            raise FileNotFoundError(html_path)
+
         # Apply metals filters
-        from ..ui.filters import filter_metals_events
         subs = _rowdict(get_sub(m.from_user.id, m.chat.id))
         impacts = csv_to_list(subs.get("metals_impact_filter", ""))
         countries = csv_to_list(subs.get("metals_countries_filter", ""))
-        filtered = filter_metals_events(events, impacts, countries)
+        filtered = snap.filtered(metals_signature(impacts, countries))
         
         if not filtered:
             await m.answer(
@@ -564,15 +536,42 @@ async def cmd_week(m: Message):
         subs = get_sub(m.from_user.id, m.chat.id)
     await _send_week(m, subs)
 
+# chat_id → time.monotonic() останнього /ff_refresh
+_FF_REFRESH_AT: dict[int, float] = {}
+
+def _ff_refresh_wait(chat_id: int, user_id: int) -> float:
+    """0 — можна оновлювати (і час запам'ятовано), інакше — скільки секунд ще чекати."""
+    if user_id in ADMIN_IDS or FF_REFRESH_COOLDOWN <= 0:
+        return 0.0
+    now = time.monotonic()
+    if len(_FF_REFRESH_AT) > 10000:
+        for cid, t in list(_FF_REFRESH_AT.items()):
+            if now - t >= FF_REFRESH_COOLDOWN:
+                del _FF_REFRESH_AT[cid]
+    wait = _FF_REFRESH_AT.get(chat_id, -FF_REFRESH_COOLDOWN) + FF_REFRESH_COOLDOWN - now
+    if wait > 0:
+        return wait
+    _FF_REFRESH_AT[chat_id] = now
+    return 0.0
+
 @router.message(Command("ff_refresh"))
 async def cmd_ff_refresh(m: Message):
     try:
-        from ..services.forex_client import clear_ff_cache
-        n = clear_ff_cache()
-        msg = "✅ Forex cache refreshed"
-        if isinstance(n, int):
-            msg += f" ({n} cleared)" if n > 0 else " (nothing cached)"
-        await m.answer(msg)
+        from ..services.forex_client import backoff_remaining, refresh_now
+        # backoff апстріму (429 / челендж) діє для всіх, включно з адмінами
+        wait = backoff_remaining()
+        if wait > 0:
+            await m.answer(f"⏳ ForexFactory asked us to back off; try again in {wait:.0f}s")
+            return
+        wait = _ff_refresh_wait(m.chat.id, m.from_user.id)
+        if wait > 0:
+            await m.answer(f"⏳ Forex data was refreshed recently; try again in {wait:.0f}s")
+            return
+        snap = await refresh_now()
+        if snap is None:
+            await m.answer("⚠️ Forex cache is empty (fetch failed)")
+            return
+        await m.answer(f"✅ Forex cache refreshed (v{snap.version}, {len(snap.raw)} events)")
     except Exception as e:
         await m.answer(f"Refresh error: {e}")
 
@@ -0,0 +1,97 @@
+# app/handlers/middleware.py
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional
+
+from aiogram import BaseMiddleware, Router
+from aiogram.filters import Command
+from aiogram.types import Update
+
+from ..config.settings import SLOW_UPDATE_MS
+from ..utils.metrics import histogram
+from ..utils.timings import finish_breakdown, start_breakdown
+
+log = logging.getLogger(__name__)
+
+UPDATE_SECONDS = histogram("update_seconds", "update handling wall time", ("tag",))
+UPDATE_SECTION_SECONDS = histogram("update_section_seconds", "update time by section (db/fetch/parse/telegram)", ("tag", "section"))
+
+SECTIONS = ("db", "fetch", "parse", "telegram")
+# статичні меню: тегуємо повним data («menu:today»); решта — лише префіксом («imp:»)
+_STATIC_NS = {"root", "menu", "metals"}
+# будь-яка незареєстрована «/команда» — одна серія, інакше спам /aaaa1, /aaaa2… росте реєстр
+OTHER_COMMAND = "/other"
+
+
+def registered_commands(router: Router) -> FrozenSet[str]:
+    """«/команди» з фільтрів Command у router і всіх його під-роутерах."""
+    out = set()
+    for r in router.chain_tail:
+        for handler in r.message.handlers:
+            for flt in handler.filters or ():
+                if isinstance(flt.callback, Command):
+                    out.update(f"/{c.lower()}" for c in flt.callback.commands if isinstance(c, str))
+    return frozenset(out)
+
+
+def update_tag(update: Update, commands: FrozenSet[str] = frozenset()) -> str:
+    """Команда (/start; незареєстрована — /other), префікс callback-даних (imp:, menu:today) або тип апдейта."""
+    msg = update.message or update.edited_message
+    if msg is not None:
+        text = (msg.text or msg.caption or "").strip()
+        if text.startswith("/"):
+            cmd = text.split()[0].split("@", 1)[0].lower()
+            return cmd if cmd in commands else OTHER_COMMAND
+        return "message"
+    cq = update.callback_query
+    if cq is not None:
+        data = cq.data or ""
+        ns, sep, rest = data.partition(":")
+        if not sep:
+            return data[:32] or "callback"
+        if ns in _STATIC_NS and rest and ":" not in rest:
+            return data[:32]
+        return f"{ns}:"
+    return update.event_type
+
+
+class UpdateTimingMiddleware(BaseMiddleware):
+    """
+    Outer-middleware на dp.update: міряє повний час апдейта і розклад по секціях
+    (нижчі шари пишуть через utils.timings.add_time). Апдейти, довші за
+    SLOW_UPDATE_MS, логуються з розкладом. Тег команди — лише з команд router-а
+    (збираються при першому апдейті, коли всі роутери вже підключені).
+    """
+
+    def __init__(self, router: Optional[Router] = None, slow_ms: float = SLOW_UPDATE_MS):
+        self.slow_s = slow_ms / 1000.0
+        self.router = router
+        self._commands: Optional[FrozenSet[str]] = None
+
+    @property
+    def commands(self) -> FrozenSet[str]:
+        if self._commands is None:
+            self._commands = registered_commands(self.router) if self.router is not None else frozenset()
+        return self._commands
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        token = start_breakdown()
+        t0 = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            wall = time.perf_counter() - t0
+            parts = finish_breakdown(token)
+            tag = update_tag(event, self.commands)
+            UPDATE_SECONDS.observe(wall, tag=tag)
+            for section in SECTIONS:
+                UPDATE_SECTION_SECONDS.observe(parts.get(section, 0.0), tag=tag, section=section)
+            if self.slow_s > 0 and wall >= self.slow_s:
+                other = max(0.0, wall - sum(parts.values()))
+                breakdown = " ".join(f"{s}={parts.get(s, 0.0):.3f}" for s in SECTIONS)
+                log.warning(f"[timing] slow update {event.update_id} {tag}: {wall:.3f}s ({breakdown} other={other:.3f})")
@@ -1,15 +1,30 @@
 # app/main.py
 import asyncio
+import contextlib
 import logging
+import time
+from typing import Optional
+
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
-from .config.settings import BOT_TOKEN
-from .handlers import commands, callbacks
+from .config.settings import BOT_TOKEN, METRICS_HOST, METRICS_PORT, TELEGRAM_API_BASE
+from .handlers import admin, commands, callbacks
+from .handlers.middleware import UpdateTimingMiddleware
 from .core.scheduler import scheduler
+from .core.database import close_db, hydrate_sent_cache, init_db, reset_sent_cache
+from .core.maintenance import start_maintenance, stop_maintenance
 from .core.metals_scheduler import start_metals_scheduler, stop_metals_scheduler
 from .services.forex_client import start_autorefresh, stop_autorefresh
+from .services.metals_watcher import start_metals_watcher, stop_metals_watcher
+from .utils.cpu_pool import start_cpu_pool, stop_cpu_pool
+from .utils.loop_watchdog import start_loop_watchdog, stop_loop_watchdog
+from .utils.metrics import counter, histogram, start_metrics_server, stop_metrics_server
+from .utils.timings import add_time
 
 # Налаштування логування
 logging.basicConfig(
@@ -18,52 +33,144 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-def build_bot() -> Bot:
-    """Створює екземпляр бота."""
-    return Bot(
-        token=BOT_TOKEN,
+TG_REQUEST_SECONDS = histogram("telegram_request_seconds", "Bot API call latency", ("method",))
+TG_REQUESTS = counter("telegram_requests_total", "Bot API calls by result (ok / exception class)", ("method", "result"))
+
+class TelegramMetrics(BaseRequestMiddleware):
+    """Латентність і результат кожного виклику Bot API (sendMessage тощо)."""
+
+    async def __call__(self, make_request, bot, method):
+        name = type(method).__name__
+        t0 = time.perf_counter()
+        result = "ok"
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            result = type(e).__name__
+            raise
+        finally:
+            took = time.perf_counter() - t0
+            TG_REQUEST_SECONDS.observe(took, method=name)
+            add_time("telegram", took)
+            TG_REQUESTS.inc(method=name, result=result)
+
+def build_bot(token: str = BOT_TOKEN, api_base: str = TELEGRAM_API_BASE) -> Bot:
+    """Створює екземпляр бота (api_base — інший Bot API сервер, див. TELEGRAM_API_BASE)."""
+    session = None
+    if api_base:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(api_base))
+        log.warning(f"Bot API → {api_base}")
+    bot = Bot(
+        token=token,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    bot.session.middleware(TelegramMetrics())
+    return bot
 
-def build_dispatcher() -> Dispatcher:
-    """Створює та налаштовує диспетчер."""
+def build_dispatcher(background: bool = True) -> Dispatcher:
+    """
+    Створює та налаштовує диспетчер.
+    background=False — лише обробка апдейтів (stateless воркер): фонові задачі
+    (кеш FF, планувальник, метали) запускає обраний лідер, див. app.core.leader.
+    """
     dp = Dispatcher()
+
+    # Час кожного апдейта з розкладом по секціях + лог повільних
+    dp.update.outer_middleware(UpdateTimingMiddleware(dp))
     
-    # Підключаємо основний router з командами
+    # Підключаємо основний router з командами (службові — першими, лише для ADMIN_IDS)
+    dp.include_router(admin.router)
     dp.include_router(commands.router)
     dp.include_router(callbacks.router)
     
     # Хуки життєвого циклу
-    dp.startup.register(on_startup)
-    dp.shutdown.register(on_shutdown)
+    if background:
+        dp.startup.register(on_startup)
+        dp.shutdown.register(on_shutdown)
     
     return dp
 
-async def on_startup(bot: Bot):
-    """Функція запуску бота."""
-    log.info("Bot starting up...")
-    
-    # Запускаємо автооновлення кешу ForexFactory
-    await start_autorefresh()
-    
+_SCHEDULER_TASK: Optional[asyncio.Task] = None
+_METALS_START_TASK: Optional[asyncio.Task] = None
+
+async def _start_metals_scheduler_later(delay: float = 2.0) -> None:
+    """apscheduler імпортується і налаштовується вже після старту polling/webhook, а не в on_startup."""
+    await asyncio.sleep(delay)
+    await start_metals_scheduler()
+
+async def start_background(bot: Bot, shard: int = 0, shards: int = 1) -> None:
+    """
+    Фонові задачі одного екземпляра: кеш FF, алерти/дайджести, метали.
+    При шардуванні планувальник обробляє лише свою партицію підписок, а спільне
+    для всіх — власника кешу FF, оновлення й відстеження metals-файлів і чистку
+    sent_log — запускає тільки шард 0. Інші шарди читають знімок FF зі спільного
+    файлу (FF_SHARED_SNAPSHOT_PATH), а metals-файли — через stat на читанні.
+    """
+    global _SCHEDULER_TASK, _METALS_START_TASK
+
+    # Дедуп алертів з пам'яті: підтягуємо останні дні sent_log до першого тіку
+    try:
+        log.info(f"sent_log cache: {hydrate_sent_cache()} key(s) loaded")
+    except Exception as e:
+        log.warning(f"sent_log cache: hydrate failed, using DB lookups: {e}")
+
     # Запускаємо планувальник подій (alerts & digest)
-    asyncio.create_task(scheduler(bot))
+    if _SCHEDULER_TASK is None or _SCHEDULER_TASK.done():
+        _SCHEDULER_TASK = asyncio.create_task(scheduler(bot, shard, shards), name=f"scheduler-{shard}")
     
-    # Запускаємо планувальник оновлень металів
-    await start_metals_scheduler()
+    # Спільне для шардів: кеш FF, оновлення металів, чистка sent_log, watcher
+    if shard == 0:
+        # Запускаємо автооновлення кешу ForexFactory
+        await start_autorefresh()
+        if _METALS_START_TASK is None or _METALS_START_TASK.done():
+            _METALS_START_TASK = asyncio.create_task(_start_metals_scheduler_later(), name="metals_scheduler_start")
+        await start_maintenance()
+        # Стежимо за metals_*.html: розбір один раз на зміну файлу
+        await start_metals_watcher()
+
+async def stop_background() -> None:
+    """Зупиняє все, що запустив start_background (shutdown або втрата лідерства)."""
+    global _SCHEDULER_TASK, _METALS_START_TASK
+
+    if _SCHEDULER_TASK is not None and not _SCHEDULER_TASK.done():
+        _SCHEDULER_TASK.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _SCHEDULER_TASK
+    _SCHEDULER_TASK = None
+    reset_sent_cache()
+
+    # Зупиняємо автооновлення
+    await stop_autorefresh()
     
+    # Зупиняємо планувальник металів (і його відкладений старт, якщо ще не відбувся)
+    if _METALS_START_TASK is not None and not _METALS_START_TASK.done():
+        _METALS_START_TASK.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _METALS_START_TASK
+    _METALS_START_TASK = None
+    await stop_maintenance()
+    await stop_metals_scheduler()
+    await stop_metals_watcher()
+
+async def on_startup(bot: Bot):
+    """Функція запуску бота."""
+    log.info("Bot starting up...")
+    init_db()
+    await start_metrics_server(METRICS_HOST, METRICS_PORT)
+    await start_loop_watchdog()
+    await start_cpu_pool()
+    await start_background(bot)
     log.info("Bot started successfully")
 
 async def on_shutdown(bot: Bot):
     """Функція зупинки бота."""
     log.info("Bot shutting down...")
-    
-    # Зупиняємо автооновлення
-    await stop_autorefresh()
-    
-    # Зупиняємо планувальник металів
-    await stop_metals_scheduler()
-    
+    await stop_background()
+    await stop_cpu_pool()
+    await stop_loop_watchdog()
+    await stop_metrics_server()
+    close_db()
     log.info("Bot stopped")
 
 async def main(bot: Bot = None):
@@ -82,6 +189,7 @@ async def main(bot: Bot = None):
     dp = Dispatcher()
 
     # Реєструємо роутери
+    dp.include_router(admin.router)
     dp.include_router(commands.router)
     dp.include_router(callbacks.router)
 
@@ -0,0 +1,121 @@
+# app/services/event_index.py
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from ..core.models import EventFilter, FFEvent
+from ..ui.filters import (
+    categorize_event,
+    normalize_category,
+    normalize_currency,
+    normalize_impact,
+)
+
+# скільки різних наборів фільтрів тримати в кеші масок на один індекс
+_MASK_CACHE_MAX = 1024
+
+
+def _iter_bits(mask: int) -> Iterable[int]:
+    """Індекси встановлених бітів у порядку зростання."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class EventIndex:
+    """
+    Індекс над списком FFEvent, відсортованим за датою (як повертає
+    _build_events_from_raw). Дати винесені в окремий масив, тож вікно
+    [start, end) шукається бісекцією: O(log n + k) замість повного проходу.
+
+    Додатково тримає інвертовані індекси (postings) currency/impact/category →
+    бітова маска id подій. Фільтр обчислюється як перетин масок, а маска для
+    кожного EventFilter кешується — нормалізація робиться один раз на payload,
+    а не для кожного підписника. Список подій не змінюється після побудови.
+    """
+
+    __slots__ = ("events", "dates", "version", "_all", "_by_currency",
+                 "_by_impact", "_impact_blank", "_by_category", "_masks")
+
+    def __init__(self, events: List[FFEvent], version: int = 0):
+        self.events = events
+        self.version = version
+        self.dates: List[datetime] = [e.date for e in events]
+
+        self._all = (1 << len(events)) - 1
+        self._by_currency: Dict[str, int] = {}
+        self._by_impact: Dict[str, int] = {}
+        self._impact_blank = 0  # події без impact проходять будь-який impact-фільтр
+        self._by_category: Dict[str, int] = {}
+        self._masks: Dict[EventFilter, int] = {}
+
+        for i, ev in enumerate(events):
+            bit = 1 << i
+            # та сама логіка, що й у filter_events: currency, інакше country
+            cur = normalize_currency(ev.currency) or normalize_currency(ev.country)
+            if cur:
+                self._by_currency[cur] = self._by_currency.get(cur, 0) | bit
+            imp = normalize_impact(ev.impact)
+            if imp:
+                self._by_impact[imp] = self._by_impact.get(imp, 0) | bit
+            else:
+                self._impact_blank |= bit
+            cat = categorize_event(ev)
+            self._by_category[cat] = self._by_category.get(cat, 0) | bit
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def window(self, start_utc: datetime, end_utc: datetime) -> List[FFEvent]:
+        """Події з start_utc <= date < end_utc (у порядку дати)."""
+        lo = bisect_left(self.dates, start_utc)
+        hi = bisect_left(self.dates, end_utc, lo)
+        return self.events[lo:hi]
+
+    def mask(self, filters: EventFilter) -> int:
+        """Бітова маска подій, що проходять фільтр (кешується на індексі)."""
+        cached = self._masks.get(filters)
+        if cached is not None:
+            return cached
+
+        m = self._all
+        curs = {normalize_currency(c) for c in filters.countries} - {""}
+        if curs:
+            sel = 0
+            for c in curs:
+                sel |= self._by_currency.get(c, 0)
+            m &= sel
+        imps = {normalize_impact(i) for i in filters.impacts} - {""}
+        if imps:
+            sel = self._impact_blank
+            for i in imps:
+                sel |= self._by_impact.get(i, 0)
+            m &= sel
+        cats = {normalize_category(x) for x in filters.categories} - {""}
+        if cats:
+            sel = 0
+            for c in cats:
+                sel |= self._by_category.get(c, 0)
+            m &= sel
+
+        if len(self._masks) >= _MASK_CACHE_MAX:
+            self._masks.clear()
+        self._masks[filters] = m
+        return m
+
+    def query(
+        self,
+        start_utc: datetime,
+        end_utc: datetime,
+        filters: Optional[EventFilter] = None,
+    ) -> List[FFEvent]:
+        """Вікно часу + (необов'язково) фільтри impact/валюта/категорія."""
+        lo = bisect_left(self.dates, start_utc)
+        hi = bisect_left(self.dates, end_utc, lo)
+        if filters is None:
+            return self.events[lo:hi]
+        m = self.mask(filters) & ((1 << hi) - 1) & ~((1 << lo) - 1)
+        return [self.events[i] for i in _iter_bits(m)]
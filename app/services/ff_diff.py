@@ -0,0 +1,64 @@
+# app/services/ff_diff.py
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+from ..core.models import EventChange, FFEvent
+from ..ui.formatting import event_hash
+
+# види змін, які емітимо
+CHANGE_ACTUAL = "actual"
+CHANGE_FORECAST = "forecast"
+CHANGE_TIME = "time"
+
+def _identity(ev: FFEvent) -> Tuple[str, str, str, str]:
+    """Ключ події без дати — щоб упізнати перенесену подію."""
+    return (ev.title, ev.country, ev.currency, ev.impact)
+
+def diff_events(prev: Sequence[FFEvent], curr: Sequence[FFEvent]) -> List[EventChange]:
+    """
+    Порівнює два послідовні списки подій (за event_hash) і повертає записи змін:
+      - actual з'явився (None → значення) або змінився;
+      - forecast переглянуто;
+      - подію перенесено (той самий title/country/currency/impact, інша дата).
+    Лінійно за розміром тижня; повного перескану підписників не потребує.
+    """
+    prev_by_hash: Dict[str, FFEvent] = {event_hash(e): e for e in prev}
+    changes: List[EventChange] = []
+    unmatched: List[FFEvent] = []
+
+    for ev in curr:
+        old = prev_by_hash.pop(event_hash(ev), None)
+        if old is None:
+            unmatched.append(ev)
+            continue
+        if ev.actual and ev.actual != old.actual:
+            changes.append(EventChange(CHANGE_ACTUAL, ev, old.actual, ev.actual))
+        if ev.forecast != old.forecast and (ev.forecast or old.forecast):
+            changes.append(EventChange(CHANGE_FORECAST, ev, old.forecast, ev.forecast))
+
+    if unmatched and prev_by_hash:
+        # залишки попереднього payload без пари → кандидати на «перенесено»
+        orphans: Dict[Tuple[str, str, str, str], List[FFEvent]] = {}
+        for old in prev_by_hash.values():
+            orphans.setdefault(_identity(old), []).append(old)
+        for ev in unmatched:
+            cands = orphans.get(_identity(ev))
+            if not cands:
+                continue
+            # найближча за часом стара версія
+            old = min(cands, key=lambda o: abs((o.date - ev.date).total_seconds()))
+            cands.remove(old)
+            changes.append(EventChange(CHANGE_TIME, ev, old.date.isoformat(), ev.date.isoformat()))
+            if ev.actual and ev.actual != old.actual:
+                changes.append(EventChange(CHANGE_ACTUAL, ev, old.actual, ev.actual))
+
+    return changes
+
+def released(changes: Sequence[EventChange]) -> List[FFEvent]:
+    """Події, для яких щойно опубліковано actual (для «released» пушів)."""
+    return [ch.event for ch in changes if ch.kind == CHANGE_ACTUAL]
+
+def describe(ch: EventChange) -> str:
+    """Короткий опис зміни для логів."""
+    return f"{ch.kind}: {ch.event.currency} {ch.event.title} ({ch.old!r} → {ch.new!r})"
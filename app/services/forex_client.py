@@ -2,22 +2,36 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import os
 import random
 import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-import httpx
-
-from ..core.models import FFEvent
+from ..core.models import EventChange, EventFilter, FFEvent
 from ..utils.helpers import str_or_none
-from ..config.settings import FF_THISWEEK, UTC
+from ..utils.metrics import counter, gauge, histogram
+from ..utils.timings import add_time
+from ..config.settings import FF_CHALLENGE_BACKOFF, FF_SHARED_SNAPSHOT_PATH, FF_THISWEEK, UTC
 from .translator import translate_title
+from .event_index import EventIndex
+from .ff_diff import describe, diff_events
+from ..ui.filters import normalize_impact
+
+if TYPE_CHECKING:
+    import httpx
 
 log = logging.getLogger(__name__)
 
+FF_FETCH_SECONDS = histogram("ff_fetch_seconds", "thisweek.json HTTP request latency", ("status",))
+FF_FETCH_RESPONSES = counter("ff_fetch_responses_total", "thisweek.json responses by HTTP status", ("status",))
+FF_SNAPSHOT_READS = counter("ff_snapshot_reads_total", "raw snapshot reads: hit (served) / shared (from owner's file) / miss (went to network)", ("result",))
+FF_INDEX_READS = counter("ff_index_reads_total", "per-lang index reads: hit (reused) / miss (built)", ("lang", "result"))
+FF_INDEX_BUILD_SECONDS = histogram("ff_index_build_seconds", "per-lang EventIndex build time", ("lang",))
+
 # -------------------- shared http client --------------------
 _CLIENT: Optional[httpx.AsyncClient] = None
 _CLIENT_LOCK = asyncio.Lock()
@@ -26,6 +40,8 @@ async def _client() -> httpx.AsyncClient:
     global _CLIENT
     async with _CLIENT_LOCK:
         if _CLIENT is None:
+            import httpx  # ~0.1 с імпорту (httpcore, trio) — поза холодним стартом
+
             _CLIENT = httpx.AsyncClient(
                 timeout=20,
                 limits=httpx.Limits(max_connections=5, max_keepalive_connections=2),
@@ -36,37 +52,244 @@ async def _client() -> httpx.AsyncClient:
 # -------------------- backoff state for 429 --------------------
 _NEXT_ALLOWED_FETCH: datetime = datetime.min.replace(tzinfo=UTC)
 
+# -------------------- conditional GET (ETag / Last-Modified) --------------------
+# Валідатори останньої успішної відповіді; на 304 payload не качаємо і не парсимо.
+_VALIDATORS: Dict[str, str] = {}
+
 def _now_utc() -> datetime:
     return datetime.now(UTC)
 
-# -------------------- simple in-process caches --------------------
-# A) Пер-lang кеш готових FFEvent (короткий TTL, щоб не дерти мережу зайвий раз)
-_CACHE_TTL_SECONDS = int(os.getenv("FF_FX_TTL", "120"))  # 2 хв за дефолтом
-_TW_CACHE: Dict[Tuple[str], Tuple[float, List[FFEvent]]] = {}  # key=(lang,) -> (expires_epoch, events)
-_CACHE_LOCK = asyncio.Lock()
-
-# B) "Сирий" кеш thisweek.json (спільний для всіх мов)
+# -------------------- snapshots (single cache owner) --------------------
+# Єдиний власник кешу — задача автооновлення (_autorefresh_loop). Вона сама вирішує,
+# коли тягнути thisweek.json, і публікує незмінні версіоновані знімки (FFSnapshot).
+# Хендлери, планувальник і /ff_refresh лише читають поточний знімок або просять
+# власника оновитись. Без запущеного власника (скрипти, тести) кеш працює
+# «за запитом» із TTL FF_RAW_TTL.
 _RAW_TTL_SECONDS = int(os.getenv("FF_RAW_TTL", "600"))  # 10 хв за дефолтом
-_RAW_JSON: Optional[List[Dict[str, Any]]] = None
-_RAW_EXPIRES_AT: float = 0.0  # epoch seconds
-
-def _raw_cache_set(data: List[Dict[str, Any]] | None) -> None:
-    global _RAW_JSON, _RAW_EXPIRES_AT
-    _RAW_JSON = data or []
-    _RAW_EXPIRES_AT = time.time() + _RAW_TTL_SECONDS
-
-def _raw_cache_get() -> Tuple[Optional[List[Dict[str, Any]]], float]:
-    """Повертає (raw, ttl_left_seconds). ttl_left_seconds < 0 означає, що прострочено/немає."""
-    now = time.time()
-    ttl_left = _RAW_EXPIRES_AT - now
-    if _RAW_JSON is None:
-        return None, -1.0
-    return _RAW_JSON, ttl_left
+
+
+class FFSnapshot:
+    """
+    Незмінний знімок thisweek.json з номером версії. Пер-мовні індекси
+    будуються ліниво, один раз на знімок, і далі лише перевикористовуються.
+    """
+
+    __slots__ = ("version", "raw", "fetched_at", "_indexes")
+
+    def __init__(self, version: int, raw: List[Dict[str, Any]], fetched_at: datetime):
+        self.version = version
+        self.raw = raw
+        self.fetched_at = fetched_at
+        self._indexes: Dict[str, EventIndex] = {}
+
+    def index(self, lang: str = "en") -> EventIndex:
+        idx = self._indexes.get(lang)
+        if idx is None:
+            FF_INDEX_READS.inc(lang=lang, result="miss")
+            t0 = time.perf_counter()
+            idx = EventIndex(_build_events_from_raw(self.raw, lang), self.version)
+            took = time.perf_counter() - t0
+            FF_INDEX_BUILD_SECONDS.observe(took, lang=lang)
+            add_time("parse", took)
+            self._indexes[lang] = idx
+        else:
+            FF_INDEX_READS.inc(lang=lang, result="hit")
+        return idx
+
+    def events(self, lang: str = "en") -> List[FFEvent]:
+        return self.index(lang).events
+
+
+_SNAPSHOT: Optional[FFSnapshot] = None
+_SNAPSHOT_EXPIRES_AT: float = 0.0  # epoch seconds; до цього часу знімок вважається свіжим
+_VERSION: int = 0                  # росте лише коли вміст payload справді змінився
+_FETCH_LOCK = asyncio.Lock()       # single-flight: одночасно максимум один запит у мережу
+_FETCH_SEQ: int = 0                # лічильник завершених спроб fetch (для single-flight)
+_SUBSCRIBERS: List[Callable[[FFSnapshot], None]] = []
+
+def current_snapshot() -> Optional[FFSnapshot]:
+    """Поточний опублікований знімок (або None, якщо ще нічого не тягнули)."""
+    return _SNAPSHOT
+
+def get_version() -> int:
+    """Версія поточного знімка (0 — знімка ще немає)."""
+    return _VERSION
+
+gauge("ff_snapshot_version", "version of the published FF snapshot (0 — none yet)", fn=get_version)
+
+def subscribe(callback: Callable[[FFSnapshot], None]) -> None:
+    """
+    Підписка на нові версії знімка. callback викликається синхронно
+    одразу після публікації, тому має бути швидким і не кидати винятків.
+    """
+    if callback not in _SUBSCRIBERS:
+        _SUBSCRIBERS.append(callback)
+
+def unsubscribe(callback: Callable[[FFSnapshot], None]) -> None:
+    if callback in _SUBSCRIBERS:
+        _SUBSCRIBERS.remove(callback)
+
+def _publish(raw: List[Dict[str, Any]], ttl: float) -> FFSnapshot:
+    """
+    Публікує payload: якщо вміст не змінився — лише продовжуємо свіжість
+    поточного знімка; інакше — новий знімок з version+1 і сповіщення підписників.
+    """
+    global _SNAPSHOT, _SNAPSHOT_EXPIRES_AT, _VERSION
+    _SNAPSHOT_EXPIRES_AT = time.time() + ttl
+    if _SNAPSHOT is not None and (raw is _SNAPSHOT.raw or raw == _SNAPSHOT.raw):
+        return _SNAPSHOT
+
+    _VERSION += 1
+    snap = FFSnapshot(_VERSION, raw, _now_utc())
+    _SNAPSHOT = snap
+    log.info("[ff_client] snapshot v%d published (raw=%d)", snap.version, len(raw))
+    for cb in list(_SUBSCRIBERS):
+        try:
+            cb(snap)
+        except Exception as e:
+            log.warning("[ff_client] snapshot subscriber %r failed: %s", cb, e)
+    return snap
+
+async def _refresh_once(ttl: Optional[float] = None) -> Optional[FFSnapshot]:
+    """
+    Один запит thisweek.json з публікацією результату. Паралельні виклики
+    зливаються в один (якщо поки чекали на лок хтось уже сходив у мережу —
+    просто повертаємо його результат). Порожня відповідь (помилка/404/429)
+    не затирає попередній знімок.
+    """
+    global _FETCH_SEQ
+    seq = _FETCH_SEQ
+    async with _FETCH_LOCK:
+        if _FETCH_SEQ != seq:
+            return _SNAPSHOT
+        try:
+            raw = await _fetch_thisweek_json()
+        except Exception as e:
+            log.warning("[ff_client] fetch failed: %s", e)
+            raw = []
+        finally:
+            _FETCH_SEQ += 1
+        if raw:
+            return _publish(raw, _RAW_TTL_SECONDS if ttl is None else ttl)
+        if _SNAPSHOT is not None:
+            log.info("[ff_client] serving STALE snapshot v%d after fetch error/429", _SNAPSHOT.version)
+        return _SNAPSHOT
+
+async def get_snapshot() -> Optional[FFSnapshot]:
+    """
+    Поточний знімок для читачів. Коли працює власник кешу, мережу тут не чіпаємо
+    (окрім найпершого старту без даних); без власника — оновлюємо за TTL.
+    """
+    snap = _SNAPSHOT
+    if snap is not None and (_owner_running() or time.time() < _SNAPSHOT_EXPIRES_AT):
+        FF_SNAPSHOT_READS.inc(result="hit")
+        return snap
+    if not _owner_running():
+        shared = await _load_shared()
+        if shared is not None:
+            FF_SNAPSHOT_READS.inc(result="shared")
+            return shared
+    FF_SNAPSHOT_READS.inc(result="miss")
+    return await _refresh_once()
+
+# -------------------- shared snapshot (шарди / воркери) --------------------
+# Власник кешу живе лише на шарді 0. Він пише кожен знімок у FF_SHARED_SNAPSHOT_PATH
+# (разом зі строком свіжості), а процеси без власника читають файл замість мережі.
+# Протух файл (власник упав) — повертаємось до запитів за TTL.
+_SHARED_STAMP: Optional[Tuple[int, int]] = None
+_SHARED_EXPIRES_AT: float = 0.0
+
+def _write_shared(path: str, raw: List[Dict[str, Any]], expires_at: float) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"expires_at": expires_at, "raw": raw}, f, ensure_ascii=False)
+    os.replace(tmp, path)  # читачі бачать або старий, або новий файл цілком
+
+def _read_shared(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+async def _save_shared(raw: List[Dict[str, Any]], expires_at: float) -> None:
+    if not FF_SHARED_SNAPSHOT_PATH:
+        return
+    try:
+        await asyncio.to_thread(_write_shared, FF_SHARED_SNAPSHOT_PATH, raw, expires_at)
+    except Exception as e:
+        log.warning("[ff_client] shared snapshot write failed: %s", e)
+
+async def _load_shared() -> Optional[FFSnapshot]:
+    """
+    Знімок зі спільного файлу власника: перечитуємо лише коли файл змінився (stat),
+    публікуємо як звичайний (версія, дифф для «released»). None — файлу немає або він протух.
+    """
+    global _SHARED_STAMP, _SHARED_EXPIRES_AT
+    path = FF_SHARED_SNAPSHOT_PATH
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    if stamp != _SHARED_STAMP:
+        try:
+            data = await asyncio.to_thread(_read_shared, path)
+        except Exception as e:
+            log.warning("[ff_client] shared snapshot read failed: %s", e)
+            return None
+        _SHARED_STAMP = stamp
+        _SHARED_EXPIRES_AT = float(data.get("expires_at") or 0.0)
+        raw = data.get("raw") or []
+        if raw:
+            _publish(raw, 0)  # свіжість визначає файл, тож на кожному читанні лише stat
+    if _SNAPSHOT is None or time.time() >= _SHARED_EXPIRES_AT:
+        return None
+    return _SNAPSHOT
+
+# -------------------- change feed (actual/forecast/time) --------------------
+_CHANGES: deque[EventChange] = deque(maxlen=2000)
+_LAST_EN_EVENTS: Optional[List[FFEvent]] = None  # попередній стан (en) для диффу
+
+def _diff_on_publish(snap: FFSnapshot) -> None:
+    """Підписник знімків: дифф нової версії з попередньою за event_hash."""
+    global _LAST_EN_EVENTS
+    events = snap.events("en")
+    if _LAST_EN_EVENTS is not None:
+        changes = diff_events(_LAST_EN_EVENTS, events)
+        for ch in changes:
+            log.info("[ff_client] change %s", describe(ch))
+        _CHANGES.extend(changes)
+    _LAST_EN_EVENTS = events
+
+subscribe(_diff_on_publish)
+
+def drain_changes() -> List[EventChange]:
+    """Забирає накопичені зміни подій (кожна віддається рівно один раз)."""
+    out = list(_CHANGES)
+    _CHANGES.clear()
+    return out
+
+def requeue_changes(changes: List[EventChange]) -> None:
+    """Повертає забрані зміни в голову черги (тік, що їх забрав, упав) — вони віддадуться наступному."""
+    _CHANGES.extendleft(reversed(changes))
 
 # -------------------- low-level fetch: thisweek.json --------------------
+def _is_challenge(r: httpx.Response) -> bool:
+    """Сторінка Cloudflare («Just a moment...») замість JSON: ретраї її лише продовжують."""
+    if r.headers.get("cf-mitigated") == "challenge":
+        return True
+    if "html" not in r.headers.get("content-type", ""):
+        return False
+    head = r.text[:4096]
+    return "Just a moment" in head or "challenge-platform" in head or "cf-chl" in head
+
 async def _fetch_thisweek_json() -> List[Dict[str, Any]]:
     """
     Тягнемо ТІЛЬКИ thisweek.json з урахуванням 429 (Retry-After).
+    Запит умовний (If-None-Match / If-Modified-Since): на 304 повертаємо raw
+    поточного знімка без завантаження і розбору. Cloudflare-челендж — без
+    ретраїв, backoff FF_CHALLENGE_BACKOFF.
     Повертаємо список словників (сира відповідь).
     """
     global _NEXT_ALLOWED_FETCH
@@ -75,22 +298,61 @@ async def _fetch_thisweek_json() -> List[Dict[str, Any]]:
     # повага до попереднього Retry-After
     if now < _NEXT_ALLOWED_FETCH:
         wait = (_NEXT_ALLOWED_FETCH - now).total_seconds()
+        if wait > 30:
+            # довгий backoff (челендж, великий Retry-After): не чекаємо в локі, читачі беруть stale
+            log.info("[ff_client] backoff until %s, skip fetch", _NEXT_ALLOWED_FETCH.isoformat())
+            return []
         log.info("[ff_client] backoff until %s (sleep %.1fs)", _NEXT_ALLOWED_FETCH.isoformat(), wait)
-        await asyncio.sleep(min(wait, 30))
+        await asyncio.sleep(wait)
 
     cli = await _client()
     tries = 4
     backoff = 1.0
 
     for i in range(tries):
-        r = await cli.get(FF_THISWEEK)
+        t0 = time.perf_counter()
+        headers = {}
+        if _SNAPSHOT is not None:
+            if "etag" in _VALIDATORS:
+                headers["If-None-Match"] = _VALIDATORS["etag"]
+            if "last_modified" in _VALIDATORS:
+                headers["If-Modified-Since"] = _VALIDATORS["last_modified"]
+        try:
+            r = await cli.get(FF_THISWEEK, headers=headers)
+        except Exception:
+            FF_FETCH_SECONDS.observe(time.perf_counter() - t0, status="error")
+            FF_FETCH_RESPONSES.inc(status="error")
+            add_time("fetch", time.perf_counter() - t0)
+            raise
+        took = time.perf_counter() - t0
+        FF_FETCH_SECONDS.observe(took, status=str(r.status_code))
+        add_time("fetch", took)
+        FF_FETCH_RESPONSES.inc(status=str(r.status_code))
+        if r.status_code == 304 and _SNAPSHOT is not None:
+            # не змінилось: той самий raw → _publish лише продовжить свіжість
+            log.debug("[ff_client] 304 not modified")
+            return _SNAPSHOT.raw
+
+        if _is_challenge(r):
+            _NEXT_ALLOWED_FETCH = _now_utc() + timedelta(seconds=FF_CHALLENGE_BACKOFF)
+            log.warning("[ff_client] Cloudflare challenge (HTTP %s); next allowed at %s",
+                        r.status_code, _NEXT_ALLOWED_FETCH.isoformat())
+            return []
+
         if r.status_code == 200:
             try:
                 data = r.json()
-                return data if isinstance(data, list) else []
             except Exception as e:
                 log.info("[ff_client] JSON decode error at %s: %s", FF_THISWEEK, e)
                 return []
+            if not isinstance(data, list):
+                return []
+            _VALIDATORS.clear()
+            if r.headers.get("ETag"):
+                _VALIDATORS["etag"] = r.headers["ETag"]
+            if r.headers.get("Last-Modified"):
+                _VALIDATORS["last_modified"] = r.headers["Last-Modified"]
+            return data
 
         if r.status_code == 429:
             ra = r.headers.get("Retry-After")
@@ -163,117 +425,136 @@ def _build_events_from_raw(raw: List[Dict[str, Any]] | None, lang: str) -> List[
 # -------------------- public: cached this-week events --------------------
 async def get_events_thisweek_cached(lang: str = "en") -> List[FFEvent]:
     """
-    Повертає події цього тижня з кешу. Порядок:
-      1) Перевіряємо per-lang кеш FFEvent.
-      2) Якщо MISS — пробуємо побудувати з «сирого» кешу (спільного для всіх мов).
-      3) Якщо й сирого нема/протух — тягнемо мережу; на успіх — оновлюємо raw + per-lang кеші.
-      4) Якщо мережа впала/429, але є хоч якісь старі сирі дані — повертаємо STALE з них.
-    """
-    key = (lang,)
-    now_epoch = time.time()
-
-    # 1) Пер-lang кеш подій
-    async with _CACHE_LOCK:
-        cached = _TW_CACHE.get(key)
-        if cached:
-            expires_at, events = cached
-            if now_epoch < expires_at:
-                log.debug("[ff_client] cache HIT (lang=%s, ttl_left=%.0fs, count=%d)",
-                          lang, expires_at - now_epoch, len(events))
-                return events
-            # прострочено — приберемо
-            _TW_CACHE.pop(key, None)
-
-    # 2) Спробуємо з «сирого» кешу (якщо ще валідний)
-    raw, ttl_left = _raw_cache_get()
-    if raw is not None and ttl_left >= 0:
-        events = _build_events_from_raw(raw, lang)
-        async with _CACHE_LOCK:
-            _TW_CACHE[key] = (time.time() + _CACHE_TTL_SECONDS, events)
-        log.debug("[ff_client] served from RAW cache (lang=%s, raw_ttl_left=%.0fs, count=%d)",
-                  lang, ttl_left, len(events))
-        return events
-
-    # 3) Мережа: оновлюємо сирі дані й збираємо події
-    try:
-        raw = await _fetch_thisweek_json()
-        _raw_cache_set(raw or [])
-        events = _build_events_from_raw(raw or [], lang)
-        async with _CACHE_LOCK:
-            _TW_CACHE[key] = (time.time() + _CACHE_TTL_SECONDS, events)
-        log.info("[ff_client] fetched & cached (lang=%s, events=%d)", lang, len(events))
-        return events
-    except Exception as e:
-        log.warning("[ff_client] fetch failed: %s", e)
-
-    # 4) Fallback: якщо мережа не дала, але є хоч якісь старі сирі дані — віддамо STALE
-    if _RAW_JSON:
-        events = _build_events_from_raw(_RAW_JSON, lang)
-        async with _CACHE_LOCK:
-            # короткий м'який TTL, щоб одразу не молотити мережу повторно
-            _TW_CACHE[key] = (time.time() + 120, events)  # 2 хв
-        log.info("[ff_client] served STALE from RAW after fetch error/429 (lang=%s, events=%d)",
-                 lang, len(events))
-        return events
-
-    # 5) Зовсім нічого
-    return []
+    Повертає події цього тижня з поточного знімка (локалізовані під lang).
+    Якщо мережа впала/429 — віддаємо останній відомий (STALE) знімок; якщо даних
+    немає зовсім — порожній список.
+    """
+    snap = await get_snapshot()
+    if snap is None:
+        return []
+    events = snap.events(lang)
+    log.debug("[ff_client] snapshot v%d HIT (lang=%s, count=%d)", snap.version, lang, len(events))
+    return events
 
 # Зворотно-сумісний псевдонім (якщо десь ще використовується)
 async def fetch_calendar(lang: str = "en") -> List[FFEvent]:
     return await get_events_thisweek_cached(lang=lang)
 
+# -------------------- public: time-range queries --------------------
+async def get_events_index(lang: str = "en") -> EventIndex:
+    """
+    Індекс (бісекція за датою + postings) над подіями поточного знімка.
+    Будується один раз на версію знімка і мову.
+    """
+    snap = await get_snapshot()
+    if snap is None:
+        return EventIndex([])
+    return snap.index(lang)
+
+async def query(
+    start_utc: datetime,
+    end_utc: datetime,
+    filters: Optional[EventFilter] = None,
+    lang: str = "en",
+) -> List[FFEvent]:
+    """
+    Події тижня у вікні start_utc <= date < end_utc з фільтрами (або без).
+    Вікно знаходиться бісекцією: O(log n + k).
+    """
+    idx = await get_events_index(lang=lang)
+    return idx.query(start_utc, end_utc, filters)
+
 def clear_ff_cache() -> int:
     """
-    Повністю очищає in-memory кеші:
-      - пер-lang кеш подій (_TW_CACHE)
-      - спільний сирий кеш (_RAW_JSON)
-    Повертає кількість очищених записів (_TW_CACHE) + 1, якщо був сирий кеш.
+    Скидає поточний знімок і backoff: наступний читач (або власник кешу)
+    одразу сходить у мережу. Повертає 1, якщо знімок був, інакше 0.
     """
-    cleared = 0
-    try:
-        cleared += len(_TW_CACHE)
-        _TW_CACHE.clear()
-    except Exception:
-        pass
-    # сирий кеш
-    global _RAW_JSON, _RAW_EXPIRES_AT, _NEXT_ALLOWED_FETCH
-    if _RAW_JSON is not None:
-        _RAW_JSON = None
-        _RAW_EXPIRES_AT = 0.0
-        cleared += 1
+    global _SNAPSHOT, _SNAPSHOT_EXPIRES_AT, _NEXT_ALLOWED_FETCH
+    cleared = 1 if _SNAPSHOT is not None else 0
+    _SNAPSHOT = None
+    _SNAPSHOT_EXPIRES_AT = 0.0
+    _VALIDATORS.clear()
     # скинемо backoff — нехай наступний виклик сам вирішить
     _NEXT_ALLOWED_FETCH = datetime.min.replace(tzinfo=UTC)
     return cleared
 
-# -------------------- auto-refresh loop (optional) --------------------
+def backoff_remaining() -> float:
+    """Скільки секунд ще діє backoff (Retry-After після 429 / FF_CHALLENGE_BACKOFF); 0 — можна тягнути."""
+    return max(0.0, (_NEXT_ALLOWED_FETCH - _now_utc()).total_seconds())
+
+async def refresh_now() -> Optional[FFSnapshot]:
+    """
+    Примусове оновлення (для /ff_refresh): тягне thisweek.json через той самий
+    single-flight, що й власник кешу. Backoff не скидає: поки він діє, повертає
+    поточний знімок без запиту. Поточний знімок лишається доступним читачам, поки йде запит.
+    """
+    if backoff_remaining() > 0:
+        return _SNAPSHOT
+    return await _refresh_once()
+
+# -------------------- cache owner: auto-refresh loop --------------------
 _FF_REFRESH_MINUTES = int(os.getenv("FF_REFRESH_MINUTES", "60"))
+# адаптивний графік: часто — лише навколо релізів High, коли чекаємо actual
+_FF_FAST_REFRESH_SECONDS = int(os.getenv("FF_FAST_REFRESH_SECONDS", "60"))
+_FF_IDLE_REFRESH_MINUTES = int(os.getenv("FF_IDLE_REFRESH_MINUTES", "180"))
+_FF_HOT_BEFORE_SECONDS = int(os.getenv("FF_HOT_BEFORE_SECONDS", "60"))
+_FF_HOT_AFTER_MINUTES = int(os.getenv("FF_HOT_AFTER_MINUTES", "20"))
 _AUTOREFRESH_TASK: Optional[asyncio.Task] = None
 _AUTOREFRESH_LOCK = asyncio.Lock()
 
+def _owner_running() -> bool:
+    return _AUTOREFRESH_TASK is not None and not _AUTOREFRESH_TASK.done()
+
+def _next_refresh_delay(idx: EventIndex, now: datetime) -> float:
+    """
+    Скільки секунд чекати до наступного запиту thisweek.json:
+      - всередині «гарячого» вікна High-релізу без actual → FF_FAST_REFRESH_SECONDS;
+      - інакше — до початку наступного гарячого вікна, але не довше FF_REFRESH_MINUTES;
+      - якщо High-релізів попереду немає → FF_IDLE_REFRESH_MINUTES.
+    Завжди не раніше _NEXT_ALLOWED_FETCH (Retry-After після 429).
+    """
+    fast = max(10, _FF_FAST_REFRESH_SECONDS)
+    base = max(5, _FF_REFRESH_MINUTES) * 60
+    idle = max(base, _FF_IDLE_REFRESH_MINUTES * 60)
+    hot_before = timedelta(seconds=_FF_HOT_BEFORE_SECONDS)
+    hot_after = timedelta(minutes=_FF_HOT_AFTER_MINUTES)
+
+    delay = float(idle)
+    for ev in idx.window(now - hot_after, now + timedelta(seconds=idle) + hot_before):
+        if normalize_impact(ev.impact) != "High" or ev.actual:
+            continue
+        if ev.date - hot_before <= now:
+            delay = fast  # уже в гарячому вікні — чекаємо actual
+        else:
+            delay = min(base, (ev.date - hot_before - now).total_seconds())
+        break
+
+    backoff = (_NEXT_ALLOWED_FETCH - now).total_seconds()
+    return max(float(fast), delay, backoff)
+
 async def _autorefresh_loop():
     """
-    Періодично освіжає in-memory кеш thisweek.json.
-    Повага до 429 уже всередині _fetch_thisweek_json().
+    Власник кешу: тягне thisweek.json за адаптивним графіком (_next_refresh_delay)
+    і публікує знімки. Повага до 429 уже всередині _fetch_thisweek_json().
     """
-    interval = max(5, _FF_REFRESH_MINUTES)  # мінімум 5 хв
-    log.info(f"[ff_client] autorefresh: started (every {interval} min)")
+    global _SNAPSHOT_EXPIRES_AT
+    log.info("[ff_client] autorefresh: started (adaptive, base %d min, fast %ds)",
+             max(5, _FF_REFRESH_MINUTES), _FF_FAST_REFRESH_SECONDS)
     try:
         while True:
+            delay = float(max(5, _FF_REFRESH_MINUTES) * 60)
             try:
-                # оновимо сирий кеш і пер-lang (англ) «на фоні»
-                raw = await _fetch_thisweek_json()
-                if raw is not None:
-                    _raw_cache_set(raw or [])
-                # прогріємо англійську локалізацію
-                events = _build_events_from_raw(raw or _RAW_JSON or [], "en")
-                async with _CACHE_LOCK:
-                    _TW_CACHE[("en",)] = (time.time() + _CACHE_TTL_SECONDS, events)
+                snap = await _refresh_once()
+                if snap is not None:
+                    # прогріваємо англійський індекс (його читає планувальник)
+                    delay = _next_refresh_delay(snap.index("en"), _now_utc())
+                    # знімок свіжий до наступного планового запиту (+запас)
+                    _SNAPSHOT_EXPIRES_AT = max(_SNAPSHOT_EXPIRES_AT, time.time() + delay + 30)
+                    await _save_shared(snap.raw, _SNAPSHOT_EXPIRES_AT)
             except Exception as e:
                 log.warning(f"[ff_client] autorefresh tick failed: {e}")
-            # спимо м'яко
-            for _ in range(interval * 6):  # крок 10 секунд
-                await asyncio.sleep(10)
+            log.debug("[ff_client] autorefresh: next fetch in %.0fs", delay)
+            await asyncio.sleep(delay)
     except asyncio.CancelledError:
         log.info("[ff_client] autorefresh: cancelled")
         raise
@@ -307,29 +588,23 @@ async def stop_autorefresh() -> None:
 
 def get_cache_meta(lang: str = "en") -> Dict[str, Any]:
     """
-    Повертає метадані поточного кешу FFEvent:
-      - count: кількість подій у кеші (0, якщо прострочено/порожньо)
-      - valid_until: ISO-час в UTC, доки кеш чинний (або '—', якщо кешу немає)
-      - ttl_minutes: тривалість TTL у хвилинах (_CACHE_TTL_SECONDS)
+    Повертає метадані поточного знімка:
+      - count: кількість подій (0, якщо знімка немає)
+      - valid_until: ISO-час в UTC, доки знімок вважається свіжим (або '—')
+      - ttl_minutes: TTL знімка в режимі «за запитом» (FF_RAW_TTL)
+      - version: версія знімка (0 — ще немає)
     """
+    ttl_minutes = int((_RAW_TTL_SECONDS or 600) // 60)
+    snap = _SNAPSHOT
+    if snap is None:
+        return {"count": 0, "valid_until": "—", "ttl_minutes": ttl_minutes, "version": _VERSION}
     try:
-        now = time.time()
-        ttl_minutes = int((_CACHE_TTL_SECONDS or 600) // 60)
-
-        item = _TW_CACHE.get((lang,))
-        if not item and _TW_CACHE:
-            # якщо для цієї мови ще нема, візьмемо найсвіжіший запис
-            item = max(_TW_CACHE.values(), key=lambda x: x[0])
-
-        if not item:
-            return {"count": 0, "valid_until": "—", "ttl_minutes": ttl_minutes}
-
-        expires_at, events = item
-        valid_until_iso = datetime.fromtimestamp(expires_at, tz=UTC).replace(microsecond=0).isoformat()
-
-        if now >= expires_at:
-            return {"count": 0, "valid_until": valid_until_iso, "ttl_minutes": ttl_minutes}
-
-        return {"count": len(events or []), "valid_until": valid_until_iso, "ttl_minutes": ttl_minutes}
+        valid_until_iso = datetime.fromtimestamp(_SNAPSHOT_EXPIRES_AT, tz=UTC).replace(microsecond=0).isoformat()
+        return {
+            "count": len(snap.events(lang)),
+            "valid_until": valid_until_iso,
+            "ttl_minutes": ttl_minutes,
+            "version": snap.version,
+        }
     except Exception:
-        return {"count": 0, "valid_until": "—", "ttl_minutes": int((_CACHE_TTL_SECONDS or 600) // 60)}
+        return {"count": 0, "valid_until": "—", "ttl_minutes": ttl_minutes, "version": _VERSION}
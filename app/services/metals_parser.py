@@ -6,12 +6,14 @@ import os
 import re
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from bs4 import BeautifulSoup  # pip install beautifulsoup4
 from ..core.models import MMEvent
 from ..config.settings import LOCAL_TZ, UTC
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
 # ===== Утиліти часу =====
 _TIME_RE = re.compile(r"(\d{1,2}):(\d{2})\s*([ap]m)?", re.I)
 _TIME_HHMM = re.compile(r"^\d{2}:\d{2}$")
@@ -207,6 +209,7 @@ def parse_metals_today_html(page_html: str) -> List[MMEvent]:
       3) визначення impact за <img src*="mm-impact-...png">:
          yel → Low, ora → Medium, red → High, gra → Non-economic
     """
+    from bs4 import BeautifulSoup  # pip install beautifulsoup4; імпорт — при першому розборі
     soup = BeautifulSoup(page_html, "html.parser")
 
     rows = soup.select("tr.calendar__row")
@@ -379,6 +382,7 @@ def parse_metals_week_html(page_html: str) -> List[MMEvent]:
       - tr.calendar__row--day-breaker (текст вигляду 'Sun Oct 19')
       - або з td.calendar__date (там та сама строка)
     """
+    from bs4 import BeautifulSoup  # pip install beautifulsoup4; імпорт — при першому розборі
     soup = BeautifulSoup(page_html, "html.parser")
     tbodies = soup.select("tbody")
     if not tbodies:
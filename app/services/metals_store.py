@@ -0,0 +1,256 @@
+# app/services/metals_store.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..core.models import MMEvent
+from ..ui.filters import filter_metals_events, normalize_country, normalize_impact
+from ..utils.cpu_pool import run_cpu
+from ..utils.helpers import resolve_data_path
+from ..utils.metrics import histogram
+from ..utils.timings import add_time
+from .metals_parser import load_today_from_file, load_week_from_file
+
+log = logging.getLogger(__name__)
+
+METALS_PARSE_SECONDS = histogram("metals_parse_seconds", "metals_*.html parse time", ("store",))
+
+# скільки різних сигнатур фільтрів тримати на один знімок
+_FILTER_CACHE_MAX = 256
+
+MetalsSignature = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+def metals_signature(
+    impacts: Iterable[str] | None = None,
+    countries: Iterable[str] | None = None,
+) -> MetalsSignature:
+    """Нормалізована (impacts, countries) — ключ кешу відфільтрованих подій."""
+    return (
+        tuple(sorted({normalize_impact(i) for i in (impacts or []) if normalize_impact(i)})),
+        tuple(sorted({normalize_country(c) for c in (countries or []) if normalize_country(c)})),
+    )
+
+
+class MetalsSnapshot:
+    """
+    Незмінний розбір одного офлайн-HTML (today або week). Події відсортовані
+    за dt_utc, дати винесені в окремий масив для бісекції. Відфільтровані
+    списки кешуються по сигнатурі фільтра — filter_metals_events викликається
+    один раз на сигнатуру на версію файлу, а не на кожного підписника/тік.
+    """
+
+    __slots__ = ("version", "path", "stamp", "events", "dates", "_filtered")
+
+    def __init__(self, version: int, path: str, stamp: Tuple[int, int], events: List[MMEvent]):
+        self.version = version
+        self.path = path
+        self.stamp = stamp
+        self.events = events
+        self.dates: List[datetime] = [e.dt_utc for e in events]
+        self._filtered: Dict[MetalsSignature, Tuple[List[MMEvent], List[datetime]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _bucket(self, sig: MetalsSignature) -> Tuple[List[MMEvent], List[datetime]]:
+        hit = self._filtered.get(sig)
+        if hit is None:
+            evs = filter_metals_events(self.events, sig[0], sig[1])
+            hit = (evs, [e.dt_utc for e in evs])
+            if len(self._filtered) >= _FILTER_CACHE_MAX:
+                self._filtered.clear()
+            self._filtered[sig] = hit
+        return hit
+
+    def filtered(self, sig: MetalsSignature) -> List[MMEvent]:
+        """Усі події знімка, що проходять фільтр (кешовано)."""
+        return self._bucket(sig)[0]
+
+    def window(
+        self,
+        start_utc: datetime,
+        end_utc: datetime,
+        sig: Optional[MetalsSignature] = None,
+    ) -> List[MMEvent]:
+        """Події з start_utc <= dt_utc < end_utc (з фільтром або без)."""
+        evs, dates = (self.events, self.dates) if sig is None else self._bucket(sig)
+        lo = bisect_left(dates, start_utc)
+        hi = bisect_left(dates, end_utc, lo)
+        return evs[lo:hi]
+
+
+_SUBSCRIBERS: List[Callable[[str, MetalsSnapshot], None]] = []
+_VERSION: int = 0        # загальна версія: росте при кожній заміні будь-якого знімка
+_WATCHED: bool = False   # True, поки працює metals_watcher (тоді get() не робить stat)
+
+
+def subscribe(callback: Callable[[str, MetalsSnapshot], None]) -> None:
+    """
+    Підписка на нові знімки: callback(name, snapshot), name — 'today' | 'week'.
+    Викликається синхронно одразу після заміни, тому має бути швидким.
+    """
+    if callback not in _SUBSCRIBERS:
+        _SUBSCRIBERS.append(callback)
+
+
+def unsubscribe(callback: Callable[[str, MetalsSnapshot], None]) -> None:
+    if callback in _SUBSCRIBERS:
+        _SUBSCRIBERS.remove(callback)
+
+
+def get_version() -> int:
+    """Загальна версія metals-даних (0 — ще нічого не завантажено)."""
+    return _VERSION
+
+
+def set_watched(flag: bool) -> None:
+    """Вмикає/вимикає режим «push»: зміни файлів приносить watcher, а не stat на кожне читання."""
+    global _WATCHED
+    _WATCHED = flag
+
+
+def _stat_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _FileStore:
+    """
+    Тримає останній розбір файлу і перепарсює лише тоді, коли змінився
+    (mtime_ns, size). Знімок замінюється атомарно (одне присвоєння), читачі
+    завжди бачать або старий, або новий. Якщо файл зник/битий — лишається
+    попередній знімок.
+    """
+
+    def __init__(self, name: str, filename: str, env: str, loader: Callable[[str], List[MMEvent]]):
+        self.name = name
+        self.filename = filename
+        self.env = env
+        self.loader = loader
+        self.snapshot: Optional[MetalsSnapshot] = None
+        self.version = 0
+        self._lock = asyncio.Lock()  # один розбір файлу на зміну, навіть при паралельних читачах
+
+    def path(self) -> str:
+        # той самий env, куди пишуть scripts/update_metals*.sh
+        env_path = os.getenv(self.env, "").strip()
+        if env_path and os.path.exists(env_path):
+            return env_path
+        return resolve_data_path(self.filename)
+
+    def _is_current(self, path: str, stamp: Tuple[int, int]) -> bool:
+        snap = self.snapshot
+        return snap is not None and snap.path == path and snap.stamp == stamp
+
+    def _swap(self, path: str, stamp: Tuple[int, int], events: List[MMEvent]) -> MetalsSnapshot:
+        global _VERSION
+        self.version += 1
+        _VERSION += 1
+        snap = MetalsSnapshot(self.version, path, stamp, events)
+        self.snapshot = snap
+        log.info("[metals_store] %s v%d loaded (%d events)", self.name, snap.version, len(events))
+        for cb in list(_SUBSCRIBERS):
+            try:
+                cb(self.name, snap)
+            except Exception as e:
+                log.warning("[metals_store] subscriber %r failed: %s", cb, e)
+        return snap
+
+    def _observe(self, t0: float) -> None:
+        took = time.perf_counter() - t0
+        METALS_PARSE_SECONDS.observe(took, store=self.name)
+        add_time("parse", took)
+
+    def _load(self, path: str) -> List[MMEvent]:
+        t0 = time.perf_counter()
+        try:
+            return self.loader(path)
+        finally:
+            self._observe(t0)
+
+    async def _load_async(self, path: str) -> List[MMEvent]:
+        t0 = time.perf_counter()
+        try:
+            return await run_cpu(self.loader, path, kind=f"metals_{self.name}")
+        finally:
+            self._observe(t0)
+
+    def refresh(self) -> Optional[MetalsSnapshot]:
+        """Синхронно: stat і, якщо файл змінився, перепарсити."""
+        path = self.path()
+        stamp = _stat_stamp(path)
+        if stamp is None or self._is_current(path, stamp):
+            return self.snapshot
+        try:
+            events = self._load(path)
+        except Exception as e:
+            log.warning("[metals_store] %s: parse failed (%s): %s", self.name, path, e)
+            return self.snapshot
+        return self._swap(path, stamp, events)
+
+    async def refresh_async(self) -> Optional[MetalsSnapshot]:
+        """
+        Те саме, але парсинг (BeautifulSoup) — у пулі процесів (app.utils.cpu_pool),
+        щоб не блокувати event loop. Паралельні виклики чекають один розбір.
+        """
+        path = self.path()
+        stamp = _stat_stamp(path)
+        if stamp is None or self._is_current(path, stamp):
+            return self.snapshot
+        async with self._lock:
+            if self._is_current(path, stamp):
+                return self.snapshot
+            try:
+                events = await self._load_async(path)
+            except Exception as e:
+                log.warning("[metals_store] %s: parse failed (%s): %r", self.name, path, e)
+                return self.snapshot
+            # поки парсили, файл могли переписати ще раз — наступна подія/опит підхопить
+            if self._is_current(path, stamp):
+                return self.snapshot
+            return self._swap(path, stamp, events)
+
+    def get(self) -> Optional[MetalsSnapshot]:
+        if _WATCHED and self.snapshot is not None:
+            return self.snapshot
+        return self.refresh()
+
+    async def get_async(self) -> Optional[MetalsSnapshot]:
+        if _WATCHED and self.snapshot is not None:
+            return self.snapshot
+        return await self.refresh_async()
+
+
+_WEEK = _FileStore("week", "metals_week.html", "METALS_WEEK_HTML", load_week_from_file)
+_TODAY = _FileStore("today", "metals_today.html", "METALS_TODAY_HTML", load_today_from_file)
+STORES: Tuple[_FileStore, ...] = (_TODAY, _WEEK)
+
+
+def get_week_snapshot() -> Optional[MetalsSnapshot]:
+    """Поточний розбір metals_week.html (None — файлу ще немає)."""
+    return _WEEK.get()
+
+
+def get_today_snapshot() -> Optional[MetalsSnapshot]:
+    """Поточний розбір metals_today.html (None — файлу ще немає)."""
+    return _TODAY.get()
+
+
+async def get_week_snapshot_async() -> Optional[MetalsSnapshot]:
+    """get_week_snapshot для хендлерів: перепарсинг (якщо треба) — поза event loop."""
+    return await _WEEK.get_async()
+
+
+async def get_today_snapshot_async() -> Optional[MetalsSnapshot]:
+    """get_today_snapshot для хендлерів: перепарсинг (якщо треба) — поза event loop."""
+    return await _TODAY.get_async()
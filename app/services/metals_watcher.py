@@ -0,0 +1,173 @@
+# app/services/metals_watcher.py
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from typing import Dict, Optional, Set, Tuple
+
+from . import metals_store
+
+log = logging.getLogger(__name__)
+
+# Якщо inotify недоступний (macOS, Windows, контейнер без нього) — опитуємо stat.
+_POLL_SECONDS = float(os.getenv("METALS_WATCH_POLL_SECONDS", "5"))
+# Навіть з inotify зрідка звіряємось через stat (каталог перестворили, подію загубили тощо).
+_SAFETY_POLL_SECONDS = float(os.getenv("METALS_WATCH_SAFETY_SECONDS", "300"))
+# Скрипти пишуть файл кількома write(); чекаємо трохи після останньої події.
+_DEBOUNCE_SECONDS = 0.25
+
+# linux/inotify.h
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HDR = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_TASK: Optional[asyncio.Task] = None
+_LOCK = asyncio.Lock()
+
+
+class _Inotify:
+    """Мінімальна обгортка над inotify через ctypes (без сторонніх залежностей)."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+        self.dirs: Dict[int, str] = {}
+
+    def watch_dir(self, path: str) -> None:
+        # Лише завершений запис або атомарне перейменування; IN_CREATE дав би
+        # подію на порожній/недописаний файл.
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path}")
+        self.dirs[wd] = path
+
+    def read_names(self) -> Set[str]:
+        """Імена файлів із подій, що вже лежать у буфері (неблокуюче)."""
+        names: Set[str] = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            if not buf:
+                return names
+            off = 0
+            while off + _EVENT_HDR.size <= len(buf):
+                _wd, _mask, _cookie, ln = _EVENT_HDR.unpack_from(buf, off)
+                off += _EVENT_HDR.size
+                name = buf[off:off + ln].rstrip(b"\0")
+                off += ln
+                if name:
+                    names.add(os.fsdecode(name))
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _open_inotify() -> Tuple[Optional[_Inotify], bool]:
+    """
+    (inotify, complete): complete=False, якщо якийсь каталог ще не існує
+    або його не вдалось додати — тоді для нього лишається частий опит stat.
+    """
+    if not sys.platform.startswith("linux"):
+        return None, False
+    try:
+        ino = _Inotify()
+    except Exception as e:
+        log.info("[metals_watcher] inotify unavailable (%s), polling every %.0fs", e, _POLL_SECONDS)
+        return None, False
+    dirs = {os.path.dirname(os.path.abspath(st.path())) for st in metals_store.STORES}
+    complete = True
+    for d in sorted(dirs):
+        try:
+            ino.watch_dir(d)
+        except Exception as e:
+            log.info("[metals_watcher] cannot watch %s (%s), polling it every %.0fs", d, e, _POLL_SECONDS)
+            complete = False
+    if not ino.dirs:
+        ino.close()
+        return None, False
+    log.info("[metals_watcher] inotify on %s", ", ".join(sorted(ino.dirs.values())))
+    return ino, complete
+
+
+async def _refresh_all() -> None:
+    for st in metals_store.STORES:
+        await st.refresh_async()
+
+
+async def _watch_loop() -> None:
+    """
+    Тримає знімки metals_store актуальними: inotify-події (IN_CLOSE_WRITE /
+    IN_MOVED_TO) або, як запасний варіант, опит stat. Файл парситься один раз
+    після завершення запису, знімок підміняється атомарно, підписники
+    metals_store отримують нову версію.
+    """
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    ino, complete = _open_inotify()
+    names = {st.filename for st in metals_store.STORES}
+
+    if ino is not None:
+        def _on_readable() -> None:
+            if ino.read_names() & names:
+                wake.set()
+        loop.add_reader(ino.fd, _on_readable)
+
+    interval = _SAFETY_POLL_SECONDS if complete else _POLL_SECONDS
+    try:
+        await _refresh_all()  # початковий розбір — поза першим запитом користувача
+        metals_store.set_watched(True)
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=interval)
+                await asyncio.sleep(_DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await _refresh_all()
+            except Exception as e:
+                log.warning("[metals_watcher] refresh failed: %s", e)
+    finally:
+        metals_store.set_watched(False)
+        if ino is not None:
+            loop.remove_reader(ino.fd)
+            ino.close()
+
+
+async def start_metals_watcher() -> None:
+    """Запускає watcher (одноразово). Викликати при старті бота."""
+    global _TASK
+    async with _LOCK:
+        if _TASK and not _TASK.done():
+            return
+        _TASK = asyncio.create_task(_watch_loop(), name="metals_watcher")
+
+
+async def stop_metals_watcher() -> None:
+    global _TASK
+    async with _LOCK:
+        if _TASK and not _TASK.done():
+            _TASK.cancel()
+            try:
+                await _TASK
+            except asyncio.CancelledError:
+                pass
+        _TASK = None
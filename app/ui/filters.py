@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Iterable, List, Set
 import logging, re
 
-from ..core.models import FFEvent, MMEvent
+from ..core.models import EventFilter, FFEvent, MMEvent
 
 log = logging.getLogger(__name__)
 
@@ -113,6 +113,21 @@ def filter_events(
         out.append(ev)
     return out
 
+def make_filter(
+    impacts: Iterable[str] | None = None,
+    countries: Iterable[str] | None = None,
+    categories: Iterable[str] | None = None,
+) -> EventFilter:
+    """
+    Збирає EventFilter з «сирих» значень підписки (нормалізовані, відсортовані),
+    щоб однакові набори фільтрів давали однаковий ключ.
+    """
+    return EventFilter(
+        impacts=tuple(sorted({normalize_impact(i) for i in (impacts or []) if normalize_impact(i)})),
+        countries=tuple(sorted({normalize_currency(c) for c in (countries or []) if normalize_currency(c)})),
+        categories=tuple(sorted({normalize_category(x) for x in (categories or []) if normalize_category(x)})),
+    )
+
 # ---------------- Metals Filtering ----------------
 
 def normalize_country(raw: str | None) -> str:
@@ -1,7 +1,7 @@
 # app/ui/formatting.py
 import hashlib
 import html
-from ..core.models import FFEvent
+from ..core.models import FFEvent, MMEvent
 from ..services.translator import translate_title
 
 IMPACT_EMOJI = {
@@ -15,6 +15,10 @@ def event_hash(ev: FFEvent) -> str:
     base = f"{ev.date.isoformat()}|{ev.title}|{ev.country}|{ev.currency}|{ev.impact}"
     return hashlib.sha1(base.encode()).hexdigest()
 
+def mm_event_hash(ev: MMEvent) -> str:
+    base = f"mm|{ev.dt_utc.isoformat()}|{ev.title}|{ev.country or ''}|{ev.impact or ''}"
+    return hashlib.sha1(base.encode()).hexdigest()
+
 from ..ui.filters import normalize_impact
 
 IMPACT_ICON = {
@@ -1,6 +1,20 @@
 # app/ui/keyboards.py
+"""
+Інлайн-клавіатури. Кожна — pydantic-модель з десятками кнопок, тож їх не
+будуємо заново на кожне натискання:
+  - статичні меню залежать лише від мови — кешуються назавжди (по ключу en/ua);
+  - settings_kb / metals_settings_kb залежать від невеликого стану — він
+    зводиться до ключа (бітові маски вибраних impacts/валют/країн, хвилини,
+    мова), готові клавіатури тримаються в обмеженому LRU.
+Повертаються спільні об'єкти: змінювати їх (дописувати ряди тощо) не можна —
+для цього будуйте нову клавіатуру.
+"""
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from ..utils.metrics import gauge
+
 # ---- base dictionaries ----
 IMPACTS = ["High", "Medium", "Low", "Non-economic"]
 COMMON_CURRENCIES = ["USD","EUR","GBP","JPY","CHF","CAD","AUD","NZD","CNY"]
@@ -114,8 +128,28 @@ def _radio(active: bool) -> str:
 def _fmt_minutes(lang: str, m: int) -> str:
     return f"{m}m" if lang != "ua" else f"{m}хв"
 
+# стани налаштувань у LRU (на клавіатуру); користувачі здебільшого
+# сидять на кількох типових комбінаціях, тож цього з запасом
+SETTINGS_CACHE_SIZE = 256
+
+def _ui_lang(lang: str) -> str:
+    """Статичні меню розрізняють лише ua / не-ua — це і є ключ кешу."""
+    return "ua" if lang == "ua" else "en"
+
+def _mask(selected, universe) -> int:
+    """Вибрані значення → бітова маска за порядком universe (решта значень на вигляд не впливає)."""
+    chosen = set(selected or ())
+    return sum(1 << i for i, v in enumerate(universe) if v in chosen)
+
+def _bit(mask: int, i: int) -> bool:
+    return bool(mask >> i & 1)
+
 # ---------- MAIN MENU ----------
 def main_menu_kb(lang: str = "en", back_to_root: bool = False) -> InlineKeyboardMarkup:
+    return _main_menu_kb(_ui_lang(lang), bool(back_to_root))
+
+@lru_cache(maxsize=None)
+def _main_menu_kb(lang: str, back_to_root: bool) -> InlineKeyboardMarkup:
 
     t_settings   = "⚙️ Settings" if lang != "ua" else "⚙️ Налаштування"
     t_digest     = "⏱ Daily Digest" if lang != "ua" else "⏱ Щоденний дайджест"
@@ -157,6 +191,10 @@ def main_menu_kb(lang: str = "en", back_to_root: bool = False) -> InlineKeyboard
     )
 
 def root_menu_kb(lang: str = "en") -> InlineKeyboardMarkup:
+    return _root_menu_kb(_ui_lang(lang))
+
+@lru_cache(maxsize=None)
+def _root_menu_kb(lang: str) -> InlineKeyboardMarkup:
     t_forex  = "💱 Forex" if lang != "ua" else "💱 Форекс"
     t_metals = "🪙 Metals" if lang != "ua" else "🪙 Метали"
     
@@ -167,6 +205,10 @@ def root_menu_kb(lang: str = "en") -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=kb)
 
 def metals_main_menu_kb(lang: str = "en", back_to_root: bool = True) -> InlineKeyboardMarkup:
+    return _metals_main_menu_kb(_ui_lang(lang), bool(back_to_root))
+
+@lru_cache(maxsize=None)
+def _metals_main_menu_kb(lang: str, back_to_root: bool) -> InlineKeyboardMarkup:
     t_settings = "⚙️ Settings" if lang != "ua" else "⚙️ Налаштування"
     t_alerts   = "⏰ Alerts" if lang != "ua" else "⏰ Нагадування"
     t_daily    = "🕰 Daily Digest" if lang != "ua" else "🕰 Щоденний дайджест"
@@ -188,6 +230,10 @@ def metals_main_menu_kb(lang: str = "en", back_to_root: bool = True) -> InlineKe
     return InlineKeyboardMarkup(inline_keyboard=kb)
 
 def back_kb(lang: str = "en") -> InlineKeyboardMarkup:
+    return _back_kb(_ui_lang(lang))
+
+@lru_cache(maxsize=None)
+def _back_kb(lang: str) -> InlineKeyboardMarkup:
     t_back = "◀️ Back" if lang != "ua" else "◀️ Назад"
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text=t_back, callback_data="menu:home")]]
@@ -200,8 +246,15 @@ def settings_kb(
     alert_minutes,
     lang_mode: str = "en",
 ) -> InlineKeyboardMarkup:
-    lang = lang_mode
+    return _settings_kb(
+        _mask(selected_impacts, IMPACTS),
+        _mask(selected_currencies, COMMON_CURRENCIES),
+        alert_minutes,
+        lang_mode,
+    )
 
+@lru_cache(maxsize=SETTINGS_CACHE_SIZE)
+def _settings_kb(impacts_mask: int, currencies_mask: int, alert_minutes, lang: str) -> InlineKeyboardMarkup:
     # --- Impacts (2x2 layout) ---
     imp_map = [
         ("High", _t(lang, "imp_high")),
@@ -211,7 +264,7 @@ def settings_kb(
     ]
     imp_btns = [
         InlineKeyboardButton(
-            text=f"{_onoff(src in selected_impacts)} {label}",
+            text=f"{_onoff(_bit(impacts_mask, IMPACTS.index(src)))} {label}",
             callback_data=f"imp:{src}"
         )
         for src, label in imp_map
@@ -223,10 +276,10 @@ def settings_kb(
 
     cur_buttons = [
         InlineKeyboardButton(
-            text=f"{_onoff(code in selected_currencies)} {label_curr(code)}",
+            text=f"{_onoff(_bit(currencies_mask, i))} {label_curr(code)}",
             callback_data=f"cur:{code}"
         )
-        for code in COMMON_CURRENCIES
+        for i, code in enumerate(COMMON_CURRENCIES)
     ]
 
     rows = []
@@ -283,8 +336,27 @@ def subscribe_time_kb(presets: list[str], lang: str = "en") -> InlineKeyboardMar
     rows.append([InlineKeyboardButton(text=f"◀️ {_t(lang,'back')}", callback_data="menu:home")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
+def metals_daily_time_kb(presets: list[str], current: str = "", lang: str = "en") -> InlineKeyboardMarkup:
+    """Вибір часу щоденного дайджесту по металах (порожній current = вимкнено)."""
+    rows = []
+    row = []
+    for p in presets:
+        row.append(InlineKeyboardButton(text=_radio(current == p) + p, callback_data=f"metals_sub:set:{p}"))
+        if len(row) == 4:
+            rows.append(row); row = []
+    if row:
+        rows.append(row)
+    t_off = "🚫 Off" if lang != "ua" else "🚫 Вимкнути"
+    rows.append([InlineKeyboardButton(text=_radio(not current) + t_off, callback_data="metals_sub:off")])
+    rows.append([InlineKeyboardButton(text=f"◀️ {_t(lang,'back')}", callback_data="root:metals")])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
 # ---------- ALERTS PRESETS (standalone) ----------
 def alerts_presets_kb(current_minutes: int | None = None, lang: str = "en") -> InlineKeyboardMarkup:
+    return _alerts_presets_kb(current_minutes, _ui_lang(lang))
+
+@lru_cache(maxsize=SETTINGS_CACHE_SIZE)
+def _alerts_presets_kb(current_minutes: int | None, lang: str) -> InlineKeyboardMarkup:
     btns = [
         InlineKeyboardButton(
             text=_radio(current_minutes == p) + _fmt_minutes(lang, p),
@@ -301,6 +373,10 @@ def alerts_presets_kb(current_minutes: int | None = None, lang: str = "en") -> I
 
 def metals_alerts_presets_kb(current_minutes: int | None = None, lang: str = "en") -> InlineKeyboardMarkup:
     """Alerts presets keyboard for metals menu."""
+    return _metals_alerts_presets_kb(current_minutes, _ui_lang(lang))
+
+@lru_cache(maxsize=SETTINGS_CACHE_SIZE)
+def _metals_alerts_presets_kb(current_minutes: int | None, lang: str) -> InlineKeyboardMarkup:
     btns = [
         InlineKeyboardButton(
             text=_radio(current_minutes == p) + _fmt_minutes(lang, p),
@@ -317,6 +393,10 @@ def metals_alerts_presets_kb(current_minutes: int | None = None, lang: str = "en
 
 # ---------- TOPICS ----------
 def topics_kb(lang: str = "en") -> InlineKeyboardMarkup:
+    return _topics_kb(_ui_lang(lang))
+
+@lru_cache(maxsize=None)
+def _topics_kb(lang: str) -> InlineKeyboardMarkup:
     if lang == "ua":
         rows = [
             [
@@ -360,12 +440,20 @@ def topics_kb(lang: str = "en") -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 def back_to_topics_kb(lang: str = "en") -> InlineKeyboardMarkup:
+    return _back_to_topics_kb(_ui_lang(lang))
+
+@lru_cache(maxsize=None)
+def _back_to_topics_kb(lang: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text=_t(lang, "back_topics"), callback_data="menu:topics")]]
     )
 
 def metals_topics_kb(lang: str = "en") -> InlineKeyboardMarkup:
     """Topics keyboard for Metals calendar."""
+    return _metals_topics_kb(_ui_lang(lang))
+
+@lru_cache(maxsize=None)
+def _metals_topics_kb(lang: str) -> InlineKeyboardMarkup:
     if lang == "ua":
         rows = [
             [
@@ -414,6 +502,10 @@ def metals_topics_kb(lang: str = "en") -> InlineKeyboardMarkup:
 
 def back_to_metals_topics_kb(lang: str = "en") -> InlineKeyboardMarkup:
     """Back button to metals topics menu."""
+    return _back_to_metals_topics_kb(_ui_lang(lang))
+
+@lru_cache(maxsize=None)
+def _back_to_metals_topics_kb(lang: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text=_t(lang, "back_topics"), callback_data="metals:topics")]]
     )
@@ -430,8 +522,15 @@ def metals_settings_kb(
     Filters by impact and country (not currency).
     Includes alert presets.
     """
-    lang = lang_mode
+    return _metals_settings_kb(
+        _mask(selected_impacts, IMPACTS),
+        _mask(selected_countries, METALS_COUNTRIES),
+        alert_minutes,
+        lang_mode,
+    )
 
+@lru_cache(maxsize=SETTINGS_CACHE_SIZE)
+def _metals_settings_kb(impacts_mask: int, countries_mask: int, alert_minutes, lang: str) -> InlineKeyboardMarkup:
     # --- Impacts (2x2 layout) ---
     imp_map = [
         ("High", _t(lang, "imp_high")),
@@ -441,7 +540,7 @@ def metals_settings_kb(
     ]
     imp_btns = [
         InlineKeyboardButton(
-            text=f"{_onoff(src in selected_impacts)} {label}",
+            text=f"{_onoff(_bit(impacts_mask, IMPACTS.index(src)))} {label}",
             callback_data=f"metals_imp:{src}"
         )
         for src, label in imp_map
@@ -453,10 +552,10 @@ def metals_settings_kb(
 
     country_buttons = [
         InlineKeyboardButton(
-            text=f"{_onoff(code in selected_countries)} {label_country(code)}",
+            text=f"{_onoff(_bit(countries_mask, i))} {label_country(code)}",
             callback_data=f"metals_country:{code}"
         )
-        for code in METALS_COUNTRIES
+        for i, code in enumerate(METALS_COUNTRIES)
     ]
 
     rows = []
@@ -500,3 +599,14 @@ def metals_settings_kb(
     rows.append([InlineKeyboardButton(text=f"◀️ {_t(lang,'back')}", callback_data="root:metals")])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
+
+# ---------- CACHE STATS ----------
+_CACHED = (
+    _main_menu_kb, _root_menu_kb, _metals_main_menu_kb, _back_kb,
+    _topics_kb, _back_to_topics_kb, _metals_topics_kb, _back_to_metals_topics_kb,
+    _settings_kb, _metals_settings_kb, _alerts_presets_kb, _metals_alerts_presets_kb,
+)
+
+gauge("keyboard_cache_hits", "keyboards served from cache", fn=lambda: sum(f.cache_info().hits for f in _CACHED))
+gauge("keyboard_cache_misses", "keyboards built from scratch", fn=lambda: sum(f.cache_info().misses for f in _CACHED))
+gauge("keyboard_cache_size", "keyboards held in cache", fn=lambda: sum(f.cache_info().currsize for f in _CACHED))
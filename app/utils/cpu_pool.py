@@ -0,0 +1,151 @@
+# app/utils/cpu_pool.py
+"""
+Пул процесів для CPU-важкої роботи (розбір metals_*.html BeautifulSoup-ом),
+щоб вона не тримала GIL і event loop разом з усіма іншими апдейтами.
+
+    events = await run_cpu(load_week_from_file, path, kind="metals_week")
+
+- CPU_WORKERS процесів (spawn), прогріваються фоновою задачею на старті: імпорт
+  bs4/парсерів — до першого запиту, а не в ньому, і без затримки старту polling/webhook;
+  поки пул не готовий, задачі йдуть у потоки;
+- у пулі одночасно не більше CPU_QUEUE_MAX задач, решта чекає на семафорі
+  (cpu_pool_queue_depth — усі, що чекають або виконуються);
+- CPU_JOB_TIMEOUT на задачу: викликач отримує TimeoutError, але процес,
+  що вже рахує, дорахує (ProcessPoolExecutor не вміє переривати);
+- впалий процес (BrokenProcessPool) — пул перестворюється і так само прогрівається у фоні.
+
+fn і аргументи мають пиклитись (функції рівня модуля), а головний модуль процесу —
+імпортуватись без побічних ефектів (spawn; run.py це забезпечує). Без пулу (CPU_WORKERS=0,
+скрипти, бенчмарки) run_cpu виконує fn у asyncio.to_thread — як було раніше.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from ..config.settings import CPU_JOB_TIMEOUT, CPU_QUEUE_MAX, CPU_WORKERS
+from .metrics import counter, gauge, histogram
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_READY = False  # пул прогрітий; до того run_cpu працює через потоки
+_WARM_TASK: Optional[asyncio.Task] = None
+_WORKERS: int = 0
+_SEM: Optional[asyncio.Semaphore] = None
+_DEPTH: int = 0
+
+CPU_JOB_SECONDS = histogram("cpu_job_seconds", "offloaded job wall time incl. queueing and IPC", ("kind",))
+CPU_JOBS = counter("cpu_jobs_total", "offloaded jobs by result (ok / timeout / broken / exception class)", ("kind", "result"))
+gauge("cpu_pool_queue_depth", "offloaded jobs waiting or running", fn=lambda: _DEPTH)
+gauge("cpu_pool_workers", "process pool size (0 — jobs run in threads)", fn=lambda: _WORKERS if _READY else 0)
+
+
+def _warm() -> None:
+    """initializer кожного воркера: важкі імпорти — на старті процесу, а не в першій задачі."""
+    from ..services import metals_parser  # noqa: F401  (bs4)
+    from ..ui import metals_render  # noqa: F401
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn, а не fork: у процесі вже працюють потоки (сторож loop-а, httpx, aiohttp)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_warm)
+
+
+def _sem() -> asyncio.Semaphore:
+    global _SEM
+    if _SEM is None:
+        _SEM = asyncio.Semaphore(max(1, CPU_QUEUE_MAX))
+    return _SEM
+
+
+async def _warm_up(pool: ProcessPoolExecutor, workers: int) -> None:
+    global _POOL, _READY
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    try:
+        # по задачі на воркер: процеси стартують (і проходять _warm) зараз
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(workers)))
+    except Exception as e:
+        log.warning("[cpu_pool] warm-up failed, jobs will run in threads: %s", e)
+        pool.shutdown(wait=False, cancel_futures=True)
+        if _POOL is pool:
+            _POOL = None
+        return
+    if _POOL is pool:
+        _READY = True
+    log.info("[cpu_pool] %d worker(s) warm in %.1fs (pids %s)", workers, time.perf_counter() - t0,
+             sorted(set(pids)))
+
+
+async def start_cpu_pool(workers: int = CPU_WORKERS) -> None:
+    """
+    Створює пул і запускає його прогрів фоновою задачею (не чекаючи spawn-імпортів);
+    workers <= 0 — без пулу, задачі йдуть у потоки.
+    """
+    global _POOL, _WORKERS, _WARM_TASK
+    if workers <= 0 or _POOL is not None:
+        return
+    _WORKERS = workers
+    _POOL = _new_pool(workers)
+    _WARM_TASK = asyncio.create_task(_warm_up(_POOL, workers), name="cpu_pool_warm")
+
+
+async def stop_cpu_pool() -> None:
+    global _POOL, _READY, _WARM_TASK
+    pool, _POOL = _POOL, None
+    _READY = False
+    task, _WARM_TASK = _WARM_TASK, None
+    if task is not None and not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, kind: str = "job",
+                  timeout: Optional[float] = CPU_JOB_TIMEOUT) -> T:
+    """Виконує fn(*args) у пулі процесів (або в потоці без пулу) і чекає результат."""
+    global _DEPTH, _POOL, _READY, _WARM_TASK
+    _DEPTH += 1
+    t0 = time.perf_counter()
+    result = "ok"
+    try:
+        async with _sem():
+            pool = _POOL if _READY else None
+            if pool is None:
+                job = asyncio.to_thread(fn, *args)
+            else:
+                job = asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            return await asyncio.wait_for(job, timeout if timeout and timeout > 0 else None)
+    except asyncio.TimeoutError:
+        result = "timeout"
+        log.warning("[cpu_pool] %s timed out after %.1fs", kind, timeout)
+        raise
+    except BrokenProcessPool:
+        result = "broken"
+        if _POOL is not None and _POOL is pool:
+            log.warning("[cpu_pool] pool is broken (worker died), recreating")
+            pool.shutdown(wait=False, cancel_futures=True)
+            _READY = False  # до прогріву нового пулу — знову потоки
+            _POOL = _new_pool(_WORKERS)
+            _WARM_TASK = asyncio.create_task(_warm_up(_POOL, _WORKERS), name="cpu_pool_warm")
+        raise
+    except Exception as e:
+        result = type(e).__name__
+        raise
+    finally:
+        _DEPTH -= 1
+        CPU_JOB_SECONDS.observe(time.perf_counter() - t0, kind=kind)
+        CPU_JOBS.inc(kind=kind, result=result)
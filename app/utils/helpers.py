@@ -1,4 +1,6 @@
 # app/utils/helpers.py
+import os
+from pathlib import Path
 from typing import Any, List
 
 def str_or_none(v: Any):
@@ -12,3 +14,23 @@ def csv_to_list(s: str) -> List[str]:
 
 def chunk(seq: List[Any], n: int) -> List[List[Any]]:
     return [seq[i:i+n] for i in range(0, len(seq), n)]
+
+def resolve_data_path(filename: str) -> str:
+    """
+    Повертає коректний шлях до файлу:
+    - локально: ./data/<file>
+    - на Render: /data/<file>
+    """
+    # 1️⃣ Спочатку шукаємо env (якщо ти прописав у .env)
+    env_path = os.getenv(f"METALS_{filename.upper().replace('.', '_')}")
+    if env_path and Path(env_path).exists():
+        return env_path
+
+    # 2️⃣ Якщо існує /data/<file> (Render)
+    path_data = Path("/data") / filename
+    if path_data.exists():
+        return str(path_data)
+
+    # 3️⃣ Інакше fallback на ./data/<file> (локалка)
+    path_local = Path(__file__).resolve().parents[2] / "data" / filename
+    return str(path_local)
@@ -0,0 +1,114 @@
+# app/utils/loop_watchdog.py
+"""
+Сторож event loop-а: лаг і блокуючі виклики.
+
+Задача в loop-і кожні LOOP_LAG_INTERVAL_MS засинає і міряє, на скільки пізніше
+прокинулась (loop_lag_seconds). Окремий потік стежить за «пульсом» цієї задачі:
+якщо loop не відповідає довше за LOOP_BLOCK_MS, він знімає стек потоку loop-а
+(sys._current_frames) — тобто той самий синхронний виклик, що тримає loop, —
+логує його один раз на зависання і рахує в loop_blocked_total{where}, де where —
+найглибший кадр із коду застосунку (app/...).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from ..config.settings import LOOP_BLOCK_MS, LOOP_LAG_INTERVAL_MS
+from .metrics import counter, histogram
+from .profiler import short_path
+
+log = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LOOP_LAG = histogram("loop_lag_seconds", "event loop wake-up delay over the expected sleep", buckets=LAG_BUCKETS)
+LOOP_BLOCKED = counter("loop_blocked_total", "loop stalls longer than LOOP_BLOCK_MS by innermost app frame", ("where",))
+
+_TASK: Optional[asyncio.Task] = None
+_THREAD: Optional["_BlockMonitor"] = None
+_HEARTBEAT: float = 0.0  # time.monotonic(), коли задача має прокинутись наступного разу
+
+
+def _where(frame) -> str:
+    """Найглибший кадр із app/ (або просто найглибший) як 'app/x.py:123 func'."""
+    fallback = None
+    while frame is not None:
+        path = short_path(frame.f_code.co_filename)
+        label = f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+        if fallback is None:
+            fallback = label
+        if path.startswith("app/"):
+            return label
+        frame = frame.f_back
+    return fallback or "?"
+
+
+class _BlockMonitor(threading.Thread):
+    """Потік, що знімає стек loop-а, коли пульс задачі застарів."""
+
+    def __init__(self, thread_id: int, threshold: float):
+        super().__init__(name="loop-watchdog", daemon=True)
+        self.thread_id = thread_id
+        self.threshold = threshold
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        reported = 0.0  # пульс, на якому вже звітували (одне повідомлення на зависання)
+        while not self._done.wait(self.threshold / 2):
+            beat = _HEARTBEAT
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or beat == reported:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            reported = beat
+            where = _where(frame)
+            stack = "".join(traceback.format_stack(frame, limit=25))
+            del frame
+            LOOP_BLOCKED.inc(where=where)
+            log.warning("[loopwatch] loop blocked for %.0f ms (so far) at %s\n%s", stalled * 1e3, where, stack)
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+async def _lag_loop(interval: float) -> None:
+    global _HEARTBEAT
+    while True:
+        t0 = time.monotonic()
+        _HEARTBEAT = t0 + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, time.monotonic() - t0 - interval))
+
+
+async def start_loop_watchdog(interval_ms: float = LOOP_LAG_INTERVAL_MS, block_ms: float = LOOP_BLOCK_MS) -> None:
+    """Запускає замір лагу (interval_ms > 0) і детектор блокувань (block_ms > 0)."""
+    global _TASK, _THREAD, _HEARTBEAT
+    if interval_ms <= 0 or (_TASK is not None and not _TASK.done()):
+        return
+    _HEARTBEAT = time.monotonic() + interval_ms / 1000
+    _TASK = asyncio.create_task(_lag_loop(interval_ms / 1000), name="loop_watchdog")
+    if block_ms > 0:
+        _THREAD = _BlockMonitor(threading.get_ident(), block_ms / 1000)
+        _THREAD.start()
+    log.info("[loopwatch] started (lag every %.0f ms, block ≥ %.0f ms)", interval_ms, block_ms)
+
+
+async def stop_loop_watchdog() -> None:
+    global _TASK, _THREAD
+    if _THREAD is not None:
+        await asyncio.to_thread(_THREAD.stop)
+        _THREAD = None
+    if _TASK is not None and not _TASK.done():
+        _TASK.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _TASK
+    _TASK = None
@@ -0,0 +1,254 @@
+# app/utils/metrics.py
+"""
+Мінімальний реєстр метрик у текстовому форматі Prometheus (без prometheus_client).
+
+    FETCH = histogram("ff_fetch_seconds", "…", ("status",))
+    FETCH.observe(0.12, status="200")
+    with FETCH.time(status="200"): ...
+
+Метрики потокобезпечні (розбір metals іде в asyncio.to_thread). Віддаються лише
+окремим сервером GET /metrics на METRICS_HOST:METRICS_PORT (за замовчуванням
+127.0.0.1, вимкнено) — не на публічному webhook-порту.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS: Tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+_REGISTRY: Dict[str, "_Metric"] = {}
+_REG_LOCK = threading.Lock()
+
+LabelKey = Tuple[str, ...]
+
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        return ()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def remove(self, **labels: str) -> None:
+        """Прибирає серію (напр., шард перейшов до іншого процесу)."""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def _samples(self) -> Iterable[str]:
+        if self._fn is not None:
+            try:
+                return [f"{self.name} {_fmt(self._fn())}"]
+            except Exception as e:
+                log.debug("[metrics] gauge %s failed: %s", self.name, e)
+                return []
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class _Timer(ContextDecorator):
+    def __init__(self, hist: "Histogram", labels: Dict[str, str]):
+        self._hist = hist
+        self._labels = labels
+
+    def _recreate_cm(self):
+        # як декоратор — новий таймер на кожен виклик (реентерабельність, потоки)
+        return _Timer(self._hist, self._labels)
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter() - self._t0, **self._labels)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key → [counts per bucket (+Inf останній), sum]
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                st = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            st[0][i] += 1
+            st[1][0] += value
+
+    def time(self, **labels: str) -> _Timer:
+        """Контекст-менеджер / декоратор (sync), що міряє тривалість блоку."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        st = self._values.get(self._key(labels))
+        return sum(st[0]) if st else 0
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        out: List[str] = []
+        for key, (counts, total) in items:
+            acc = 0
+            for le, n in zip((*self.buckets, math.inf), counts):
+                acc += n
+                le_label = 'le="%s"' % _fmt(le)
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le_label)} {acc}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {acc}")
+        return out
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _REG_LOCK:
+        existing = _REGISTRY.get(metric.name)
+        if existing is not None:
+            return existing
+        _REGISTRY[metric.name] = metric
+        return metric
+
+
+def counter(name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, doc, labelnames))  # type: ignore[return-value]
+
+
+def gauge(name: str, doc: str, labelnames: Sequence[str] = (),
+          fn: Optional[Callable[[], float]] = None) -> Gauge:
+    """fn — «живий» gauge: значення читається в момент scrape."""
+    return _register(Gauge(name, doc, labelnames, fn))  # type: ignore[return-value]
+
+
+def histogram(name: str, doc: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, doc, labelnames, buckets))  # type: ignore[return-value]
+
+
+def render() -> str:
+    """Усі метрики у text exposition format 0.0.4."""
+    with _REG_LOCK:
+        metrics = list(_REGISTRY.values())
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- HTTP --------------------
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_RUNNER = None
+
+
+async def metrics_handler(_request):
+    from aiohttp import web
+
+    return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def start_metrics_server(host: str, port: int) -> None:
+    """Окремий HTTP-сервер лише з GET /metrics (port <= 0 — вимкнено)."""
+    global _RUNNER
+    if port <= 0 or _RUNNER is not None:
+        return
+    from aiohttp import web
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    runner = web.AppRunner(app, handle_signals=False, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        log.warning(f"[metrics] cannot listen on {host}:{port}: {e}")
+        await runner.cleanup()
+        return
+    _RUNNER = runner
+    log.info(f"[metrics] listening on {host}:{port}/metrics")
+
+
+async def stop_metrics_server() -> None:
+    global _RUNNER
+    runner, _RUNNER = _RUNNER, None
+    if runner is not None:
+        await runner.cleanup()
@@ -0,0 +1,245 @@
+# app/utils/profiler.py
+"""
+Профілювання живого процесу без передеплою, обмежене в часі.
+
+  sample    — семплер стеків: окремий потік раз на interval читає стек потоку
+              event loop-а (sys._current_frames) і пише collapsed-stack файл
+              (*.folded — flamegraph.pl / speedscope). Loop не зупиняється,
+              накладні витрати — лише на семплування.
+  cprofile  — cProfile на потоці loop-а, файл *.prof (pstats / snakeviz).
+              Точніший, але сповільнює весь код loop-а на час профілю.
+  loop debug — loop.set_debug(True) на N секунд: asyncio логує callback-и,
+              довші за SLOW_CALLBACK_MS; вони ж рахуються й зводяться у звіт.
+
+Одночасно — максимум один профіль і один loop debug; тривалість обрізається
+до PROFILE_MAX_SECONDS. Запуск: /profile, /loopdebug (адміни) або сигнали
+SIGUSR1 (профіль) / SIGUSR2 (loop debug) на PROFILE_SIGNAL_SECONDS.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config.settings import PROFILE_DIR, PROFILE_MAX_SECONDS, PROFILE_SIGNAL_SECONDS, SLOW_CALLBACK_MS
+from .metrics import counter
+
+log = logging.getLogger(__name__)
+
+SLOW_CALLBACKS = counter("loop_slow_callbacks_total", "callbacks slower than SLOW_CALLBACK_MS while loop debug was on")
+
+SAMPLE_INTERVAL = 0.005
+_MAX_DEPTH = 128
+_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+
+OnDone = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_PROFILE_TASK: Optional[asyncio.Task] = None
+_DEBUG_TASK: Optional[asyncio.Task] = None
+
+
+def short_path(filename: str) -> str:
+    """Шлях файлу для звітів: відносно кореня репо / site-packages, інакше basename."""
+    if filename.startswith(_ROOT):
+        return filename[len(_ROOT):]
+    i = filename.rfind("site-packages" + os.sep)
+    if i >= 0:
+        return filename[i + len("site-packages") + 1:]
+    return os.path.basename(filename)
+
+
+class _StackSampler(threading.Thread):
+    """Потік-семплер стеків одного (цільового) потоку."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profiler-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._done = threading.Event()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None and len(stack) < _MAX_DEPTH:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            del frame
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def _write_folded(path: Path, stacks: Counter) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for stack, n in stacks.most_common():
+            f.write(f"{stack} {n}\n")
+
+
+def _top_leaves(stacks: Counter, samples: int, n: int = 10) -> List[str]:
+    leaves: Counter = Counter()
+    for stack, cnt in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += cnt
+    return [f"{cnt / samples:6.1%}  {label}" for label, cnt in leaves.most_common(n)] if samples else []
+
+
+def _dump_pstats(prof: cProfile.Profile, path: Path, n: int = 15) -> List[str]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    prof.dump_stats(str(path))
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).strip_dirs().sort_stats("cumulative").print_stats(n)
+    lines = [ln for ln in buf.getvalue().splitlines() if ln.strip()]
+    return lines[-n:]
+
+
+def _clamp(seconds: float) -> float:
+    return max(1.0, min(float(seconds), PROFILE_MAX_SECONDS))
+
+
+async def profile(seconds: float, mode: str = "sample", interval: float = SAMPLE_INTERVAL) -> Dict[str, Any]:
+    """
+    Профілює event loop seconds секунд (у цьому ж loop-і: лише чекаємо, нічого не блокуємо).
+    Повертає {"mode", "seconds", "path", "samples"?, "top"}; файл пишеться в PROFILE_DIR.
+    """
+    seconds = _clamp(seconds)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    t0 = time.perf_counter()
+    if mode == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()  # профілює лише поточний потік — потік loop-а
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            prof.disable()
+        path = Path(PROFILE_DIR) / f"profile-{stamp}.prof"
+        top = await asyncio.to_thread(_dump_pstats, prof, path)
+        result: Dict[str, Any] = {"top": top}
+    else:
+        sampler = _StackSampler(threading.get_ident(), interval)
+        # семплер бачить стек лише коли отримує GIL; при типовому 5 мс loop віддає
+        # його переважно в select(), і короткий CPU-код у профіль не потрапляє
+        switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch, interval / 10))
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sys.setswitchinterval(switch)
+            await asyncio.to_thread(sampler.stop)
+        path = Path(PROFILE_DIR) / f"profile-{stamp}.folded"
+        await asyncio.to_thread(_write_folded, path, sampler.stacks)
+        result = {"samples": sampler.samples, "top": _top_leaves(sampler.stacks, sampler.samples)}
+    result.update(mode=mode, seconds=round(time.perf_counter() - t0, 1), path=str(path))
+    log.warning("[profiler] %s profile %.0fs → %s", mode, seconds, path)
+    return result
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Ловить «Executing <Handle …> took X seconds» від asyncio у режимі debug."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.slow: List[tuple] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if isinstance(record.msg, str) and record.msg.startswith("Executing") and len(record.args or ()) >= 2:
+            SLOW_CALLBACKS.inc()
+            self.slow.append((float(record.args[-1]), str(record.args[0])[:200]))
+
+
+async def loop_debug(seconds: float, slow_ms: float = SLOW_CALLBACK_MS) -> Dict[str, Any]:
+    """Вмикає debug-режим loop-а на seconds секунд; повертає зведення повільних callback-ів."""
+    seconds = _clamp(seconds)
+    loop = asyncio.get_running_loop()
+    was_debug, was_slow = loop.get_debug(), loop.slow_callback_duration
+    handler = _SlowCallbackHandler()
+    logger = logging.getLogger("asyncio")
+    logger.addHandler(handler)
+    loop.slow_callback_duration = slow_ms / 1000
+    loop.set_debug(True)
+    log.warning("[profiler] loop debug on for %.0fs (slow callback ≥ %.0f ms)", seconds, slow_ms)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        loop.set_debug(was_debug)
+        loop.slow_callback_duration = was_slow
+        logger.removeHandler(handler)
+    worst = sorted(handler.slow, reverse=True)[:10]
+    log.warning("[profiler] loop debug off: %d slow callback(s)", len(handler.slow))
+    return {
+        "seconds": seconds,
+        "slow_ms": slow_ms,
+        "slow_callbacks": len(handler.slow),
+        "worst": [f"{took * 1e3:8.1f} ms  {what}" for took, what in worst],
+    }
+
+
+def _spawn(coro, on_done: Optional[OnDone], name: str) -> asyncio.Task:
+    async def runner():
+        try:
+            result = await coro
+        except Exception as e:
+            log.warning("[profiler] %s failed: %s", name, e)
+            result = {"error": str(e)}
+        if on_done is not None:
+            with contextlib.suppress(Exception):
+                await on_done(result)
+        return result
+
+    return asyncio.create_task(runner(), name=name)
+
+
+def start_profile(seconds: float, mode: str = "sample", on_done: Optional[OnDone] = None) -> bool:
+    """Запускає профіль у фоні; False, якщо інший ще триває."""
+    global _PROFILE_TASK
+    if _PROFILE_TASK is not None and not _PROFILE_TASK.done():
+        return False
+    _PROFILE_TASK = _spawn(profile(seconds, mode), on_done, "profiler")
+    return True
+
+
+def start_loop_debug(seconds: float, slow_ms: float = SLOW_CALLBACK_MS, on_done: Optional[OnDone] = None) -> bool:
+    """Вмикає loop debug у фоні; False, якщо вже увімкнено."""
+    global _DEBUG_TASK
+    if _DEBUG_TASK is not None and not _DEBUG_TASK.done():
+        return False
+    _DEBUG_TASK = _spawn(loop_debug(seconds, slow_ms), on_done, "loop-debug")
+    return True
+
+
+def install_signal_handlers() -> None:
+    """SIGUSR1 — профіль (sample), SIGUSR2 — loop debug, обидва на PROFILE_SIGNAL_SECONDS."""
+    loop = asyncio.get_running_loop()
+    for sig, start in ((getattr(signal, "SIGUSR1", None), lambda: start_profile(PROFILE_SIGNAL_SECONDS)),
+                       (getattr(signal, "SIGUSR2", None), lambda: start_loop_debug(PROFILE_SIGNAL_SECONDS))):
+        if sig is None:
+            continue
+        with contextlib.suppress(NotImplementedError, RuntimeError):
+            loop.add_signal_handler(sig, start)
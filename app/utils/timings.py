@@ -0,0 +1,31 @@
+# app/utils/timings.py
+"""
+Розклад часу одного апдейта по секціях (db / fetch / parse / telegram).
+
+Middleware (app.handlers.middleware) відкриває «кошик» на апдейт через
+start_breakdown(); нижчі шари лише додають свій час через add_time() — поза
+апдейтом (планувальник, скрипти) це no-op. ContextVar копіюється в задачі й
+asyncio.to_thread, тож час із потоків теж потрапляє в кошик свого апдейта.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+
+_BREAKDOWN: ContextVar[Optional[Dict[str, float]]] = ContextVar("update_breakdown", default=None)
+
+
+def start_breakdown() -> Token:
+    return _BREAKDOWN.set({})
+
+
+def finish_breakdown(token: Token) -> Dict[str, float]:
+    data = _BREAKDOWN.get() or {}
+    _BREAKDOWN.reset(token)
+    return data
+
+
+def add_time(section: str, seconds: float) -> None:
+    data = _BREAKDOWN.get()
+    if data is not None:
+        data[section] = data.get(section, 0.0) + seconds
@@ -0,0 +1,159 @@
+# app/webhook.py
+import asyncio
+import contextlib
+import logging
+import signal
+from typing import Any, Dict, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from .config.settings import (
+    WEBAPP_HOST,
+    WEBAPP_PORT,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_DRAIN_SECONDS,
+    WEBHOOK_MAX_PENDING,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+)
+
+log = logging.getLogger(__name__)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    SimpleRequestHandler з обмеженням паралельності та graceful drain.
+    Telegram отримує 200 одразу (handle_in_background), а самі апдейти
+    обробляються не більше ніж по `concurrency` одночасно. Черга прийнятих
+    обмежена `max_pending`: понад неї апдейт відхиляється 429, після початку
+    зупинки — 503. Telegram повторить їх пізніше (іншому воркеру або після
+    рестарту), а вже прийняті доробляються.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        secret_token: Optional[str] = None,
+        concurrency: int = WEBHOOK_CONCURRENCY,
+        drain_timeout: float = WEBHOOK_DRAIN_SECONDS,
+        max_pending: int = WEBHOOK_MAX_PENDING,
+        **data: Any,
+    ):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._drain_timeout = drain_timeout
+        self._max_pending = max(1, max_pending)
+        self._draining = False
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._background_feed_update_tasks)
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        async with self._sem:
+            try:
+                await super()._background_feed_update(bot, update)
+            except Exception as e:
+                log.exception(f"[webhook] update {update.get('update_id')} failed: {e}")
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self._draining:
+            return web.Response(status=503, text="draining")
+        if self.in_flight >= self._max_pending:
+            return web.Response(status=429, text="busy", headers={"Retry-After": "1"})
+        return await super().handle(request)
+
+    def stop_accepting(self) -> None:
+        """Нові апдейти відтепер отримують 503; прийняті доробляються."""
+        self._draining = True
+
+    async def drain(self) -> None:
+        """Перестає приймати апдейти і чекає завершення прийнятих (до drain_timeout)."""
+        self.stop_accepting()
+        pending = set(self._background_feed_update_tasks)
+        if not pending:
+            return
+        log.info("[webhook] draining %d in-flight update(s)…", len(pending))
+        done, pending = await asyncio.wait(pending, timeout=self._drain_timeout)
+        if pending:
+            log.warning("[webhook] drain timeout: cancelling %d update(s)", len(pending))
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.drain()
+        await super().close()
+
+
+def build_webhook_app(bot: Bot, dp: Dispatcher, **handler_kw: Any) -> web.Application:
+    """
+    aiohttp-застосунок: POST WEBHOOK_PATH → dispatcher, GET /healthz → ok.
+    /metrics тут немає: застосунок публічний (WEBAPP_HOST), метрики віддає окремий
+    локальний сервер на METRICS_HOST:METRICS_PORT (utils.metrics.start_metrics_server).
+    """
+    app = web.Application()
+    handler = BoundedRequestHandler(dp, bot, secret_token=WEBHOOK_SECRET or None, **handler_kw)
+    handler.register(app, path=WEBHOOK_PATH)
+    app["webhook_handler"] = handler
+
+    async def healthz(_: web.Request) -> web.Response:
+        return web.json_response({"ok": True, "in_flight": handler.in_flight})
+
+    app.router.add_get("/healthz", healthz)
+    # startup/shutdown хуки диспетчера (on_startup/on_shutdown з app.main)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def set_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """Реєструє WEBHOOK_BASE_URL + WEBHOOK_PATH у Telegram (якщо задано)."""
+    if not WEBHOOK_BASE_URL:
+        log.warning("[webhook] WEBHOOK_BASE_URL is empty → setWebhook skipped")
+        return
+    url = f"{WEBHOOK_BASE_URL}{WEBHOOK_PATH}"
+    await bot.set_webhook(
+        url,
+        secret_token=WEBHOOK_SECRET or None,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=max(1, min(100, WEBHOOK_CONCURRENCY)),
+    )
+    log.info(f"[webhook] set → {url}")
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher, register: bool = True) -> None:
+    """
+    Піднімає aiohttp-сервер і чекає SIGTERM/SIGINT (або скасування).
+    На зупинці: сервер перестає слухати, прийняті апдейти доробляються
+    (WEBHOOK_DRAIN_SECONDS), далі — on_shutdown диспетчера.
+    """
+    app = build_webhook_app(bot, dp)
+    runner = web.AppRunner(app, handle_signals=False)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT)
+    await site.start()
+    log.info(f"[webhook] listening on {WEBAPP_HOST}:{WEBAPP_PORT}{WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with contextlib.suppress(NotImplementedError, RuntimeError):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        if register:
+            await set_webhook(bot, dp)
+        await stop.wait()
+        log.info("[webhook] stop signal received")
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            with contextlib.suppress(NotImplementedError, RuntimeError):
+                loop.remove_signal_handler(sig)
+        # Спершу drain при живому сайті: нові запити одразу отримують 503,
+        # а не висять, доки runner.cleanup() закриває з'єднання.
+        handler: BoundedRequestHandler = app["webhook_handler"]
+        await handler.drain()
+        await runner.cleanup()
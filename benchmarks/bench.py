@@ -0,0 +1,271 @@
+# benchmarks/bench.py
+"""
+Мікро- і макробенчмарки гарячих шляхів на фікстурах benchmarks/fixtures/:
+  ff.build_events_from_raw[lang]   — thisweek.json → FFEvent
+  ff.filter_events                 — фільтр типової підписки
+  ff.event_to_text[lang]           — рендер картки (на подію)
+  ff.translate_title               — переклад заголовка (на заголовок)
+  metals.parse_week / parse_today  — BeautifulSoup-розбір HTML
+  metals.build_grouped_blocks      — рендер тижневого дайджесту
+  scheduler.tick[N]                — повний тік (get_all_subs + run_tick) на N
+                                     синтетичних підписках в SQLite :memory:;
+                                     cold — перший тік з розсилкою, warm — повторний
+                                     (лише дедуп)
+
+Результат — JSON (медіана/мін/p95 на одну операцію), який можна порівнювати:
+  python benchmarks/bench.py                           # усе, subs=1k,10k,100k
+  python benchmarks/bench.py --quick                   # швидкий прогін (subs=1k)
+  python benchmarks/bench.py --compare base.json       # exit 1, якщо медіана гірша > threshold
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+HERE = Path(__file__).resolve().parent
+FIXTURES = HERE / "fixtures"
+sys.path.insert(0, str(ROOT))
+
+# до імпорту app: БД у пам'яті, metals-сховища читають фікстури
+os.environ["DB_PATH"] = ":memory:"
+os.environ["METALS_WEEK_HTML"] = str(FIXTURES / "metals_week.html")
+os.environ["METALS_TODAY_HTML"] = str(FIXTURES / "metals_today.html")
+os.environ.setdefault("SLOW_UPDATE_MS", "0")
+
+from app.config.settings import LOCAL_TZ, UTC  # noqa: E402
+from app.core import database  # noqa: E402
+from app.core.scheduler import run_tick  # noqa: E402
+from app.services.event_index import EventIndex  # noqa: E402
+from app.services.forex_client import _build_events_from_raw  # noqa: E402
+from app.services.metals_store import get_today_snapshot, get_week_snapshot  # noqa: E402
+from app.services.metals_parser import parse_metals_today_html, parse_metals_week_html  # noqa: E402
+from app.services.translator import translate_title  # noqa: E402
+from app.ui.filters import filter_events  # noqa: E402
+from app.ui.formatting import event_to_text  # noqa: E402
+from app.ui.metals_render import build_grouped_blocks  # noqa: E402
+
+Result = Dict[str, Any]
+
+
+def measure(fn: Callable[[], Any], number: int, repeat: int, ops: int = 1) -> Result:
+    """repeat серій по number викликів; статистика — секунди на одну операцію."""
+    fn()  # прогрів
+    per_op: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_op.append((time.perf_counter() - t0) / (number * ops))
+    per_op.sort()
+    return {
+        "median_s": statistics.median(per_op),
+        "min_s": per_op[0],
+        "p95_s": per_op[min(len(per_op) - 1, int(round(0.95 * (len(per_op) - 1))))],
+        "repeat": repeat,
+        "number": number,
+        "ops": ops,
+    }
+
+
+# -------------------- micro --------------------
+
+def bench_micro(repeat: int) -> Dict[str, Result]:
+    raw = json.loads((FIXTURES / "thisweek.json").read_text(encoding="utf-8"))
+    week_html = (FIXTURES / "metals_week.html").read_text(encoding="utf-8")
+    today_html = (FIXTURES / "metals_today.html").read_text(encoding="utf-8")
+    events = _build_events_from_raw(raw, "en")
+    titles = [str(e.get("title") or "") for e in raw]
+    mm_week = parse_metals_week_html(week_html)
+
+    out: Dict[str, Result] = {}
+    for lang in ("en", "ua"):
+        out[f"ff.build_events_from_raw[{lang}]"] = measure(lambda: _build_events_from_raw(raw, lang), 20, repeat)
+    out["ff.filter_events"] = measure(
+        lambda: filter_events(events, ["High", "Medium"], ["USD", "EUR", "GBP"], []), 200, repeat)
+    for lang in ("en", "ua"):
+        out[f"ff.event_to_text[{lang}]"] = measure(
+            lambda: [event_to_text(e, LOCAL_TZ, lang) for e in events], 10, repeat, ops=len(events))
+    out["ff.translate_title"] = measure(
+        lambda: [translate_title(t, "ua") for t in titles], 20, repeat, ops=len(titles))
+    out["metals.parse_week"] = measure(lambda: parse_metals_week_html(week_html), 3, repeat)
+    out["metals.parse_today"] = measure(lambda: parse_metals_today_html(today_html), 10, repeat)
+    for lang in ("en", "ua"):
+        out[f"metals.build_grouped_blocks[{lang}]"] = measure(
+            lambda: build_grouped_blocks(mm_week, prefix="Metals", lang=lang), 20, repeat)
+    return out
+
+
+# -------------------- scheduler tick --------------------
+
+class CountingBot:
+    """Замість Telegram: лише рахує відправлення."""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_message(self, chat_id, text, **kw):
+        self.sent += 1
+
+
+_IMPACTS = ["High,Medium", "High", "High,Medium,Low", "Medium"]
+_COUNTRIES = ["", "USD", "USD,EUR", "EUR,GBP,JPY", "AUD,NZD,CAD"]
+
+
+def _seed_subs(n: int, rnd: random.Random) -> None:
+    conn = database._conn()
+    conn.execute("DELETE FROM subscriptions")
+    conn.execute("DELETE FROM sent_log")
+    rows = []
+    for i in range(n):
+        metals = rnd.random() < 0.2
+        rows.append((
+            i + 1, 10_000 + i,
+            rnd.choice(_IMPACTS), rnd.choice(_COUNTRIES), rnd.choice([5, 15, 30, 60]),
+            "09:00", rnd.choice(["en", "ua"]),
+            "High,Medium" if metals else "", "", rnd.choice([15, 30]),
+        ))
+    conn.executemany(
+        "INSERT INTO subscriptions (user_id, chat_id, impact_filter, countries_filter, alert_minutes,"
+        " daily_time, lang_mode, metals_impact_filter, metals_countries_filter, metals_alert_minutes)"
+        " VALUES (?,?,?,?,?,?,?,?,?,?)",
+        rows,
+    )
+    database.reset_sent_cache()
+    database.hydrate_sent_cache()
+
+
+async def _tick(bot: CountingBot, index: EventIndex, now_utc: datetime) -> float:
+    t0 = time.perf_counter()
+    subs = database.get_all_subs()
+    await run_tick(bot, index, subs, [], now_utc)
+    return time.perf_counter() - t0
+
+
+def bench_ticks(sizes: List[int], repeat: int) -> Dict[str, Result]:
+    raw = json.loads((FIXTURES / "thisweek.json").read_text(encoding="utf-8"))
+    index = EventIndex(_build_events_from_raw(raw, "en"), 1)
+    # момент, коли щось «на підході»: за 30 хв до медіанної події тижня
+    target = index.events[len(index.events) // 2].date
+    now_utc = (target - timedelta(minutes=30)).astimezone(UTC)
+    # metals-знімки розбираються один раз на файл — це не частина тіку
+    get_week_snapshot()
+    get_today_snapshot()
+
+    out: Dict[str, Result] = {}
+    for n in sizes:
+        rnd = random.Random(n)
+        cold: List[float] = []
+        warm: List[float] = []
+        sent = 0
+        for _ in range(max(1, repeat if n <= 10_000 else 1)):
+            _seed_subs(n, rnd)
+            bot = CountingBot()
+            cold.append(asyncio.run(_tick(bot, index, now_utc)))
+            sent = bot.sent
+            warm.append(asyncio.run(_tick(bot, index, now_utc)))
+        for name, xs in (("cold", cold), ("warm", warm)):
+            xs.sort()
+            out[f"scheduler.tick[{n}].{name}"] = {
+                "median_s": statistics.median(xs), "min_s": xs[0], "p95_s": xs[-1],
+                "repeat": len(xs), "number": 1, "ops": 1, "subs": n,
+                **({"sends": sent} if name == "cold" else {}),
+            }
+    return out
+
+
+# -------------------- report / compare --------------------
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return ""
+
+
+def _fixtures_digest() -> str:
+    h = hashlib.sha1()
+    for p in sorted(FIXTURES.glob("*")):
+        h.update(p.name.encode())
+        h.update(p.read_bytes())
+    return h.hexdigest()[:12]
+
+
+def compare(current: Dict[str, Result], baseline_path: Path, threshold: float) -> bool:
+    base = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+    ok = True
+    print(f"\ncompare with {baseline_path} (threshold +{threshold:.0%}):")
+    for name, res in current.items():
+        old = base.get(name)
+        if not old or not old.get("median_s"):
+            print(f"  {name:<42} new")
+            continue
+        ratio = res["median_s"] / old["median_s"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        ok = ok and not flag
+        print(f"  {name:<42} {ratio:6.2f}x {flag}")
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--subs", default="1000,10000,100000", help="розміри для scheduler.tick, через кому")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--quick", action="store_true", help="repeat=3, subs=1000")
+    ap.add_argument("--only", choices=["micro", "tick"], help="лише одна група")
+    ap.add_argument("--out", type=Path, help="куди писати JSON (за замовч. benchmarks/results/<час>.json)")
+    ap.add_argument("--compare", type=Path, help="попередній JSON для порівняння")
+    ap.add_argument("--threshold", type=float, default=0.2, help="допустиме погіршення медіани (0.2 = +20%%)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    if not (FIXTURES / "thisweek.json").exists():
+        sys.exit("no fixtures: run python benchmarks/make_fixtures.py")
+
+    repeat = 3 if args.quick else args.repeat
+    sizes = [1000] if args.quick else [int(x) for x in args.subs.split(",") if x.strip()]
+
+    results: Dict[str, Result] = {}
+    if args.only != "tick":
+        results.update(bench_micro(repeat))
+    if args.only != "micro":
+        results.update(bench_ticks(sizes, repeat))
+
+    for name, r in results.items():
+        extra = f"  sends={r['sends']}" if "sends" in r else ""
+        print(f"{name:<42} median {r['median_s'] * 1e3:10.3f} ms   p95 {r['p95_s'] * 1e3:10.3f} ms{extra}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixtures": _fixtures_digest(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+    out = args.out or HERE / "results" / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=1), encoding="utf-8")
+    print(f"\nresults → {out}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
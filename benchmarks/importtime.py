@@ -0,0 +1,98 @@
+# benchmarks/importtime.py
+"""
+Аудит часу імпорту (холодний старт процесу до polling/webhook).
+
+Запускає `python -X importtime -c "import <target>"` у свіжих процесах
+(перший прогін — прогрів .pyc, далі --runs вимірів), бере медіану
+кумулятивного часу кожного модуля і друкує:
+  - загальний час імпорту target і «стіну» процесу;
+  - верхні --top модулів верхнього рівня (пакети) за кумулятивним часом;
+  - модулі застосунку (app.*) і важкі залежності, що тягнуться з них.
+
+  python benchmarks/importtime.py                         # target=run
+  python benchmarks/importtime.py --target app.main --top 25
+  python benchmarks/importtime.py --out benchmarks/importtime.txt
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+# залежності, які варто тримати поза шляхом старту
+WATCH = ("bs4", "lxml", "apscheduler", "psycopg", "dateutil", "httpx", "playwright", "pytz", "tzlocal")
+
+
+def one_run(target: str, env: Dict[str, str]) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """(стіна процесу, [(модуль, self_us, cumulative_us, глибина)])."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        sys.exit(proc.stderr[-2000:])
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return wall, rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--target", default="run", help="модуль, що імпортується (run — точка входу)")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--out", type=Path, help="записати звіт у файл (напр. benchmarks/importtime.txt)")
+    args = ap.parse_args()
+
+    env = dict(os.environ, DB_PATH=os.environ.get("DB_PATH", ":memory:"), PYTHONDONTWRITEBYTECODE="")
+    one_run(args.target, env)  # прогрів .pyc
+
+    walls: List[float] = []
+    cum: Dict[str, List[int]] = defaultdict(list)
+    depth: Dict[str, int] = {}
+    for _ in range(args.runs):
+        wall, rows = one_run(args.target, env)
+        walls.append(wall)
+        for name, _self, c, d in rows:
+            cum[name].append(c)
+            depth[name] = min(d, depth.get(name, d))
+    med = {name: statistics.median(xs) for name, xs in cum.items()}
+
+    out: List[str] = []
+    total = med.get(args.target, 0)
+    out.append(f"target: {args.target}   python {sys.version.split()[0]}   runs: {args.runs} (median)")
+    out.append(f"import {args.target}: {total / 1e3:8.1f} ms   process wall: {statistics.median(walls) * 1e3:8.1f} ms")
+    out.append("")
+    out.append(f"top-level packages by cumulative import time (top {args.top}):")
+    top_level = sorted(((n, c) for n, c in med.items() if "." not in n), key=lambda x: -x[1])
+    for name, c in top_level[:args.top]:
+        out.append(f"  {c / 1e3:8.1f} ms  {name}")
+    out.append("")
+    out.append("watched dependencies (loaded at start-up?):")
+    for name in WATCH:
+        out.append(f"  {name:<12} {'%8.1f ms' % (med[name] / 1e3) if name in med else '     not imported'}")
+    out.append("")
+    out.append("app modules by cumulative import time:")
+    app_mods = sorted(((n, c) for n, c in med.items() if n == "app" or n.startswith("app.")), key=lambda x: -x[1])
+    for name, c in app_mods[:args.top]:
+        out.append(f"  {c / 1e3:8.1f} ms  {name}")
+
+    report = "\n".join(out)
+    print(report)
+    if args.out:
+        args.out.write_text(report + "\n", encoding="utf-8")
+        print(f"\nreport → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
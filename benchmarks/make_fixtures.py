@@ -0,0 +1,163 @@
+# benchmarks/make_fixtures.py
+"""
+Фікстури для benchmarks/bench.py (лежать у benchmarks/fixtures/):
+  thisweek.json       — payload ForexFactory thisweek.json
+  metals_week.html    — MetalsMine «this week» (tbody на день)
+  metals_today.html   — MetalsMine «today»
+
+За замовчуванням генерує детерміновані фікстури (seed) у форматі реальних
+відповідей — заголовки з translator.UA_DICT/METALS_DICT, ті самі CSS-класи,
+що читає metals_parser. --record замість цього зберігає живий thisweek.json
+(FF_THISWEEK) і копіює data/metals_*.html, якщо вони є.
+
+Запуск (з кореня репо):
+  python benchmarks/make_fixtures.py            # синтетичні, seed=42
+  python benchmarks/make_fixtures.py --record   # записати реальні
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.translator import METALS_DICT, UA_DICT  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+WEEK_START = datetime(2025, 10, 20)  # понеділок; FF віддає час у -04:00 (NY)
+FF_TZ = timezone(timedelta(hours=-4))
+CURRENCIES = ["USD", "EUR", "GBP", "JPY", "AUD", "NZD", "CAD", "CHF", "CNY"]
+FF_IMPACTS = ["High", "Medium", "Low", "Holiday"]
+MM_IMPACTS = {"High": "red", "Medium": "ora", "Low": "yel", "Non-economic": "gra"}
+MM_PREFIXES = ["US", "EZ", "UK", "CN", "JP", "AU", "CA", "DE"]
+
+
+def _value(rnd: random.Random) -> str:
+    kind = rnd.random()
+    if kind < 0.5:
+        return f"{rnd.uniform(-2, 5):.1f}%"
+    if kind < 0.8:
+        return f"{rnd.uniform(40, 60):.1f}"
+    return f"{rnd.randint(-300, 400)}K"
+
+
+def make_thisweek(rnd: random.Random, per_day: int = 28) -> list:
+    titles = list(UA_DICT) + ["Bank Holiday", "FOMC Member Speaks", "10-y Bond Auction"]
+    out = []
+    for d in range(5):
+        day = WEEK_START + timedelta(days=d)
+        for _ in range(per_day):
+            t = day.replace(hour=rnd.choice([2, 3, 4, 5, 7, 8, 9, 10, 14, 19, 20, 21]),
+                            minute=rnd.choice([0, 0, 15, 30, 45]), tzinfo=FF_TZ)
+            prev = _value(rnd)
+            out.append({
+                "title": rnd.choice(titles),
+                "country": rnd.choice(CURRENCIES),
+                "date": t.isoformat(),
+                "impact": rnd.choices(FF_IMPACTS, weights=[2, 3, 5, 1])[0],
+                "forecast": _value(rnd) if rnd.random() < 0.7 else "",
+                "previous": prev,
+                # частина подій уже з actual — для released-диффу
+                "actual": _value(rnd) if d < 2 and rnd.random() < 0.5 else "",
+                "url": "https://www.forexfactory.com/calendar",
+            })
+    out.sort(key=lambda e: e["date"])
+    return out
+
+
+def _mm_time(h: int, m: int) -> str:
+    ap = "am" if h < 12 else "pm"
+    return f"{(h % 12) or 12}:{m:02d}{ap}"
+
+
+def _mm_rows(rnd: random.Random, day: datetime, n: int, with_date: bool) -> list:
+    titles = list(METALS_DICT)
+    rows = []
+    times = sorted({(rnd.randint(1, 22), rnd.choice([0, 15, 30, 45])) for _ in range(n)})
+    for i, (h, m) in enumerate(times):
+        for j in range(rnd.choice([1, 1, 1, 2, 3])):
+            label = "All Day" if rnd.random() < 0.04 else _mm_time(h, m)
+            no_grid = j > 0
+            impact = rnd.choices(list(MM_IMPACTS), weights=[2, 3, 5, 1])[0]
+            title = f"{rnd.choice(MM_PREFIXES)} {rnd.choice(titles)}"
+            date_cell = f"{day:%a} <span>{day:%b %d}</span>" if with_date and i == 0 and j == 0 else ""
+            time_cell = "" if no_grid else f'<span class="icon icon--upcoming"></span><span>{label}</span>'
+            cls = "calendar__row calendar__row--no-grid" if no_grid else "calendar__row"
+            rows.append(
+                f'<tr class="{cls}">'
+                f'<td class="calendar__cell calendar__date">{date_cell}</td>'
+                f'<td class="calendar__cell calendar__time">{time_cell}</td>'
+                f'<td class="calendar__cell calendar__impact"><span><img src="/images/mm-impact-{MM_IMPACTS[impact]}.png"></span></td>'
+                f'<td class="calendar__cell calendar__event"><div><span class="calendar__event-title">{title}</span></div></td>'
+                f'<td class="calendar__cell calendar__actual"><span>{_value(rnd) if rnd.random() < 0.3 else ""}</span></td>'
+                f'<td class="calendar__cell calendar__forecast"><span>{_value(rnd)}</span></td>'
+                f'<td class="calendar__cell calendar__previous"><span>{_value(rnd)}</span></td>'
+                "</tr>"
+            )
+    return rows
+
+
+def _mm_page(tbodies: list) -> str:
+    return (
+        "<!DOCTYPE html><html><head><title>MetalsMine Calendar</title></head><body>"
+        '<table class="calendar__table">' + "".join(tbodies) + "</table></body></html>"
+    )
+
+
+def make_metals_week(rnd: random.Random, per_day: int = 14) -> str:
+    tbodies = []
+    for d in range(7):
+        day = WEEK_START - timedelta(days=1) + timedelta(days=d)  # MetalsMine: тиждень з неділі
+        breaker = (f'<tr class="calendar__row calendar__row--day-breaker">'
+                   f'<td class="calendar__cell" colspan="7">{day:%a} <span>{day:%b %d}</span></td></tr>')
+        tbodies.append("<tbody>" + breaker + "".join(_mm_rows(rnd, day, per_day, True)) + "</tbody>")
+    return _mm_page(tbodies)
+
+
+def make_metals_today(rnd: random.Random, n: int = 16) -> str:
+    return _mm_page(["<tbody>" + "".join(_mm_rows(rnd, WEEK_START, n, True)) + "</tbody>"])
+
+
+def record() -> None:
+    import httpx
+
+    from app.config.settings import FF_THISWEEK
+    from app.utils.helpers import resolve_data_path
+
+    r = httpx.get(FF_THISWEEK, timeout=20, follow_redirects=True)
+    r.raise_for_status()
+    (FIXTURES / "thisweek.json").write_bytes(r.content)
+    print(f"recorded thisweek.json ({len(r.content)} bytes)")
+    for name in ("metals_week.html", "metals_today.html"):
+        src = Path(resolve_data_path(name))
+        if src.exists() and src.stat().st_size:
+            shutil.copyfile(src, FIXTURES / name)
+            print(f"copied {src} → fixtures/{name}")
+        else:
+            print(f"skip {name}: {src} not found (run scripts/update_metals*.sh first)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--record", action="store_true", help="зберегти реальні payload-и замість синтетичних")
+    args = ap.parse_args()
+
+    FIXTURES.mkdir(parents=True, exist_ok=True)
+    if args.record:
+        record()
+        return
+    rnd = random.Random(args.seed)
+    ff = make_thisweek(rnd)
+    (FIXTURES / "thisweek.json").write_text(json.dumps(ff, ensure_ascii=False, indent=1), encoding="utf-8")
+    (FIXTURES / "metals_week.html").write_text(make_metals_week(rnd), encoding="utf-8")
+    (FIXTURES / "metals_today.html").write_text(make_metals_today(rnd), encoding="utf-8")
+    print(f"fixtures written to {FIXTURES} (thisweek: {len(ff)} events, seed={args.seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 import asyncio
 import logging
+import signal
 import contextlib
 from pathlib import Path
 
@@ -8,10 +9,17 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).parent / ".env")
 
 from aiogram.exceptions import TelegramConflictError
-from app.config.settings import BOT_TOKEN
-from app.main import build_bot, build_dispatcher
+from app.config.settings import (
+    BOT_MODE, BOT_ROLE, BOT_TOKEN, METRICS_HOST, METRICS_PORT, SCHEDULER_SHARD, SCHEDULER_SHARDS,
+)
+from app.core.database import close_db, init_db
+from app.core.leader import run_leader_election, shard_lock_keys
+from app.utils.cpu_pool import start_cpu_pool, stop_cpu_pool
+from app.utils.loop_watchdog import start_loop_watchdog, stop_loop_watchdog
+from app.utils.metrics import start_metrics_server, stop_metrics_server
+from app.utils.profiler import install_signal_handlers
+from app.main import build_bot, build_dispatcher, start_background, stop_background
 
-import psycopg
 from contextlib import asynccontextmanager
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -33,6 +41,8 @@ async def acquire_pg_lock(dsn: str, key: int):
         yield
         return
 
+    import psycopg  # лише для PG-розгортань; не тягнемо на старті
+
     conn = await psycopg.AsyncConnection.connect(
         dsn,
         options="-c application_name=forex-bot-worker"
@@ -65,13 +75,86 @@ async def acquire_pg_lock(dsn: str, key: int):
             await conn.close()
 
 
+async def _wait_for_signal() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with contextlib.suppress(NotImplementedError, RuntimeError):
+            loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+
+async def run_split(bot, role: str, lock_key: int) -> None:
+    """
+    Розділена топологія (BOT_ROLE != single):
+      - replica: приймає апдейти (webhook) + кандидат у лідери;
+      - worker:  лише апдейти (webhook), без фонових задач;
+      - leader:  лише кандидат у лідери (кеш FF, планувальник, метали).
+    Advisory-lock обирає тільки лідера фонових задач; апдейти обробляють усі
+    репліки паралельно через спільну БД. Метали: data/*.html має бути на
+    спільному томі, бо оновлює їх лідер (шард 0).
+
+    SCHEDULER_SHARDS=K → K незалежних лідерів, кожен зі своїм ключем
+    (shard_lock_keys від lock_key) і своєю партицією (чат доставки) % K.
+    """
+    if role in ("replica", "worker") and BOT_MODE != "webhook":
+        raise RuntimeError(f"BOT_ROLE={role} needs BOT_MODE=webhook (polling allows one consumer)")
+
+    # без on_startup/on_shutdown: БД відкриваємо тут, закриваємо після зупинки лідера
+    init_db()
+    # /metrics — лише окремим локальним сервером (METRICS_PORT), не на публічному webhook-порту
+    await start_metrics_server(METRICS_HOST, METRICS_PORT)
+    await start_loop_watchdog()
+    await start_cpu_pool()
+    dp = build_dispatcher(background=False)
+    elector = None
+    if role in ("replica", "leader"):
+        shards = SCHEDULER_SHARDS
+        if shards > 1 and not DATABASE_URL:
+            # без PG немає виборів: один процес мусить обслуговувати всі партиції
+            logging.error(f"[leader] SCHEDULER_SHARDS={shards} needs DATABASE_URL → running unsharded (shards=1)")
+            shards = 1
+        only = SCHEDULER_SHARD if SCHEDULER_SHARD is not None and SCHEDULER_SHARD < shards else None
+        shard_ids = list(range(shards)) if only is None else [only]
+        logging.warning(f"[leader] shards={shards} candidate for {shard_ids}")
+        elector = asyncio.create_task(
+            run_leader_election(
+                DATABASE_URL,
+                shard_lock_keys(lock_key, shards, only),
+                on_elected=lambda shard: start_background(bot, shard, shards),
+                on_demoted=lambda shard: stop_background(),
+                shard_ids=shard_ids,
+                all_keys=shard_lock_keys(lock_key, shards),
+            ),
+            name="leader_election",
+        )
+    try:
+        if role in ("replica", "worker"):
+            logging.info(f"Starting webhook server (role={role})…")
+            from app.webhook import run_webhook  # aiohttp.web — лише в webhook-режимі
+            await run_webhook(bot, dp)
+        else:
+            logging.info("Running as background leader candidate…")
+            await _wait_for_signal()
+    finally:
+        if elector is not None:
+            elector.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await elector
+        await stop_cpu_pool()
+        await stop_loop_watchdog()
+        await stop_metrics_server()
+        close_db()
+
+
 async def main():
     if not BOT_TOKEN:
         raise RuntimeError("Set BOT_TOKEN in environment")
 
     logging.info("Creating bot and dispatcher...")
     bot = build_bot()
-    dp = build_dispatcher()
+    # SIGUSR1 — профіль loop-а, SIGUSR2 — loop debug (див. app.utils.profiler)
+    install_signal_handlers()
 
     # Діагностика бота та ключа локера
     me = await bot.get_me()
@@ -80,16 +163,34 @@ async def main():
     logging.warning(f"BOT DIAG: id={me.id} user=@{me.username} token_head={token_head}")
     logging.warning(f"[lock] DATABASE_URL set: {bool(DATABASE_URL)} | lock_key={lock_key}")
 
-    # Скидаємо вебхук і «хвіст» апдейтів на випадок міграцій
-    with contextlib.suppress(Exception):
-        await bot.delete_webhook(drop_pending_updates=True)
-        logging.info("Webhook deleted.")
+    webhook_mode = BOT_MODE == "webhook"
+    logging.warning(f"BOT_MODE={'webhook' if webhook_mode else 'polling'} | BOT_ROLE={BOT_ROLE}")
+
+    if BOT_ROLE != "single":
+        try:
+            await run_split(bot, BOT_ROLE, lock_key)
+        finally:
+            with contextlib.suppress(Exception):
+                await bot.session.close()
+        return
+
+    dp = build_dispatcher()
+    if not webhook_mode:
+        # Скидаємо вебхук і «хвіст» апдейтів на випадок міграцій
+        with contextlib.suppress(Exception):
+            await bot.delete_webhook(drop_pending_updates=True)
+            logging.info("Webhook deleted.")
 
-    # ВАЖЛИВО: і scheduler, і polling — тільки всередині локера
+    # ВАЖЛИВО: і scheduler, і прийом апдейтів — тільки всередині локера
     try:
         async with acquire_pg_lock(DATABASE_URL, lock_key):
-            logging.info("Starting polling (inside lock)…")
-            await dp.start_polling(bot)
+            if webhook_mode:
+                logging.info("Starting webhook server (inside lock)…")
+                from app.webhook import run_webhook  # aiohttp.web — лише в webhook-режимі
+                await run_webhook(bot, dp)
+            else:
+                logging.info("Starting polling (inside lock)…")
+                await dp.start_polling(bot)
     except TelegramConflictError as e:
         logging.error(f"Polling conflict: {e}")
         raise
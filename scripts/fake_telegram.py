@@ -0,0 +1,166 @@
+# scripts/fake_telegram.py
+"""
+Локальна заглушка Telegram Bot API (aiohttp) для навантажувальних тестів.
+Бот ходить сюди замість api.telegram.org, якщо задано TELEGRAM_API_BASE:
+
+  python scripts/fake_telegram.py --port 8081 --latency 0.05 --rate-429 0.01
+  TELEGRAM_API_BASE=http://127.0.0.1:8081 python run.py
+
+Відповідає на POST /bot<token>/<method> мінімально валідним результатом
+(Message для send*/edit*, True для решти), з налаштовуваною затримкою,
+часткою 429 (retry_after) і часткою помилок (400 chat not found / 500).
+GET /_stats — лічильники і перцентилі затримки по методах (JSON).
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot",
+            "can_join_groups": True, "can_read_all_group_messages": False, "supports_inline_queries": False}
+
+
+class FakeTelegram:
+    """Стан і поведінка заглушки; один екземпляр на сервер."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_429: float = 0.0,
+                 retry_after: int = 1, fail_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.fail_rate = fail_rate
+        self._rnd = random.Random(seed)
+        self._msg_id = 0
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.results: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.started = time.perf_counter()
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.results.clear()
+        self.latencies.clear()
+        self.started = time.perf_counter()
+
+    def _message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._msg_id += 1
+        chat_id = int(params.get("chat_id") or 1)
+        return {
+            "message_id": int(params.get("message_id") or self._msg_id),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": str(params.get("text") or ""),
+        }
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getme":
+            return BOT_USER
+        if method.startswith("send") or method.startswith("edit"):
+            return self._message(params)
+        if method == "getwebhookinfo":
+            return {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+        return True
+
+    async def handle(self, request: web.Request) -> web.Response:
+        t0 = time.perf_counter()
+        method = request.match_info["method"].lower()
+        params: Dict[str, Any] = dict(await request.post()) if request.can_read_body else {}
+        self.calls[method] += 1
+
+        delay = self.latency + (self._rnd.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._rnd.random()
+        if roll < self.rate_429:
+            status, body = 429, {"ok": False, "error_code": 429,
+                                 "description": f"Too Many Requests: retry after {self.retry_after}",
+                                 "parameters": {"retry_after": self.retry_after}}
+        elif roll < self.rate_429 + self.fail_rate:
+            if self._rnd.random() < 0.5:
+                status, body = 400, {"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}
+            else:
+                status, body = 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+        else:
+            status, body = 200, {"ok": True, "result": self._result(method, params)}
+
+        self.results[str(status)] += 1
+        self.latencies[method].append(time.perf_counter() - t0)
+        return web.json_response(body, status=status)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(1e-9, time.perf_counter() - self.started)
+        per_method = {}
+        for m, xs in self.latencies.items():
+            xs = sorted(xs)
+            q = statistics.quantiles(xs, n=100) if len(xs) > 1 else xs * 99
+            per_method[m] = {"calls": self.calls[m], "p50_ms": round(q[49] * 1e3, 2), "p99_ms": round(q[98] * 1e3, 2)}
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "calls": sum(self.calls.values()),
+            "rps": round(sum(self.calls.values()) / elapsed, 1),
+            "by_status": dict(self.results),
+            "methods": per_method,
+        }
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/bot{token}/{method}", self.handle)
+
+        async def stats(_: web.Request) -> web.Response:
+            return web.json_response(self.stats())
+
+        async def reset(_: web.Request) -> web.Response:
+            self.reset()
+            return web.json_response({"ok": True})
+
+        app.router.add_get("/_stats", stats)
+        app.router.add_post("/_reset", reset)
+        return app
+
+
+async def start_fake_telegram(fake: FakeTelegram, host: str = "127.0.0.1", port: int = 0):
+    """Запускає сервер у поточному loop; повертає (runner, base_url)."""
+    runner = web.AppRunner(fake.build_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    real_port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://{host}:{real_port}"
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8081)
+    ap.add_argument("--latency", type=float, default=0.0, help="базова затримка відповіді, с")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± до затримки, с")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="частка відповідей 429")
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="частка 400/500")
+    args = ap.parse_args()
+
+    fake = FakeTelegram(args.latency, args.jitter, args.rate_429, args.retry_after, args.fail_rate)
+    runner, base = await start_fake_telegram(fake, args.host, args.port)
+    print(f"fake Bot API on {base}  (TELEGRAM_API_BASE={base}; stats: {base}/_stats)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(json.dumps(fake.stats(), indent=1))
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,325 @@
+# scripts/fake_upstream.py
+"""
+Локальна заглушка джерел даних: ForexFactory thisweek.json і MetalsMine HTML.
+Віддає записані payload-и з benchmarks/fixtures/ (make_fixtures.py, у т.ч. --record)
+за сценарієм — послідовністю кроків, щоб fetch / backoff / change-detection
+можна було ганяти детерміновано.
+
+  python scripts/fake_upstream.py serve --port 8082 --scenario 429-storm
+  FF_BASE_URL=http://127.0.0.1:8082 METALS_BASE_URL=http://127.0.0.1:8082 \\
+    METALS_MIN_BYTES=0 python run.py
+
+  python scripts/fake_upstream.py replay --scenario actuals --cycles 8
+  python scripts/fake_upstream.py replay --scenario my.json --json
+
+Маршрути: GET /ff_calendar_thisweek.json, GET /calendar?day=today|week=this,
+GET /_stats, POST /_reset.
+
+Сценарій — JSON {"ff": [крок, ...], "metals": [крок, ...], "loop": false}.
+Крок обслуговує "times" запитів (0 — без кінця; після останнього кроку
+повторюється останній, або все з початку при "loop": true):
+  status       HTTP-статус (200; 304 — примусово; 429/5xx — помилка)
+  retry_after  заголовок Retry-After для 429, с
+  delay        затримка перед заголовками, с
+  slow_body    тіло віддається шматками рівномірно за стільки секунд
+  challenge    сторінка Cloudflare «Just a moment...» (403, cf-mitigated)
+  mutate       {"actuals": k, "forecasts": k} — перед відповіддю k подій без
+               actual отримують actual / k прогнозів переглядаються (нова ETag)
+  etag         false — ігнорувати If-None-Match (за замовч. 304 на збіг)
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+
+CHALLENGE_HTML = (
+    "<!DOCTYPE html><html><head><title>Just a moment...</title></head><body>"
+    '<div id="challenge-platform">Checking your browser before accessing the site.</div>'
+    "<script>window._cf_chl_opt={cType:'managed'};</script></body></html>"
+)
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    # кожен запит — той самий payload; після першого 200 — лише 304
+    "steady": {"ff": [{"status": 200, "times": 0}]},
+    # шторм 429 з Retry-After, потім норма
+    "429-storm": {"ff": [{"status": 200}, {"status": 429, "retry_after": 1, "times": 5}, {"status": 200, "times": 0}]},
+    # повільне тіло (3 с) і повільні заголовки
+    "slow": {"ff": [{"status": 200, "slow_body": 3}, {"status": 200, "delay": 1.5, "etag": False, "times": 0}]},
+    # реліз: на кожному другому запиті з'являються actual
+    "actuals": {"ff": [{"status": 200}, {"status": 200}, {"mutate": {"actuals": 3}}, {"status": 200},
+                       {"mutate": {"actuals": 2, "forecasts": 1}}, {"status": 200, "times": 0}]},
+    # Cloudflare на обох джерелах, потім пропускає
+    "cloudflare": {"ff": [{"challenge": True, "times": 2}, {"status": 200, "times": 0}],
+                   "metals": [{"challenge": True}, {"status": 200, "times": 0}]},
+    # усе разом, по колу
+    "mixed": {"ff": [{"status": 200}, {"status": 200}, {"status": 429, "retry_after": 2},
+                     {"mutate": {"actuals": 2}}, {"status": 503}, {"status": 200, "slow_body": 1},
+                     {"challenge": True}, {"mutate": {"forecasts": 2}}], "loop": True},
+}
+
+
+def load_scenario(name_or_path: str) -> Dict[str, Any]:
+    if name_or_path in SCENARIOS:
+        return SCENARIOS[name_or_path]
+    return json.loads(Path(name_or_path).read_text(encoding="utf-8"))
+
+
+class _Track:
+    """Курсор по кроках сценарію для одного джерела."""
+
+    def __init__(self, steps: List[Dict[str, Any]], loop: bool):
+        self.steps = steps or [{"status": 200, "times": 0}]
+        self.loop = loop
+        self.i = 0
+        self.used = 0
+
+    def next(self) -> Dict[str, Any]:
+        step = self.steps[self.i]
+        times = int(step.get("times", 1))
+        self.used += 1
+        if times and self.used >= times:
+            if self.i + 1 < len(self.steps):
+                self.i, self.used = self.i + 1, 0
+            elif self.loop:
+                self.i, self.used = 0, 0
+            # інакше останній крок повторюється
+        return step
+
+
+class FakeUpstream:
+    """Стан і поведінка заглушки; один екземпляр на сервер."""
+
+    def __init__(self, scenario: Dict[str, Any], fixtures: Path = FIXTURES, seed: int = 0):
+        self.scenario = scenario
+        self.fixtures = fixtures
+        self._rnd = random.Random(seed)
+        self.ff_raw: List[Dict[str, Any]] = json.loads((fixtures / "thisweek.json").read_text(encoding="utf-8"))
+        self.metals = {
+            "today": (fixtures / "metals_today.html").read_bytes(),
+            "week": (fixtures / "metals_week.html").read_bytes(),
+        }
+        self._set_ff(self.ff_raw)
+        self.reset()
+
+    def reset(self) -> None:
+        loop = bool(self.scenario.get("loop"))
+        self.tracks = {"ff": _Track(self.scenario.get("ff", []), loop),
+                       "metals": _Track(self.scenario.get("metals", []), loop)}
+        self.log: List[Dict[str, Any]] = []
+        self.bytes_sent = 0
+        self.mutations = 0
+
+    # -------------------- payload --------------------
+
+    def _set_ff(self, raw: List[Dict[str, Any]]) -> None:
+        self.ff_raw = raw
+        self.ff_body = json.dumps(raw, ensure_ascii=False).encode("utf-8")
+        self.ff_etag = '"%s"' % hashlib.sha1(self.ff_body).hexdigest()[:16]
+        self.ff_last_modified = formatdate(time.time(), usegmt=True)
+
+    def mutate(self, actuals: int = 0, forecasts: int = 0) -> None:
+        """Імітація релізу: перші k подій без actual отримують його, k прогнозів переглядаються."""
+        raw = copy.deepcopy(self.ff_raw)
+        pending = [e for e in raw if not e.get("actual")]
+        for e in pending[:actuals]:
+            e["actual"] = f"{self._rnd.uniform(-2, 5):.1f}%"
+        for e in self._rnd.sample(pending[actuals:], min(forecasts, max(0, len(pending) - actuals))):
+            e["forecast"] = f"{self._rnd.uniform(-2, 5):.1f}%"
+        self._set_ff(raw)
+        self.mutations += 1
+
+    # -------------------- handlers --------------------
+
+    async def _respond(self, request: web.Request, source: str, body: bytes, content_type: str,
+                       etag: Optional[str] = None, last_modified: Optional[str] = None) -> web.StreamResponse:
+        t0 = time.perf_counter()
+        step = self.tracks[source].next()
+        if source == "ff" and step.get("mutate"):
+            self.mutate(**step["mutate"])
+            body, etag, last_modified = self.ff_body, self.ff_etag, self.ff_last_modified
+
+        if step.get("delay"):
+            await asyncio.sleep(float(step["delay"]))
+
+        status = int(step.get("status", 200))
+        headers: Dict[str, str] = {}
+        if step.get("challenge"):
+            status, body, content_type = 403, CHALLENGE_HTML.encode(), "text/html; charset=UTF-8"
+            headers["cf-mitigated"] = "challenge"
+        elif status == 429:
+            headers["Retry-After"] = str(int(step.get("retry_after", 1)))
+            body, content_type = b"Too Many Requests", "text/plain"
+        elif status >= 400:
+            body, content_type = f"HTTP {status}".encode(), "text/plain"
+        elif etag is not None:
+            headers["ETag"] = etag
+            headers["Last-Modified"] = last_modified or ""
+            if status == 304 or (step.get("etag", True) and request.headers.get("If-None-Match") == etag):
+                status, body = 304, b""
+
+        resp = web.StreamResponse(status=status, headers=headers)
+        if body:
+            resp.content_type = content_type.split(";")[0]
+            resp.content_length = len(body)
+        await resp.prepare(request)
+        slow = float(step.get("slow_body", 0) or 0)
+        if body and slow > 0:
+            chunks = 10
+            size = -(-len(body) // chunks)
+            for i in range(0, len(body), size):
+                await resp.write(body[i:i + size])
+                await asyncio.sleep(slow / chunks)
+        elif body:
+            await resp.write(body)
+        await resp.write_eof()
+
+        self.bytes_sent += len(body)
+        self.log.append({"source": source, "path": request.path_qs, "status": status,
+                         "ms": round((time.perf_counter() - t0) * 1e3, 1)})
+        return resp
+
+    async def handle_ff(self, request: web.Request) -> web.StreamResponse:
+        return await self._respond(request, "ff", self.ff_body, "application/json",
+                                   self.ff_etag, self.ff_last_modified)
+
+    async def handle_metals(self, request: web.Request) -> web.StreamResponse:
+        page = "week" if request.query.get("week") else "today"
+        return await self._respond(request, "metals", self.metals[page], "text/html")
+
+    def stats(self) -> Dict[str, Any]:
+        by: Dict[str, Counter] = {}
+        for rec in self.log:
+            by.setdefault(rec["source"], Counter())[str(rec["status"])] += 1
+        return {
+            "requests": len(self.log),
+            "by_status": {k: dict(v) for k, v in by.items()},
+            "bytes_sent": self.bytes_sent,
+            "mutations": self.mutations,
+            "ff_etag": self.ff_etag,
+        }
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/ff_calendar_thisweek.json", self.handle_ff)
+        app.router.add_get("/calendar", self.handle_metals)
+
+        async def stats(_: web.Request) -> web.Response:
+            return web.json_response(self.stats())
+
+        async def reset(_: web.Request) -> web.Response:
+            self.reset()
+            return web.json_response({"ok": True})
+
+        app.router.add_get("/_stats", stats)
+        app.router.add_post("/_reset", reset)
+        return app
+
+
+async def start_fake_upstream(fake: FakeUpstream, host: str = "127.0.0.1", port: int = 0):
+    """Запускає сервер у поточному loop; повертає (runner, base_url)."""
+    runner = web.AppRunner(fake.build_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    real_port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://{host}:{real_port}"
+
+
+# -------------------- replay: справжній forex_client проти сценарію --------------------
+
+async def replay(args) -> Dict[str, Any]:
+    fake = FakeUpstream(load_scenario(args.scenario), seed=args.seed)
+    runner, base = await start_fake_upstream(fake)
+    # до імпорту app: FF_THISWEEK будується з FF_BASE_URL
+    os.environ["FF_BASE_URL"] = base
+    os.environ["FF_CHALLENGE_BACKOFF"] = str(args.challenge_backoff)
+    os.environ.setdefault("DB_PATH", ":memory:")
+    sys.path.insert(0, str(ROOT))
+    from app.services import forex_client
+
+    random.seed(args.seed)  # джитер backoff у forex_client
+    cycles = []
+    try:
+        for n in range(args.cycles):
+            seen = len(fake.log)
+            t0 = time.perf_counter()
+            snap = await forex_client._refresh_once(ttl=0)
+            took = time.perf_counter() - t0
+            changes = Counter(ch.kind for ch in forex_client.drain_changes())
+            cycles.append({
+                "cycle": n + 1,
+                "statuses": [rec["status"] for rec in fake.log[seen:]],
+                "took_s": round(took, 3),
+                "version": snap.version if snap else 0,
+                "changes": dict(changes),
+            })
+            if args.interval:
+                await asyncio.sleep(args.interval)
+    finally:
+        cli = forex_client._CLIENT
+        if cli is not None:
+            await cli.aclose()
+        await runner.cleanup()
+
+    return {
+        "scenario": args.scenario,
+        "cycles": cycles,
+        "upstream": fake.stats(),
+        "fetch_wall_s": round(sum(c["took_s"] for c in cycles), 3),
+        "versions_published": forex_client.get_version(),
+        "changes": dict(sum((Counter(c["changes"]) for c in cycles), Counter())),
+    }
+
+
+async def serve(args) -> None:
+    fake = FakeUpstream(load_scenario(args.scenario), seed=args.seed)
+    runner, base = await start_fake_upstream(fake, args.host, args.port)
+    print(f"fake upstream on {base}  (FF_BASE_URL={base} METALS_BASE_URL={base}; stats: {base}/_stats)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(json.dumps(fake.stats(), indent=1))
+        await runner.cleanup()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("mode", choices=["serve", "replay"])
+    ap.add_argument("--scenario", default="steady", help=f"{', '.join(SCENARIOS)} або шлях до JSON")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8082)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--cycles", type=int, default=6, help="запитів forex_client (replay)")
+    ap.add_argument("--interval", type=float, default=0.0, help="пауза між циклами, с (replay)")
+    ap.add_argument("--challenge-backoff", type=float, default=5.0, help="FF_CHALLENGE_BACKOFF для replay, с")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    if not (FIXTURES / "thisweek.json").exists():
+        sys.exit("no fixtures: run python benchmarks/make_fixtures.py")
+    if args.mode == "serve":
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+        return
+    result = asyncio.run(replay(args))
+    print(json.dumps(result, indent=None if args.json else 1, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
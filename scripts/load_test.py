@@ -0,0 +1,253 @@
+# scripts/load_test.py
+"""
+Навантажувальний прогін проти заглушки Bot API (scripts/fake_telegram.py).
+Справжній Bot (aiohttp-сесія, middleware, ретраї — як у проді) ходить у
+заглушку, тож міряється весь шлях: апдейт → хендлер → HTTP до «Telegram».
+
+Сценарії:
+  menu    — синтетичні користувачі тиснуть кнопки меню (callback_query) через
+            webhook-застосунок; звіт: апдейтів/с, латентність POST→кінець хендлера p50/p99.
+  alerts  — «шторм» алертів: N підписок, усі чекають ту саму подію; один тік
+            планувальника (run_tick); звіт: алертів/хв, латентність Bot API, 429/помилки.
+
+Заглушка піднімається в тому ж процесі (або --api-base на зовнішню):
+  DB_PATH=/tmp/load.db python scripts/load_test.py menu --users 300 --presses 3000 -c 100 --latency 0.03
+  DB_PATH=/tmp/load.db python scripts/load_test.py alerts --subs 2000 --rate-429 0.02
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DB_PATH", "/tmp/load_test.db")
+os.environ.setdefault("SLOW_UPDATE_MS", "0")
+os.environ.setdefault("METALS_WEEK_HTML", str(FIXTURES / "metals_week.html"))
+os.environ.setdefault("METALS_TODAY_HTML", str(FIXTURES / "metals_today.html"))
+
+from aiohttp import ClientSession, web  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.config.settings import UTC  # noqa: E402
+from app.core import database  # noqa: E402
+from app.core.scheduler import run_tick  # noqa: E402
+from app.main import TG_REQUESTS, build_bot, build_dispatcher  # noqa: E402
+from app.services import forex_client  # noqa: E402
+from app.services.metals_store import get_today_snapshot, get_week_snapshot  # noqa: E402
+from app.webhook import build_webhook_app  # noqa: E402
+from fake_telegram import FakeTelegram, start_fake_telegram  # noqa: E402
+
+FAKE_TOKEN = "123456:LOADTEST-AAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+BUTTONS = [
+    "root:home", "root:forex", "root:metals", "menu:home", "menu:today", "menu:week",
+    "menu:settings", "imp:High", "cur:USD", "lang:ua", "al:15", "menu:alerts",
+    "menu:topics", "menu:about", "menu:faq", "metals:today", "metals:week", "metals:settings",
+]
+
+
+def _pct(xs: List[float]) -> Dict[str, float]:
+    if not xs:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    xs = sorted(xs)
+    q = statistics.quantiles(xs, n=100) if len(xs) > 1 else xs * 99
+    return {"p50_ms": round(q[49] * 1e3, 2), "p99_ms": round(q[98] * 1e3, 2), "max_ms": round(xs[-1] * 1e3, 2)}
+
+
+def _publish_fixture_snapshot() -> None:
+    """Знімок FF з фікстури замість мережі (ttl «назавжди»)."""
+    raw = json.loads((FIXTURES / "thisweek.json").read_text(encoding="utf-8"))
+    forex_client._publish(raw, ttl=10**9)
+
+
+def _api_failures() -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for (method, result), n in TG_REQUESTS._values.items():
+        if result != "ok":
+            out[f"{method}:{result}"] = int(n)
+    return out
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": "Load"}
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": 1, "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": 123456, "is_bot": True, "first_name": "FakeBot"},
+                "text": "menu",
+            },
+        },
+    }
+
+
+# -------------------- menu --------------------
+
+async def run_menu(args, bot, fake: FakeTelegram) -> Dict[str, Any]:
+    dp = build_dispatcher(background=False)
+    handled: List[float] = []
+    started: Dict[int, float] = {}
+
+    async def recorder(handler, event, data):
+        try:
+            return await handler(event, data)
+        finally:
+            t0 = started.pop(event.update_id, None)
+            if t0 is not None:
+                handled.append(time.perf_counter() - t0)
+
+    dp.update.outer_middleware(recorder)
+    app = build_webhook_app(bot, dp, concurrency=args.workers)
+    handler = app["webhook_handler"]
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    url = f"http://127.0.0.1:{port}{settings.WEBHOOK_PATH}"
+    headers = {"Content-Type": "application/json"}
+    if settings.WEBHOOK_SECRET:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = settings.WEBHOOK_SECRET
+
+    rnd = random.Random(args.seed)
+    ids = itertools.count(1)
+    sem = asyncio.Semaphore(args.concurrency)
+    errors = 0
+
+    async def press(client: ClientSession, i: int) -> None:
+        nonlocal errors
+        uid = 50_000 + rnd.randrange(args.users)
+        upd_id = next(ids)
+        body = json.dumps(callback_update(upd_id, uid, rnd.choice(BUTTONS)))
+        async with sem:
+            started[upd_id] = time.perf_counter()
+            async with client.post(url, data=body, headers=headers) as r:
+                await r.read()
+                if r.status != 200:
+                    errors += 1
+                    started.pop(upd_id, None)
+
+    fake.reset()
+    t0 = time.perf_counter()
+    async with ClientSession() as client:
+        await asyncio.gather(*(press(client, i) for i in range(args.presses)))
+    while handler.in_flight:
+        await asyncio.sleep(0.01)
+    took = time.perf_counter() - t0
+    await runner.cleanup()
+
+    return {
+        "scenario": "menu",
+        "presses": args.presses,
+        "users": args.users,
+        "post_errors": errors,
+        "updates_per_s": round(len(handled) / took, 1),
+        "e2e": _pct(handled),  # POST → хендлер завершено (з чергою WEBHOOK_CONCURRENCY)
+        "api": fake.stats(),
+        "api_failures": _api_failures(),
+        "total_s": round(took, 3),
+    }
+
+
+# -------------------- alerts --------------------
+
+def _seed_storm(n: int, rnd: random.Random) -> None:
+    """N підписок без фільтра валют, однаковий alert_minutes → усі ловлять ту саму подію."""
+    database.init_db()
+    conn = database._conn()
+    conn.execute("DELETE FROM subscriptions")
+    conn.execute("DELETE FROM sent_log")
+    conn.executemany(
+        "INSERT INTO subscriptions (user_id, chat_id, impact_filter, countries_filter, alert_minutes, lang_mode)"
+        " VALUES (?,?,?,?,?,?)",
+        [(i + 1, 50_000 + i, "High,Medium,Low", "", 30, rnd.choice(["en", "ua"])) for i in range(n)],
+    )
+    database.reset_sent_cache()
+    database.hydrate_sent_cache()
+
+
+async def run_alerts(args, bot, fake: FakeTelegram) -> Dict[str, Any]:
+    _seed_storm(args.subs, random.Random(args.seed))
+    index = forex_client.current_snapshot().index("en")
+    target = index.events[len(index.events) // 2].date
+    now_utc = (target - timedelta(minutes=30)).astimezone(UTC)
+    get_week_snapshot()  # розбір metals-файлу — не частина тіку
+    get_today_snapshot()
+
+    fake.reset()
+    t0 = time.perf_counter()
+    subs = database.get_all_subs()
+    await run_tick(bot, index, subs, [], now_utc)
+    took = time.perf_counter() - t0
+    api = fake.stats()
+    sent = api["methods"].get("sendmessage", {}).get("calls", 0)
+    return {
+        "scenario": "alerts",
+        "subs": args.subs,
+        "send_attempts": sent,
+        "alerts_per_min": round(sent / took * 60, 1),
+        "tick_s": round(took, 3),
+        "api": api,
+        "api_failures": _api_failures(),
+    }
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("scenario", choices=["menu", "alerts"])
+    ap.add_argument("--api-base", default="", help="зовнішня заглушка/bot-api; порожньо — підняти в процесі")
+    ap.add_argument("--latency", type=float, default=0.02, help="затримка заглушки, с")
+    ap.add_argument("--jitter", type=float, default=0.005)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--presses", type=int, default=2000)
+    ap.add_argument("-c", "--concurrency", type=int, default=50, help="одночасних POST (menu)")
+    ap.add_argument("-w", "--workers", type=int, default=settings.WEBHOOK_CONCURRENCY)
+    ap.add_argument("--subs", type=int, default=1000, help="підписок (alerts)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    fake = FakeTelegram(args.latency, args.jitter, args.rate_429, args.retry_after, args.fail_rate, args.seed)
+    fake_runner = None
+    base = args.api_base
+    if not base:
+        fake_runner, base = await start_fake_telegram(fake)
+
+    _publish_fixture_snapshot()
+    bot = build_bot(FAKE_TOKEN, base)
+    try:
+        if args.scenario == "menu":
+            result = await run_menu(args, bot, fake)
+        else:
+            result = await run_alerts(args, bot, fake)
+    finally:
+        await bot.session.close()
+        if fake_runner is not None:
+            await fake_runner.cleanup()
+        database.close_db()
+
+    if args.api_base:
+        result.pop("api", None)  # лічильники — у зовнішньої заглушки (GET /_stats)
+    print(json.dumps(result, indent=None if args.json else 1, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
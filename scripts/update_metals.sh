@@ -7,7 +7,8 @@ log() { echo "[$(date '+%Y-%m-%d %H:%M:%S')] $*"; }
 # локально зручно ./data/metals_today.html, на Render став METALS_TODAY_HTML=/data/metals_today.html
 OUT="${METALS_TODAY_HTML:-/data/metals_today.html}"
 TMP="$(mktemp -t metals_today.XXXXXX.html)"
-URL="https://www.metalsmine.com/calendar?day=today"
+BASE_URL="${METALS_BASE_URL:-https://www.metalsmine.com}"
+URL="${BASE_URL%/}/calendar?day=today"
 
 # знайдемо інтерпретатор Python
 PY_BIN="${PY_BIN:-$(command -v python3 || true)}"
@@ -28,11 +29,11 @@ curl -sS -L --compressed "${URL}" \
   -H 'User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36' \
   -H 'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8' \
   -H 'Accept-Language: en-US,en;q=0.9' \
-  -H 'Referer: https://www.metalsmine.com/' \
+  -H "Referer: ${BASE_URL%/}/" \
   --output "${TMP}" || { log "ERROR: curl failed"; exit 1; }
 
 BYTES=$(wc -c < "${TMP}" | tr -d ' ')
-if [[ "${BYTES}" -lt 50000 ]] || grep -qiE 'cf-mitigated|Just a moment|cloudflare|challenge' "${TMP}"; then
+if [[ "${BYTES}" -lt "${METALS_MIN_BYTES:-50000}" ]] || grep -qiE 'cf-mitigated|Just a moment|cloudflare|challenge' "${TMP}"; then
   log "Curl looks blocked (size=${BYTES}). Trying Playwright fallback…"
   python3 scripts/update_metals_playwright.py "${OUT}" || {
     log "ERROR: Playwright fallback failed too."
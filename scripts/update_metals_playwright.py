@@ -7,7 +7,8 @@ from pathlib import Path
 from playwright.sync_api import sync_playwright, Error as PWError
 
 OUT = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/metals_today.html")
-URL = "https://www.metalsmine.com/calendar?day=today"
+BASE_URL = os.getenv("METALS_BASE_URL", "https://www.metalsmine.com").rstrip("/")
+URL = f"{BASE_URL}/calendar?day=today"
 
 def _log(msg: str):
     print(msg, flush=True)
@@ -3,7 +3,8 @@
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
 import sys, time, os, re
 
-URL = "https://www.metalsmine.com/calendar?week=this"
+BASE_URL = os.getenv("METALS_BASE_URL", "https://www.metalsmine.com").rstrip("/")
+URL = f"{BASE_URL}/calendar?week=this"
 
 UA = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
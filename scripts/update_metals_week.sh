@@ -4,7 +4,8 @@ set -euo pipefail
 BASE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 OUT="${METALS_WEEK_HTML:-${BASE_DIR%/*}/data/metals_week.html}"  # /data/... на Render або локально ./data/...
 TMP="${BASE_DIR}/.metals_week_tmp.html"
-URL="https://www.metalsmine.com/calendar?week=this"
+BASE_URL="${METALS_BASE_URL:-https://www.metalsmine.com}"
+URL="${BASE_URL%/}/calendar?week=this"
 
 log() { echo "[$(date '+%Y-%m-%d %H:%M:%S')] $*"; }
 
@@ -18,12 +19,12 @@ curl -sS -L --compressed "${URL}" \
   -H 'User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36' \
   -H 'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8' \
   -H 'Accept-Language: en-US,en;q=0.9' \
-  -H 'Referer: https://www.metalsmine.com/' \
+  -H "Referer: ${BASE_URL%/}/" \
   --output "${TMP}" || { log "ERROR: curl (week) failed"; exit 1; }
 
 BYTES=$(wc -c < "${TMP}" | tr -d ' ')
 
-if [[ "${BYTES}" -lt 50000 ]] || grep -qiE 'cf-mitigated|Just a moment|cloudflare|challenge' "${TMP}"; then
+if [[ "${BYTES}" -lt "${METALS_MIN_BYTES:-50000}" ]] || grep -qiE 'cf-mitigated|Just a moment|cloudflare|challenge' "${TMP}"; then
   log "Curl (week) looks blocked (size=${BYTES}). Trying Playwright fallback…"
   python3 "${BASE_DIR}/update_metals_playwright_week.py" "${OUT}" || {
     log "ERROR: Playwright (week) fallback failed."
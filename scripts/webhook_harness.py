@@ -0,0 +1,157 @@
+# scripts/webhook_harness.py
+"""
+Локальний стенд для webhook-режиму: піднімає той самий aiohttp-застосунок
+(app.webhook), але з підміненою сесією бота (нічого не йде в Telegram),
+шле N фейкових апдейтів із заданою паралельністю і міряє:
+  - accept latency: POST → 200 (те, що бачить Telegram);
+  - handler throughput: апдейтів/с до повного дренажу обробників.
+
+Запуск (з кореня репо):
+  DB_PATH=/tmp/harness.db python scripts/webhook_harness.py -n 2000 -c 100
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DB_PATH", "/tmp/webhook_harness.db")
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.types import Chat, Message  # noqa: E402
+from aiohttp import ClientSession, web  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.main import TelegramMetrics, build_dispatcher  # noqa: E402
+from app.webhook import build_webhook_app  # noqa: E402
+
+FAKE_TOKEN = "123456:HARNESS-AAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+COMMANDS = ["/start", "/menu", "/about", "/faq"]
+
+
+class NullSession(BaseSession):
+    """Сесія-заглушка: на кожен метод повертає мінімальну валідну відповідь."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    async def make_request(self, bot: Bot, method: Any, timeout: Any = None) -> Any:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # SendMessage / EditMessageText тощо повертають Message (або Union[Message, bool])
+        if "Message" in str(getattr(method, "__returning__", "")):
+            chat_id = getattr(method, "chat_id", None) or 1
+            return Message(message_id=1, date=int(time.time()),
+                           chat=Chat(id=int(chat_id), type="private"), text="ok")
+        return True
+
+    async def stream_content(self, *a: Any, **kw: Any):  # pragma: no cover
+        if False:
+            yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def fake_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", "--updates", type=int, default=1000)
+    ap.add_argument("-c", "--concurrency", type=int, default=50, help="одночасних POST")
+    ap.add_argument("-w", "--workers", type=int, default=settings.WEBHOOK_CONCURRENCY,
+                    help="WEBHOOK_CONCURRENCY обробника")
+    ap.add_argument("--users", type=int, default=200, help="скільки різних chat_id")
+    ap.add_argument("--api-latency", type=float, default=0.0, help="штучна затримка Bot API, с")
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="вивести результат як JSON")
+    args = ap.parse_args()
+
+    session = NullSession(args.api_latency)
+    bot = Bot(FAKE_TOKEN, session=session)
+    bot.session.middleware(TelegramMetrics())
+    dp = build_dispatcher(background=False)
+
+    app = build_webhook_app(bot, dp, concurrency=args.workers)
+    handler = app["webhook_handler"]
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    url = f"http://127.0.0.1:{port}{settings.WEBHOOK_PATH}"
+
+    headers = {"Content-Type": "application/json"}
+    if settings.WEBHOOK_SECRET:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = settings.WEBHOOK_SECRET
+
+    ids = itertools.count(1)
+    latencies: list[float] = []
+    errors = 0
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def post(client: ClientSession, i: int) -> None:
+        nonlocal errors
+        body = json.dumps(fake_update(next(ids), 10_000 + i % args.users, COMMANDS[i % len(COMMANDS)]))
+        async with sem:
+            t0 = time.perf_counter()
+            async with client.post(url, data=body, headers=headers) as r:
+                await r.read()
+                if r.status != 200:
+                    errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    async with ClientSession() as client:
+        await asyncio.gather(*(post(client, i) for i in range(args.updates)))
+    t_accepted = time.perf_counter()
+    while handler.in_flight:
+        await asyncio.sleep(0.01)
+    t_done = time.perf_counter()
+    await runner.cleanup()
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    result = {
+        "updates": args.updates,
+        "post_concurrency": args.concurrency,
+        "handler_concurrency": args.workers,
+        "errors": errors,
+        "api_calls": session.calls,
+        "accept_p50_ms": round(q[49] * 1000, 2),
+        "accept_p99_ms": round(q[98] * 1000, 2),
+        "accept_rps": round(args.updates / (t_accepted - t_start), 1),
+        "handled_rps": round(args.updates / (t_done - t_start), 1),
+        "total_s": round(t_done - t_start, 3),
+    }
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for k, v in result.items():
+            print(f"{k:>20}: {v}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())